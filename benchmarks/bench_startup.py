@@ -0,0 +1,80 @@
+"""
+Start-up time benchmark for the ETL pipeline
+
+Runs `python -X importtime` for each pipeline entry module and reports the
+cumulative import time, the slowest top-level imports, and whether the
+Google / database client stacks were loaded.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat N] [--top N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Modules that a CSV-only run should not need to import
+HEAVY_MODULES = ['sqlalchemy', 'psycopg2', 'googleapiclient', 'google.oauth2']
+
+TARGETS = ['etl.extract', 'etl.transform', 'etl.load', 'main']
+
+def measure_import(module, python=sys.executable):
+    """
+    Import a module in a fresh interpreter with -X importtime
+    
+    Args:
+        module (str): Module to import
+        python (str): Interpreter to run
+        
+    Returns:
+        list: (cumulative_us, self_us, depth, name) tuples, one per imported module
+    """
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    
+    rows = []
+    for line in result.stderr.splitlines():
+        # Format: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    return rows
+
+def summarize(module, repeat, top):
+    totals = []
+    rows = []
+    for _ in range(repeat):
+        rows = measure_import(module)
+        totals.append(sum(cumulative for cumulative, _, depth, _ in rows if depth == 0))
+    
+    loaded = {name for _, _, _, name in rows}
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    
+    print(f"{module}: median {statistics.median(totals) / 1000:.1f} ms "
+          f"over {repeat} run(s), {len(rows)} modules imported")
+    print(f"  heavy client stacks loaded: {', '.join(heavy) if heavy else 'none'}")
+    
+    # Slowest direct imports of the target module
+    children = sorted((row for row in rows if row[2] == 1), reverse=True)[:top]
+    for cumulative, _, _, name in children:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure ETL module import time")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per module (median is reported)")
+    parser.add_argument('--top', type=int, default=5, help="slowest imports to list per module")
+    parser.add_argument('modules', nargs='*', default=TARGETS, help="modules to measure")
+    args = parser.parse_args(argv)
+    
+    for module in args.modules:
+        summarize(module, args.repeat, args.top)
+
+if __name__ == "__main__":
+    main()
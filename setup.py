@@ -17,12 +17,22 @@ setup(
         'beautifulsoup4 ~= 4.12',
         'google-auth ~= 2.36',
         'google-api-python-client ~= 2.152',
-        'pytest-cov ~= 6.0'
+        'pytest-cov ~= 6.0',
+        # TOML settings files (tomllib is in the standard library from 3.11)
+        'tomli >= 1.1; python_version < "3.11"'
     ],
+    extras_require={
+        # Raw snapshots and the multi-process transform (--transform-workers)
+        'arrow': ['pyarrow >= 14'],
+        # csv_compression = "zstd" or .zst output paths
+        'zstd': ['zstandard >= 0.22'],
+        # .duckdb files for the local database sink
+        'duckdb': ['duckdb >= 1.0'],
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.9',
 )
\ No newline at end of file
@@ -1,6 +1,16 @@
 """
 Configuration settings for the ETL pipeline
+
+The constants below are the defaults. At run time the pipeline uses a single
+typed Settings object built from these defaults, an optional settings file
+(JSON or TOML, path in ETL_SETTINGS_FILE) and ETL_* environment variables,
+e.g. ETL_MAX_WORKERS=8 or ETL_SINK_SHEETS=false.
 """
+import json
+import os
+import threading
+from dataclasses import dataclass, fields, replace
+from typing import Optional, get_type_hints
 
 # PostgreSQL database settings (change as needed)
 POSTGRES_HOST = "localhost"
@@ -9,6 +19,13 @@ POSTGRES_DB = "fashion_db"
 POSTGRES_USER = "alfan"
 POSTGRES_PASSWORD = "alfan"
 POSTGRES_TABLE = "products"
+HISTORY_TABLE = "products_history"  # append-only price/rating history
+
+# PostgreSQL connection pool settings
+POSTGRES_POOL_SIZE = 5
+POSTGRES_MAX_OVERFLOW = 10
+POSTGRES_POOL_PRE_PING = True  # check connections before handing them out
+POSTGRES_POOL_RECYCLE = 1800  # seconds before a pooled connection is replaced
 
 # Google Sheets settings
 GOOGLE_CREDENTIALS_PATH = "<path_to_your_google_credentials>.json"
@@ -16,15 +33,289 @@ GOOGLE_SPREADSHEET_ID = "<your_spreadsheet_id>"
 
 # CSV settings
 CSV_OUTPUT_PATH = "products.csv"
+CSV_CHUNK_SIZE = 10000  # rows formatted per write, bounds memory while writing
+CSV_COMPRESSION = "infer"  # "none", "gzip", "zstd" or "infer" from the file extension
+
+# Intermediate artifacts used to re-run single stages
+RAW_OUTPUT_PATH = "data/raw_products.csv"
+TRANSFORMED_OUTPUT_PATH = "data/transformed_products.csv"
+SNAPSHOT_DIR = None  # directory for Arrow raw snapshots; None disables them
+DATA_PROFILE_DIR = None  # directory for per-run data profile reports; None disables them
+
+# Local database sink (".duckdb" files use DuckDB, anything else SQLite)
+LOCAL_DB_PATH = "data/products.sqlite"
 
 # Scraping settings
 TARGET_URL = "https://fashion-studio.dicoding.dev/"
 MAX_PAGES = 50
 MAX_PRODUCTS = 1000
 PAGE_DELAY = 0.5  # seconds between page requests
+MAX_WORKERS = 1  # pages fetched concurrently
+CACHE_DIR = None  # directory for cached page HTML; None disables caching
+CACHE_SIZE = 200  # maximum number of cached pages kept on disk
+CACHE_TTL = 3600  # seconds a cached page is reused before it is fetched again; None keeps pages forever
+
+# Currency conversion: prices are scraped in USD and stored in IDR
+USD_TO_IDR = 16000.0  # rate used when no rate source is configured or it cannot be read
+FX_RATES_SOURCE = None  # JSON rates file or http(s) URL, e.g. {"base": "USD", "rates": {"IDR": 16250}}
+FX_RATES_TTL = 3600  # seconds a fetched rate is reused
+
+# Transform
+TRANSFORM_WORKERS = 1  # processes transforming partitions in parallel; 1 transforms in-process
+
+# Out-of-core transform (--out-of-core)
+TRANSFORM_MEMORY_BUDGET_MB = 512  # memory for transform data; sets chunk and partition sizes
+SPILL_DIR = None  # parent directory for temporary hash partitions; None uses the system temp dir
+
+# Streaming pipeline (fetch -> parse -> transform -> CSV, connected by bounded queues)
+STREAM_QUEUE_SIZE = 8  # items buffered between two stages before the producer blocks
+STREAM_PARSE_WORKERS = 1
+STREAM_TRANSFORM_WORKERS = 1
+STREAM_WORKER_MODE = "thread"  # "thread" or "process" for the parse and transform stages
+
+# Sinks written by a full pipeline run
+SINK_CSV = True
+SINK_SHEETS = True
+SINK_POSTGRES = True
+SINK_HISTORY = False
+SINK_LOCAL_DB = False
+
+# Failed sink writes
+LOAD_RETRIES = 0  # retries per sink after a failed write
+LOAD_RETRY_BACKOFF = 1.0  # seconds before the first retry, doubled for each further retry
+SPOOL_DIR = None  # dead-letter directory for batches that still fail, e.g. "data/spool"; None disables it
+SPOOL_MAX_BATCHES = 20  # spooled batches kept per sink, the oldest are dropped first
 
 API_KEY = "your_api_key_here"
 DATABASE_URL = "your_database_url_here"
 LOG_LEVEL = "INFO"
 TIMEOUT = 30  # seconds
-RETRY_COUNT = 3  # number of retries for network requests
\ No newline at end of file
+RETRY_COUNT = 3  # number of retries for network requests
+
+ENV_PREFIX = "ETL_"
+SETTINGS_FILE_ENV = "ETL_SETTINGS_FILE"
+
+CSV_COMPRESSIONS = (None, "none", "infer", "gzip", "zstd")
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+WORKER_MODES = ("thread", "process")
+
+@dataclass(frozen=True)
+class Settings:
+    """Typed, validated configuration for one pipeline process"""
+    
+    # PostgreSQL
+    postgres_host: str = POSTGRES_HOST
+    postgres_port: str = POSTGRES_PORT
+    postgres_db: str = POSTGRES_DB
+    postgres_user: str = POSTGRES_USER
+    postgres_password: str = POSTGRES_PASSWORD
+    postgres_table: str = POSTGRES_TABLE
+    history_table: str = HISTORY_TABLE
+    postgres_pool_size: int = POSTGRES_POOL_SIZE
+    postgres_max_overflow: int = POSTGRES_MAX_OVERFLOW
+    postgres_pool_pre_ping: bool = POSTGRES_POOL_PRE_PING
+    postgres_pool_recycle: int = POSTGRES_POOL_RECYCLE
+    postgres_chunk_size: Optional[int] = None
+    
+    # Google Sheets
+    google_credentials_path: str = GOOGLE_CREDENTIALS_PATH
+    google_spreadsheet_id: str = GOOGLE_SPREADSHEET_ID
+    
+    # CSV
+    csv_output_path: str = CSV_OUTPUT_PATH
+    csv_chunk_size: Optional[int] = CSV_CHUNK_SIZE
+    csv_compression: Optional[str] = CSV_COMPRESSION
+    csv_append: bool = False
+    
+    # Intermediate artifacts
+    raw_output_path: str = RAW_OUTPUT_PATH
+    transformed_output_path: str = TRANSFORMED_OUTPUT_PATH
+    snapshot_dir: Optional[str] = SNAPSHOT_DIR
+    data_profile_dir: Optional[str] = DATA_PROFILE_DIR
+    
+    # Local database
+    local_db_path: str = LOCAL_DB_PATH
+    
+    # Scraping
+    max_pages: int = MAX_PAGES
+    max_products: int = MAX_PRODUCTS
+    page_delay: float = PAGE_DELAY
+    timeout: float = TIMEOUT
+    max_workers: int = MAX_WORKERS
+    cache_dir: Optional[str] = CACHE_DIR
+    cache_size: int = CACHE_SIZE
+    cache_ttl: Optional[float] = CACHE_TTL
+    
+    # Currency conversion
+    usd_to_idr: float = USD_TO_IDR
+    fx_rates_source: Optional[str] = FX_RATES_SOURCE
+    fx_rates_ttl: float = FX_RATES_TTL
+    
+    # Transform
+    transform_workers: int = TRANSFORM_WORKERS
+    
+    # Out-of-core transform
+    transform_memory_budget_mb: int = TRANSFORM_MEMORY_BUDGET_MB
+    spill_dir: Optional[str] = SPILL_DIR
+    
+    # Streaming pipeline
+    stream_queue_size: int = STREAM_QUEUE_SIZE
+    stream_parse_workers: int = STREAM_PARSE_WORKERS
+    stream_transform_workers: int = STREAM_TRANSFORM_WORKERS
+    stream_worker_mode: str = STREAM_WORKER_MODE
+    
+    # Sinks
+    sink_csv: bool = SINK_CSV
+    sink_sheets: bool = SINK_SHEETS
+    sink_postgres: bool = SINK_POSTGRES
+    sink_history: bool = SINK_HISTORY
+    sink_local_db: bool = SINK_LOCAL_DB
+    
+    # Failed sink writes
+    load_retries: int = LOAD_RETRIES
+    load_retry_backoff: float = LOAD_RETRY_BACKOFF
+    spool_dir: Optional[str] = SPOOL_DIR
+    spool_max_batches: int = SPOOL_MAX_BATCHES
+    
+    log_level: str = LOG_LEVEL
+    
+    def __post_init__(self):
+        self.validate()
+    
+    def validate(self):
+        """Raise ValueError describing every invalid value"""
+        errors = []
+        for name in ('postgres_pool_size', 'max_pages', 'max_products', 'max_workers', 'cache_size',
+                     'stream_queue_size', 'stream_parse_workers', 'stream_transform_workers',
+                     'spool_max_batches', 'transform_memory_budget_mb', 'transform_workers'):
+            if getattr(self, name) < 1:
+                errors.append(f"{name} must be at least 1")
+        for name in ('postgres_max_overflow', 'postgres_pool_recycle', 'page_delay',
+                     'load_retries', 'load_retry_backoff'):
+            if getattr(self, name) < 0:
+                errors.append(f"{name} must not be negative")
+        for name in ('csv_chunk_size', 'postgres_chunk_size'):
+            if getattr(self, name) is not None and getattr(self, name) < 1:
+                errors.append(f"{name} must be at least 1")
+        if self.cache_ttl is not None and self.cache_ttl < 0:
+            errors.append("cache_ttl must not be negative")
+        if self.timeout <= 0:
+            errors.append("timeout must be positive")
+        if self.usd_to_idr <= 0:
+            errors.append("usd_to_idr must be positive")
+        if self.fx_rates_ttl < 0:
+            errors.append("fx_rates_ttl must not be negative")
+        if self.csv_compression not in CSV_COMPRESSIONS:
+            errors.append(f"csv_compression must be one of {CSV_COMPRESSIONS}")
+        if self.stream_worker_mode not in WORKER_MODES:
+            errors.append(f"stream_worker_mode must be one of {WORKER_MODES}")
+        if self.log_level.upper() not in LOG_LEVELS:
+            errors.append(f"log_level must be one of {LOG_LEVELS}")
+        if errors:
+            raise ValueError("Invalid settings: " + "; ".join(errors))
+    
+    @property
+    def postgres_url(self):
+        return (f"postgresql://{self.postgres_user}:{self.postgres_password}"
+                f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}")
+
+def _coerce(name, raw, expected):
+    """Convert a value read from a file or environment variable to the field type"""
+    optional = getattr(expected, '__args__', None)
+    if optional:
+        if raw is None or (isinstance(raw, str) and raw.strip().lower() in ('', 'none', 'null')):
+            return None
+        expected = next(arg for arg in optional if arg is not type(None))
+    
+    if expected is bool:
+        if isinstance(raw, bool):
+            return raw
+        value = str(raw).strip().lower()
+        if value in ('1', 'true', 'yes', 'on'):
+            return True
+        if value in ('0', 'false', 'no', 'off'):
+            return False
+        raise ValueError(f"Invalid boolean for {name}: {raw!r}")
+    try:
+        return expected(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid value for {name}: {raw!r}") from e
+
+def _read_settings_file(path):
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+def load_settings(path=None, environ=None):
+    """
+    Build a Settings object from defaults, a settings file and the environment
+    
+    Later sources override earlier ones: defaults < file < environment.
+    
+    Args:
+        path (str): JSON or TOML settings file (defaults to $ETL_SETTINGS_FILE)
+        environ (dict): Environment to read ETL_* variables from (defaults to os.environ)
+        
+    Returns:
+        Settings: Validated settings
+    """
+    environ = os.environ if environ is None else environ
+    path = path or environ.get(SETTINGS_FILE_ENV)
+    types = get_type_hints(Settings)
+    names = {f.name for f in fields(Settings)}
+    
+    values = {}
+    if path:
+        for key, raw in _read_settings_file(path).items():
+            name = key.lower()
+            if name not in names:
+                raise ValueError(f"Unknown setting in {path}: {key}")
+            values[name] = _coerce(name, raw, types[name])
+    
+    for name in names:
+        raw = environ.get(ENV_PREFIX + name.upper())
+        if raw is not None:
+            values[name] = _coerce(name, raw, types[name])
+    
+    return Settings(**values)
+
+_settings = None
+_settings_lock = threading.Lock()
+
+def get_settings():
+    """
+    Return the process-wide settings, loading them on first use
+    
+    Returns:
+        Settings: Settings shared by the whole pipeline
+    """
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = load_settings()
+        return _settings
+
+def configure(settings=None, **overrides):
+    """
+    Replace the process-wide settings
+    
+    Args:
+        settings (Settings): New settings (defaults to the current ones)
+        **overrides: Individual fields to change
+        
+    Returns:
+        Settings: The settings now in effect
+    """
+    global _settings
+    settings = settings or get_settings()
+    if overrides:
+        settings = replace(settings, **overrides)
+    with _settings_lock:
+        _settings = settings
+    return settings
@@ -0,0 +1,218 @@
+"""
+Intermediate artifacts between pipeline stages
+
+The raw extract and the transformed data can be written to disk so that a
+single stage can be re-run later without repeating the ones before it.
+Artifacts are replaced atomically, and an empty result never replaces the
+last good artifact.
+"""
+import os
+import glob
+import logging
+from datetime import datetime
+
+import pandas as pd
+
+from etl.transform import TRANSFORMED_DTYPES
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATTERN = "raw-*.arrow"
+
+def _ensure_parent(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+def _save_csv(df, path, kind):
+    """Write an artifact through a temporary file, skipping empty frames"""
+    from etl.load import write_csv_atomic
+    
+    if df.empty:
+        logger.warning(f"No {kind} data, keeping the previous {path}")
+        return False
+    _ensure_parent(path)
+    write_csv_atomic(df, path)
+    logger.info(f"{kind.capitalize()} data saved to {path} ({len(df)} rows)")
+    return True
+
+def _check_artifact(path, kind):
+    """Raise a clear error for a missing or empty artifact file"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No {kind} data at {path}; run the previous stage first")
+    if os.path.isfile(path) and os.path.getsize(path) == 0:
+        raise ValueError(f"The {kind} data file {path} is empty; run the previous stage again")
+
+def save_raw(df, path):
+    """
+    Save the raw extract, keeping every value as the scraped string
+    
+    Args:
+        df (pandas.DataFrame): Raw data returned by extract_data
+        path (str): Output CSV path
+        
+    Returns:
+        bool: True if the file was written (an empty extract is not saved)
+    """
+    return _save_csv(df, path, 'raw')
+
+def read_raw(path):
+    """
+    Read a raw extract saved with save_raw
+    
+    Args:
+        path (str): CSV path
+        
+    Returns:
+        pandas.DataFrame: Raw data with string columns, as extract_data returns it
+    """
+    _check_artifact(path, 'raw')
+    # Keep empty strings and values like "NA" exactly as scraped
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    logger.info(f"Raw data read from {path} ({len(df)} rows)")
+    return df
+
+def save_transformed(df, path):
+    """
+    Save transformed data
+    
+    Args:
+        df (pandas.DataFrame): Data returned by transform_data
+        path (str): Output CSV path
+        
+    Returns:
+        bool: True if the file was written (an empty result is not saved)
+    """
+    return _save_csv(df, path, 'transformed')
+
+def read_transformed(path):
+    """
+    Read transformed data saved with save_transformed
+    
+    Args:
+        path (str): CSV path, or a directory of partitions written by the
+            out-of-core transform
+        
+    Returns:
+        pandas.DataFrame: Transformed data with the transform_data column types
+    """
+    _check_artifact(path, 'transformed')
+    if os.path.isdir(path):
+        from etl.out_of_core import list_partitions, read_partitions
+        if not list_partitions(path):
+            raise ValueError(f"The transformed data directory {path} has no partitions")
+        df = read_partitions(path)
+    else:
+        df = pd.read_csv(path, dtype=TRANSFORMED_DTYPES)
+    logger.info(f"Transformed data read from {path} ({len(df)} rows)")
+    return df
+
+def reprice_transformed(path, usd_to_idr):
+    """
+    Recompute the IDR prices of saved transformed data from its Price_USD column
+    
+    Args:
+        path (str): CSV path, or a directory of out-of-core partitions
+        usd_to_idr (float): New exchange rate
+        
+    Returns:
+        int: Number of rows repriced
+    """
+    from etl.currency import convert_prices
+    
+    _check_artifact(path, 'transformed')
+    if os.path.isdir(path):
+        from etl.out_of_core import list_partitions
+        paths = list_partitions(path)
+    else:
+        paths = [path]
+    
+    rows = 0
+    for file_path in paths:
+        df = pd.read_csv(file_path, dtype=TRANSFORMED_DTYPES)
+        if 'Price_USD' not in df.columns:
+            raise ValueError(f"{file_path} has no Price_USD column; transform the raw data again")
+        # Replace each file whole, so a failure never leaves it half written
+        convert_prices(df, usd_to_idr).to_csv(file_path + '.tmp', index=False)
+        os.replace(file_path + '.tmp', file_path)
+        rows += len(df)
+    logger.info(f"Repriced {rows} rows in {path} at {usd_to_idr} IDR/USD")
+    return rows
+
+def _import_pyarrow():
+    """Import pyarrow, which is only needed for raw snapshots"""
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError("Raw snapshots require pyarrow (pip install pyarrow)") from e
+    return pa
+
+def write_snapshot(df, directory, taken_at=None, compression=None):
+    """
+    Persist a raw extract as an Arrow IPC file
+    
+    Uncompressed files (the default) can be memory-mapped by read_snapshot,
+    so replaying them costs almost nothing. The file is written under a
+    temporary name and renamed, so a crash never leaves a partial snapshot.
+    
+    Args:
+        df (pandas.DataFrame): Raw data returned by extract_data
+        directory (str): Snapshot directory
+        taken_at (datetime): Time used in the file name (defaults to now)
+        compression (str): Optional buffer compression, "lz4" or "zstd"
+        
+    Returns:
+        str: Path of the written snapshot
+    """
+    pa = _import_pyarrow()
+    
+    taken_at = taken_at or datetime.now()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"raw-{taken_at:%Y%m%dT%H%M%S}.arrow")
+    tmp_path = path + ".tmp"
+    
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    
+    logger.info(f"Raw snapshot saved to {path} ({len(df)} rows)")
+    return path
+
+def list_snapshots(directory):
+    """
+    Returns:
+        list: Snapshot paths in the directory, oldest first
+    """
+    return sorted(glob.glob(os.path.join(directory, SNAPSHOT_PATTERN)))
+
+def latest_snapshot(directory):
+    """
+    Returns:
+        str: Path of the newest snapshot, or None if there is none
+    """
+    snapshots = list_snapshots(directory)
+    return snapshots[-1] if snapshots else None
+
+def read_snapshot(path, memory_map=True):
+    """
+    Load a raw snapshot written by write_snapshot
+    
+    Args:
+        path (str): Snapshot path
+        memory_map (bool): Map the file into memory instead of reading it
+        
+    Returns:
+        pandas.DataFrame: Raw data, as extract_data returned it
+    """
+    pa = _import_pyarrow()
+    
+    source = pa.memory_map(path, 'r') if memory_map else pa.OSFile(path, 'rb')
+    with source:
+        table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas()
+    logger.info(f"Raw snapshot read from {path} ({len(df)} rows)")
+    return df
@@ -0,0 +1,179 @@
+"""
+Currency conversion for product prices
+
+Prices are scraped in USD. transform_data keeps the USD value in Price_USD
+and derives Price (IDR) from it with convert_prices, a vectorized step that
+takes the rate as an argument. A rate change therefore only needs
+convert_prices run over stored transformed data, without re-scraping or
+re-parsing anything.
+
+Rates come from a RateProvider: a fixed rate, a local JSON file or an HTTP
+service returning JSON. Both sources use the same format:
+
+    {"base": "USD", "rates": {"IDR": 16000.0}}
+
+Providers cache fetched rates for a TTL. If a refresh fails, they keep
+using the last rate they fetched.
+"""
+import json
+from abc import ABC, abstractmethod
+import logging
+import threading
+import time
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+class RateProvider(ABC):
+    """
+    Base class for exchange rate sources, with a TTL cache
+
+    Subclasses implement fetch_rates(base) returning {currency: rate}.
+
+    Args:
+        ttl (float): Seconds a fetched rate is reused before fetching again
+    """
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def fetch_rates(self, base):
+        """
+        Fetch the current rates for a base currency
+        
+        Returns:
+            dict: Currency -> units of that currency per unit of base
+        """
+
+    def get_rate(self, base, quote):
+        """
+        Return the rate converting one unit of base into quote
+
+        Raises:
+            KeyError: If the source has no rate for the pair
+        """
+        with self._lock:
+            cached = self._cache.get(base)
+            if cached is None or time.monotonic() - cached[0] >= self.ttl:
+                try:
+                    cached = (time.monotonic(), self.fetch_rates(base))
+                    self._cache[base] = cached
+                except Exception as e:
+                    if cached is None:
+                        raise
+                    logger.error(f"Error refreshing {base} exchange rates, using cached rates: {e}")
+            return float(cached[1][quote])
+
+class FixedRateProvider(RateProvider):
+    """Rates given in code or settings"""
+
+    def __init__(self, rates, base='USD', ttl=float('inf')):
+        super().__init__(ttl)
+        self.base = base
+        self.rates = dict(rates)
+
+    def fetch_rates(self, base):
+        if base != self.base:
+            raise KeyError(f"No rates for {base}")
+        return self.rates
+
+def _parse_rates(payload, base, source):
+    if payload.get('base') != base:
+        raise KeyError(f"{source} has rates for {payload.get('base')}, not {base}")
+    return payload['rates']
+
+class FileRateProvider(RateProvider):
+    """Rates read from a local JSON file, re-read after the TTL"""
+
+    def __init__(self, path, ttl=3600):
+        super().__init__(ttl)
+        self.path = path
+
+    def fetch_rates(self, base):
+        with open(self.path, encoding='utf-8') as f:
+            return _parse_rates(json.load(f), base, self.path)
+
+class ServiceRateProvider(RateProvider):
+    """
+    Rates fetched from an HTTP service returning JSON
+
+    Args:
+        url (str): Service URL; "{base}" is replaced with the base currency
+        session (requests.Session): Session to use (defaults to the shared scraper session)
+        ttl (float): Seconds a fetched rate is reused
+        timeout (float): Request timeout in seconds (defaults to the timeout setting)
+    """
+
+    def __init__(self, url, session=None, ttl=3600, timeout=None):
+        super().__init__(ttl)
+        self.url = url
+        self.session = session
+        self.timeout = get_settings().timeout if timeout is None else timeout
+
+    def fetch_rates(self, base):
+        from etl.extract import get_session
+
+        session = self.session or get_session()
+        response = session.get(self.url.format(base=base), timeout=self.timeout)
+        response.raise_for_status()
+        return _parse_rates(response.json(), base, self.url)
+
+# Providers by source, kept so their caches live across runs
+_providers = {}
+
+def get_rate_provider(settings=None):
+    """
+    Return the rate provider configured by settings.fx_rates_source
+
+    An http(s) URL uses ServiceRateProvider, any other value FileRateProvider,
+    and None the fixed settings.usd_to_idr rate.
+
+    Returns:
+        RateProvider: Provider shared by every caller with the same source
+    """
+    settings = settings or get_settings()
+    source = settings.fx_rates_source
+    key = (source, settings.fx_rates_ttl, settings.usd_to_idr, settings.timeout)
+    if key not in _providers:
+        if source is None:
+            _providers[key] = FixedRateProvider({'IDR': settings.usd_to_idr})
+        elif source.startswith(('http://', 'https://')):
+            _providers[key] = ServiceRateProvider(source, ttl=settings.fx_rates_ttl,
+                                                 timeout=settings.timeout)
+        else:
+            _providers[key] = FileRateProvider(source, ttl=settings.fx_rates_ttl)
+    return _providers[key]
+
+def get_usd_to_idr(settings=None):
+    """
+    Return the current USD to IDR rate, falling back to settings.usd_to_idr
+
+    Returns:
+        float: IDR per USD
+    """
+    settings = settings or get_settings()
+    try:
+        return get_rate_provider(settings).get_rate('USD', 'IDR')
+    except Exception as e:
+        logger.error(f"Error getting the USD/IDR rate, using {settings.usd_to_idr}: {e}")
+        return settings.usd_to_idr
+
+def convert_prices(df, rate, source='Price_USD', target='Price'):
+    """
+    Set the target price column from the source column at the given rate
+
+    Args:
+        df (pandas.DataFrame): Data with a source price column
+        rate (float): Target currency units per source unit
+        source (str): Column holding prices in the source currency
+        target (str): Column to write converted prices to
+
+    Returns:
+        pandas.DataFrame: Copy of df with the target column recomputed
+    """
+    # Round to 2 decimal places to avoid floating point issues
+    return df.assign(**{target: (df[source] * rate).round(2)})
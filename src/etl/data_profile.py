@@ -0,0 +1,306 @@
+"""
+Data-profiling stage with mergeable streaming sketches
+
+Every summary here can be updated chunk by chunk and merged with a summary
+built from another chunk, so the same code works for in-memory, chunked
+and parallel runs:
+
+- NumericSummary: count, nulls, min, max, mean and a relative-error
+  quantile sketch (DDSketch-style logarithmic buckets)
+- FrequencySummary: exact category counts (for low-cardinality columns)
+- DistinctSketch: HyperLogLog approximate distinct count
+"""
+import json
+import logging
+import math
+import os
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# Columns profiled for the transformed products data
+NUMERIC_COLUMNS = ('Price', 'Rating', 'Colors')
+QUANTILE_COLUMNS = ('Price', 'Rating')
+CATEGORY_COLUMNS = ('Size', 'Gender')
+DISTINCT_COLUMNS = ('Title',)
+
+class QuantileSketch:
+    """
+    Quantile sketch with bounded relative error
+    
+    Values are counted in logarithmic buckets, so any quantile estimate is
+    within relative_accuracy of a true value. Merging adds bucket counts.
+    """
+    
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = Counter()
+        self.negative = Counter()
+        self.zero_count = 0
+        self.count = 0
+    
+    def _bucket_counts(self, values):
+        keys, counts = np.unique(np.ceil(np.log(values) / self._log_gamma).astype(np.int64), return_counts=True)
+        return zip(keys.tolist(), counts.tolist())
+    
+    def update(self, values):
+        """
+        Add values to the sketch
+        
+        Args:
+            values (array-like): Numeric values without nulls
+        """
+        values = np.asarray(values, dtype='float64')
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.zero_count += int((values == 0).sum())
+        self.positive.update(dict(self._bucket_counts(values[values > 0])))
+        self.negative.update(dict(self._bucket_counts(-values[values < 0])))
+    
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge quantile sketches with different accuracy")
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+    
+    def _bucket_value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+    
+    def quantile(self, q):
+        """
+        Estimate a quantile
+        
+        Args:
+            q (float): Quantile between 0 and 1
+            
+        Returns:
+            float: Estimated value, or None if the sketch is empty
+        """
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+        return self._bucket_value(max(self.positive))
+
+class NumericSummary:
+    """Streaming min / max / mean (and optionally quantiles) for one column"""
+    
+    def __init__(self, quantiles=False, relative_accuracy=0.01):
+        self.count = 0
+        self.nulls = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch(relative_accuracy) if quantiles else None
+    
+    def update(self, series):
+        values = pd.to_numeric(series, errors='coerce')
+        self.nulls += int(values.isna().sum())
+        values = values.dropna().to_numpy(dtype='float64')
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.min = float(values.min()) if self.min is None else min(self.min, float(values.min()))
+        self.max = float(values.max()) if self.max is None else max(self.max, float(values.max()))
+        if self.sketch is not None:
+            self.sketch.update(values)
+    
+    def merge(self, other):
+        self.count += other.count
+        self.nulls += other.nulls
+        self.total += other.total
+        for attribute, pick in (('min', min), ('max', max)):
+            mine, theirs = getattr(self, attribute), getattr(other, attribute)
+            setattr(self, attribute, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        return self
+    
+    def to_dict(self, quantiles=DEFAULT_QUANTILES):
+        result = {
+            'count': self.count,
+            'nulls': self.nulls,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else None,
+        }
+        if self.sketch is not None and self.count:
+            # Bucket midpoints can fall just outside the observed range
+            result['quantiles'] = {
+                str(q): min(max(self.sketch.quantile(q), self.min), self.max) for q in quantiles
+            }
+        return result
+
+class FrequencySummary:
+    """Exact value counts for a low-cardinality column"""
+    
+    def __init__(self):
+        self.counts = Counter()
+        self.nulls = 0
+    
+    def update(self, series):
+        self.nulls += int(series.isna().sum())
+        self.counts.update(series.dropna().astype(str).value_counts().to_dict())
+    
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.nulls += other.nulls
+        return self
+    
+    def to_dict(self):
+        return {'nulls': self.nulls, 'frequencies': dict(self.counts.most_common())}
+
+class DistinctSketch:
+    """HyperLogLog approximate distinct count (about 1% error at precision 14)"""
+    
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+    
+    def update(self, series):
+        series = series.dropna()
+        if series.empty:
+            return
+        hashes = pd.util.hash_pandas_object(series.astype(str), index=False).to_numpy(dtype=np.uint64)
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        remaining = hashes & np.uint64((1 << (64 - p)) - 1)
+        
+        # Bit length of the remaining bits, by binary search over shifts
+        bit_length = np.zeros(remaining.shape, dtype=np.int64)
+        value = remaining.copy()
+        for shift in (32, 16, 8, 4, 2, 1):
+            mask = value >= np.uint64(1 << shift)
+            bit_length[mask] += shift
+            value[mask] >>= np.uint64(shift)
+        bit_length += (value > 0)
+        rank = ((64 - p) - bit_length + 1).astype(np.uint8)
+        
+        np.maximum.at(self.registers, index, rank)
+    
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge distinct sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+    
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.power(2.0, -self.registers.astype(np.float64))))
+        zeros = int((self.registers == 0).sum())
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+    
+    def to_dict(self):
+        return {'approx_distinct': self.estimate()}
+
+class DataProfile:
+    """Per-column statistics for the transformed products data"""
+    
+    def __init__(self, numeric=NUMERIC_COLUMNS, quantile_columns=QUANTILE_COLUMNS,
+                 categories=CATEGORY_COLUMNS, distinct=DISTINCT_COLUMNS):
+        self.rows = 0
+        self.numeric = {column: NumericSummary(quantiles=column in quantile_columns) for column in numeric}
+        self.categories = {column: FrequencySummary() for column in categories}
+        self.distinct = {column: DistinctSketch() for column in distinct}
+    
+    def _summaries(self):
+        for group in (self.numeric, self.categories, self.distinct):
+            yield from group.items()
+    
+    def update(self, df):
+        """
+        Add a chunk of transformed data to the profile
+        
+        Args:
+            df (pandas.DataFrame): Transformed rows
+        """
+        self.rows += len(df)
+        for column, summary in self._summaries():
+            if column in df.columns:
+                summary.update(df[column])
+        return self
+    
+    def merge(self, other):
+        """Combine with a profile built from another chunk"""
+        self.rows += other.rows
+        for column, summary in self._summaries():
+            for group in (other.numeric, other.categories, other.distinct):
+                if column in group:
+                    summary.merge(group[column])
+        return self
+    
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'numeric': {column: summary.to_dict() for column, summary in self.numeric.items()},
+            'categories': {column: summary.to_dict() for column, summary in self.categories.items()},
+            'distinct': {column: summary.to_dict() for column, summary in self.distinct.items()},
+        }
+
+def profile_data(df, chunk_size=100000):
+    """
+    Profile a DataFrame in one streaming pass over fixed-size chunks
+    
+    Args:
+        df (pandas.DataFrame): Transformed data
+        chunk_size (int): Rows processed at a time
+        
+    Returns:
+        DataProfile: Profile of the whole frame
+    """
+    profile = DataProfile()
+    for start in range(0, len(df), chunk_size):
+        profile.update(df.iloc[start:start + chunk_size])
+    return profile
+
+def save_profile_report(profile, report_dir, created_at=None):
+    """
+    Write a profile as a JSON report for this run
+    
+    Args:
+        profile (DataProfile): Profile to save
+        report_dir (str): Report directory
+        created_at (datetime): Time used in the file name (defaults to now)
+        
+    Returns:
+        str: Path of the written report
+    """
+    created_at = created_at or datetime.now()
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir, f"profile-{created_at:%Y%m%dT%H%M%S}.json")
+    
+    report = {'created_at': created_at.isoformat(timespec='seconds')}
+    report.update(profile.to_dict())
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    logger.info(f"Data profile saved to {path}")
+    return path
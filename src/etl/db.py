@@ -0,0 +1,75 @@
+"""
+Managed SQLAlchemy engine registry
+
+Engines are created lazily, once per URL and process, and reused across
+pipeline runs so that connection pools survive between `load_data` calls.
+All engines are disposed when the interpreter exits.
+"""
+import atexit
+import logging
+import threading
+
+from config.settings import get_settings
+from etl.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+_engines = {}
+_lock = threading.Lock()
+
+def get_engine(url, pool_size=None, max_overflow=None, pool_pre_ping=None, pool_recycle=None,
+               settings=None):
+    """
+    Return the shared engine for a connection URL, creating it on first use
+    
+    Pool options that are not given come from the pipeline settings.
+    
+    Args:
+        url (str): SQLAlchemy connection URL
+        pool_size (int): Number of connections kept open in the pool
+        max_overflow (int): Extra connections allowed above pool_size
+        pool_pre_ping (bool): Test connections for liveness before use
+        pool_recycle (int): Seconds after which a pooled connection is replaced
+        settings (Settings): Pipeline settings (defaults to the loaded settings)
+        
+    Returns:
+        sqlalchemy.engine.Engine: Pooled engine shared by all callers
+    """
+    # SQLAlchemy is imported lazily so runs without a database sink don't pay for it
+    from sqlalchemy import create_engine
+    from sqlalchemy.engine import make_url
+    
+    settings = settings or get_settings()
+    
+    with _lock:
+        engine = _engines.get(url)
+        if engine is not None:
+            return engine
+        
+        options = {
+            'pool_pre_ping': settings.postgres_pool_pre_ping if pool_pre_ping is None else pool_pre_ping,
+            'pool_recycle': settings.postgres_pool_recycle if pool_recycle is None else pool_recycle,
+        }
+        # SQLite (used for local runs and tests) does not accept pool sizing options
+        if make_url(url).get_backend_name() != 'sqlite':
+            options['pool_size'] = settings.postgres_pool_size if pool_size is None else pool_size
+            options['max_overflow'] = settings.postgres_max_overflow if max_overflow is None else max_overflow
+        
+        with stage_timer("db.create_engine"):
+            engine = create_engine(url, **options)
+        _engines[url] = engine
+        logger.info(f"Created database engine for {engine.url.render_as_string(hide_password=True)}")
+        return engine
+
+def dispose_engines():
+    """Close every pooled connection and forget all registered engines"""
+    with _lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    
+    for engine in engines:
+        engine.dispose()
+    if engines:
+        logger.info(f"Disposed {len(engines)} database engine(s)")
+
+atexit.register(dispose_engines)
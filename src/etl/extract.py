@@ -2,10 +2,16 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import logging
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 import re
 
+from config.settings import get_settings
+from etl.profiling import section
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -13,33 +19,98 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def get_page_content(page_number):
+# Shared HTTP session so connections stay alive between pages and runs
+_session = None
+
+def get_session():
     """
-    Fetch content from a specific page of the fashion-studio website
+    Return the process-wide HTTP session, creating it on first use
+    
+    Returns:
+        requests.Session: Session with connection pooling and keep-alive
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+def page_url(page_number):
+    """Return the URL of a page of the fashion-studio website"""
+    # First page uses base URL, subsequent pages use /page{number} format
+    if page_number == 1:
+        return "https://fashion-studio.dicoding.dev"
+    return f"https://fashion-studio.dicoding.dev/page{page_number}"
+
+def _cache_is_fresh(cache_path, cache_ttl):
+    """Return True if a cached page exists and is younger than cache_ttl seconds"""
+    try:
+        age = time.time() - os.path.getmtime(cache_path)
+    except OSError:
+        return False
+    return cache_ttl is None or age < cache_ttl
+
+def fetch_page_html(page_number, cache_dir=None, cache_size=None, cache_ttl=None, timeout=None):
+    """
+    Fetch the HTML of a specific page of the fashion-studio website
     
     Args:
         page_number (int): The page number to scrape
+        cache_dir (str): Directory for cached page HTML; pages found there are
+            not fetched again until they expire
+        cache_size (int): Maximum number of pages kept in cache_dir
+        cache_ttl (float): Seconds a cached page is reused; None never expires
+        timeout (float): Request timeout in seconds (defaults to the timeout setting)
         
     Returns:
-        BeautifulSoup: Parsed HTML content or None if there was an error
+        str: Page HTML or None if there was an error
     """
-    # First page uses base URL, subsequent pages use /page{number} format
-    if page_number == 1:
-        url = "https://fashion-studio.dicoding.dev"
-    else:
-        url = f"https://fashion-studio.dicoding.dev/page{page_number}"
+    url = page_url(page_number)
+    timeout = get_settings().timeout if timeout is None else timeout
+    
+    cache_path = os.path.join(cache_dir, f"page{page_number}.html") if cache_dir else None
+    if cache_path and _cache_is_fresh(cache_path, cache_ttl):
+        logger.debug("Using cached page %s", cache_path)
+        with open(cache_path, encoding='utf-8') as f:
+            return f.read()
     
     try:
         logger.info(f"Fetching URL: {url}")
-        response = requests.get(url)
+        response = get_session().get(url, timeout=timeout)
         response.raise_for_status()  # Raise an exception for HTTP errors
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        return soup
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                f.write(response.text)
+            if cache_size:
+                prune_cache(cache_dir, cache_size)
+        
+        return response.text
     except requests.RequestException as e:
         logger.error(f"Error fetching URL {url}: {e}")
         return None
 
+def get_page_content(page_number, cache_dir=None, cache_size=None, cache_ttl=None, timeout=None):
+    """
+    Fetch content from a specific page of the fashion-studio website
+    
+    Args:
+        page_number (int): The page number to scrape
+        cache_dir (str): Directory for cached page HTML; pages found there are
+            not fetched again until they expire
+        cache_size (int): Maximum number of pages kept in cache_dir
+        cache_ttl (float): Seconds a cached page is reused; None never expires
+        timeout (float): Request timeout in seconds (defaults to the timeout setting)
+        
+    Returns:
+        BeautifulSoup: Parsed HTML content or None if there was an error
+    """
+    html = fetch_page_html(page_number, cache_dir=cache_dir, cache_size=cache_size, cache_ttl=cache_ttl,
+                           timeout=timeout)
+    if html is None:
+        return None
+    return BeautifulSoup(html, 'html.parser')
+
 def parse_product_card(card):
     """
     Extract product information from a product card element
@@ -104,23 +175,109 @@ def parse_product_card(card):
         logger.error(f"Error parsing product card: {e}")
         return None
 
-def extract_data():
+def parse_page(html):
+    """
+    Parse every product card on a page
+    
+    Args:
+        html (str): Page HTML
+        
+    Returns:
+        list: Product dictionaries (empty when the page has no product cards)
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    products = []
+    for card in soup.find_all('div', class_='collection-card'):
+        product_data = parse_product_card(card)
+        if product_data:
+            products.append(product_data)
+    return products
+
+def prune_cache(cache_dir, cache_size):
+    """
+    Delete the oldest cached pages so that at most cache_size remain
+    
+    Args:
+        cache_dir (str): Page cache directory
+        cache_size (int): Number of pages to keep
+    """
+    entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith('.html')]
+    if len(entries) <= cache_size:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - cache_size]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            # Another worker already removed it
+            pass
+
+def iter_pages(fetch, total_pages, max_workers=1, delay=0.5):
+    """
+    Yield fetched pages in page order
+    
+    With max_workers > 1, pages are fetched concurrently in batches of
+    max_workers, and the delay is applied between batches instead of pages.
+    Stopping iteration early cancels pages that were not fetched yet.
+    
+    Args:
+        fetch (callable): Function taking a page number and returning its soup
+        total_pages (int): Last page number to fetch
+        max_workers (int): Number of pages fetched at the same time
+        delay (float): Seconds to wait between requests (or batches)
+        
+    Yields:
+        tuple: (page_number, soup)
+    """
+    if max_workers <= 1:
+        for page in range(1, total_pages + 1):
+            if page > 1:
+                # Add a small delay to avoid overwhelming the server
+                time.sleep(delay)
+            yield page, fetch(page)
+        return
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for start in range(1, total_pages + 1, max_workers):
+            if start > 1:
+                time.sleep(delay)
+            pages = range(start, min(start + max_workers, total_pages + 1))
+            yield from zip(pages, executor.map(fetch, pages))
+
+def extract_data(max_workers=None, cache_dir=None, settings=None):
     """
     Main function to extract data from fashion-studio website
     
+    Args:
+        max_workers (int): Number of pages fetched concurrently
+        cache_dir (str): Directory used to cache page HTML between runs
+        settings (Settings): Pipeline settings (defaults to the loaded settings);
+            also provides the page limits, delay and cache size
+    
     Returns:
         pandas.DataFrame: Raw scraped data
     """
     logger.info("Starting data extraction from fashion-studio website")
     
+    settings = settings or get_settings()
+    max_workers = max_workers or settings.max_workers
+    cache_dir = cache_dir or settings.cache_dir
+    
     all_products = []
-    total_pages = 50  # Based on the requirements
+    total_pages = settings.max_pages
+    max_products = settings.max_products
+    
+    get_page = partial(get_page_content, cache_dir=cache_dir, cache_size=settings.cache_size,
+                       cache_ttl=settings.cache_ttl, timeout=settings.timeout)
+    
+    def fetch(page):
+        with section("extract.fetch"):
+            return get_page(page)
     
     try:
-        for page in range(1, total_pages + 1):
+        for page, soup in iter_pages(fetch, total_pages, max_workers, settings.page_delay):
             logger.info(f"Scraping page {page} of {total_pages}")
             
-            soup = get_page_content(page)
             if not soup:
                 logger.warning(f"Skipping page {page} due to error")
                 continue
@@ -133,17 +290,15 @@ def extract_data():
                 break  # If no products found, likely reached end of pagination
                 
             # Parse each product card
-            for card in product_cards:
-                product_data = parse_product_card(card)
-                if product_data:
-                    all_products.append(product_data)
-            
-            # Add a small delay to avoid overwhelming the server
-            time.sleep(0.5)
+            with section("extract.parse"):
+                for card in product_cards:
+                    product_data = parse_product_card(card)
+                    if product_data:
+                        all_products.append(product_data)
             
-            # Check if we've reached 1000 products as required
-            if len(all_products) >= 1000:
-                logger.info(f"Reached 1000 products, stopping extraction")
+            # Check if we've reached the product limit (1000 as required)
+            if len(all_products) >= max_products:
+                logger.info(f"Reached {max_products} products, stopping extraction")
                 break
                 
         logger.info(f"Data extraction completed. Total products scraped: {len(all_products)}")
@@ -0,0 +1,225 @@
+"""
+Run-to-run change detection and price history
+
+Each run is compared with the last known state of every product, keyed by
+(Title, Size, Gender). Only products whose USD price, rating or colors changed,
+new products and removed products are written to an append-only history
+table, where every version carries valid_from / valid_to timestamps. The
+current state is the set of rows whose valid_to is NULL. Prices are
+compared in USD, as scraped: the IDR price follows the exchange rate, so a
+rate change alone does not open new versions.
+"""
+import logging
+from datetime import datetime
+
+import pandas as pd
+
+from config.settings import get_settings
+from etl.metrics import stage_timer
+from etl.schema import KEY_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+TRACKED_COLUMNS = ['Price_USD', 'Rating', 'Colors']
+# Stored with every version; Price (IDR at the run's rate) is not compared
+VALUE_COLUMNS = ['Price'] + TRACKED_COLUMNS
+
+# Version of the row_hash definition stored with each version. Version 1
+# (NULL in the table) hashed the IDR Price, at a fixed rate of 16000.
+HASH_VERSION = 2
+LEGACY_USD_TO_IDR = 16000
+
+def row_hashes(df):
+    """
+    Hash the tracked columns of every row
+    
+    Returns:
+        pandas.Series: Signed 64-bit hash per row (fits a BIGINT column)
+    """
+    return pd.util.hash_pandas_object(df[TRACKED_COLUMNS], index=False).astype('int64')
+
+def detect_changes(current, previous):
+    """
+    Compare the current products with the previous state using a hash join on the key
+    
+    Args:
+        current (pandas.DataFrame): Transformed data of this run
+        previous (pandas.DataFrame): Key columns and row_hash of the open versions
+        
+    Returns:
+        pandas.DataFrame: Changed products with a change_type column of
+            "insert", "update" or "delete". Deleted products only carry the key.
+    """
+    current = current.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+    current = current[KEY_COLUMNS + VALUE_COLUMNS].assign(row_hash=row_hashes(current).astype('Int64'))
+    previous = previous.astype({'row_hash': 'Int64'})
+    
+    joined = current.merge(
+        previous[KEY_COLUMNS + ['row_hash']], on=KEY_COLUMNS, how='outer',
+        suffixes=('', '_previous'), indicator=True
+    )
+    change_type = pd.Series(None, index=joined.index, dtype='object')
+    change_type[joined['_merge'] == 'left_only'] = 'insert'
+    change_type[joined['_merge'] == 'right_only'] = 'delete'
+    changed = (joined['row_hash'] != joined['row_hash_previous']).fillna(False).astype(bool)
+    change_type[(joined['_merge'] == 'both') & changed] = 'update'
+    
+    changes = joined.assign(change_type=change_type)[change_type.notna()]
+    return changes.drop(columns=['row_hash_previous', '_merge']).reset_index(drop=True)
+
+def history_table(metadata, table_name):
+    """Define the append-only history table"""
+    from sqlalchemy import BigInteger, Column, DateTime, Float, Index, Integer, String, Table, Text
+    
+    return Table(
+        table_name, metadata,
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('Title', Text, nullable=False),
+        Column('Size', String(16), nullable=False),
+        Column('Gender', String(16), nullable=False),
+        Column('Price', Float),
+        Column('Price_USD', Float),
+        Column('Rating', Float),
+        Column('Colors', Integer),
+        Column('row_hash', BigInteger),
+        Column('hash_version', Integer),
+        Column('change_type', String(8), nullable=False),
+        Column('valid_from', DateTime, nullable=False),
+        Column('valid_to', DateTime),
+        Index(f'ix_{table_name}_key', 'Title', 'Size', 'Gender', 'valid_to'),
+        Index(f'ix_{table_name}_valid_from', 'valid_from'),
+    )
+
+def _add_missing_columns(connection, table):
+    """Add columns introduced after the history table was created"""
+    from sqlalchemy import inspect
+    
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    for column in table.columns:
+        if column.name not in existing:
+            logger.info(f"Adding column {column.name} to {table.name}")
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}')
+
+def _upgrade_row_hashes(connection, table):
+    """
+    Recompute the row_hash of open versions written with an older hash definition
+    
+    Without this, the first run after a change to TRACKED_COLUMNS would see
+    every product as updated. Versions from before Price_USD was stored get
+    it from their IDR price and the fixed rate in use at the time.
+    """
+    from sqlalchemy import bindparam, or_, select
+    
+    query = select(table.c.id, table.c.Price, table.c.Price_USD, table.c.Rating, table.c.Colors).where(
+        table.c.valid_to.is_(None),
+        or_(table.c.hash_version.is_(None), table.c.hash_version != HASH_VERSION),
+    )
+    rows = pd.DataFrame(connection.execute(query).all(), columns=['id'] + VALUE_COLUMNS)
+    if rows.empty:
+        return
+    
+    logger.info(f"Recomputing the row hash of {len(rows)} open versions in {table.name}")
+    rows = rows.astype({'Price': 'float64', 'Price_USD': 'float64', 'Rating': 'float64', 'Colors': 'int64'})
+    rows['Price_USD'] = rows['Price_USD'].fillna((rows['Price'] / LEGACY_USD_TO_IDR).round(2))
+    rows['row_hash'] = row_hashes(rows)
+    connection.execute(
+        table.update().where(table.c.id == bindparam('version_id')).values(
+            Price_USD=bindparam('price_usd'), row_hash=bindparam('new_hash'), hash_version=HASH_VERSION
+        ),
+        [{'version_id': int(row.id), 'price_usd': float(row.Price_USD), 'new_hash': int(row.row_hash)}
+         for row in rows.itertuples()]
+    )
+
+def apply_changes(connection, table, changes, now):
+    """
+    Close superseded versions and append the new ones
+    
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+        table (sqlalchemy.Table): History table
+        changes (pandas.DataFrame): Output of detect_changes
+        now (datetime): Timestamp of this run
+    """
+    from sqlalchemy import and_, bindparam
+    
+    closing = changes[changes['change_type'] != 'insert']
+    if not closing.empty:
+        connection.execute(
+            table.update()
+            .where(and_(*(table.c[column] == bindparam(f'key_{column}') for column in KEY_COLUMNS)),
+                   table.c.valid_to.is_(None))
+            .values(valid_to=now),
+            [{f'key_{column}': row[column] for column in KEY_COLUMNS}
+             for row in closing[KEY_COLUMNS].to_dict('records')]
+        )
+    
+    rows = changes.assign(
+        hash_version=HASH_VERSION,
+        valid_from=now,
+        # Tombstones are closed immediately so they never count as current
+        valid_to=[now if change == 'delete' else None for change in changes['change_type']]
+    )
+    records = rows[KEY_COLUMNS + VALUE_COLUMNS + ['row_hash', 'hash_version', 'change_type',
+                                                  'valid_from', 'valid_to']]
+    records = records.astype(object).where(records.notna(), None).to_dict('records')
+    if records:
+        connection.execute(table.insert(), records)
+
+def save_price_history(df, url=None, table_name=None, settings=None, now=None):
+    """
+    Record changed products in the history table
+    
+    Args:
+        df (pandas.DataFrame): Transformed data of this run
+        url (str): Database URL (defaults to the PostgreSQL settings)
+        table_name (str): History table name (defaults to the history_table setting)
+        settings (Settings): Pipeline settings (defaults to the loaded settings)
+        now (datetime): Timestamp of this run (defaults to now)
+        
+    Returns:
+        bool: True if the history was updated
+    """
+    settings = settings or get_settings()
+    url = url or settings.postgres_url
+    table_name = table_name or settings.history_table
+    now = now or datetime.now()
+    
+    try:
+        # Check if DataFrame is empty
+        if df.empty:
+            logger.warning("Cannot record history for empty DataFrame")
+            return False
+        
+        from sqlalchemy import MetaData, select
+        from etl.db import get_engine
+        
+        engine = get_engine(url, settings=settings)
+        table = history_table(MetaData(), table_name)
+        
+        with stage_timer("history.connect"):
+            connection = engine.connect()
+        
+        with connection, connection.begin():
+            table.create(connection, checkfirst=True)
+            _add_missing_columns(connection, table)
+            _upgrade_row_hashes(connection, table)
+            
+            # Previous state: only the key and hash of the open versions are needed
+            query = select(*(table.c[column] for column in KEY_COLUMNS), table.c.row_hash).where(
+                table.c.valid_to.is_(None)
+            )
+            previous = pd.DataFrame(connection.execute(query).all(), columns=KEY_COLUMNS + ['row_hash'])
+            
+            changes = detect_changes(df, previous)
+            apply_changes(connection, table, changes, now)
+        
+        counts = changes['change_type'].value_counts().to_dict()
+        logger.info(
+            "Price history updated in %s: %d insert(s), %d update(s), %d delete(s)",
+            table_name, counts.get('insert', 0), counts.get('update', 0), counts.get('delete', 0)
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Error saving price history: {e}")
+        return False
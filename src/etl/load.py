@@ -1,13 +1,17 @@
 import pandas as pd
 import os
 import logging
+import importlib
+import io
+import shutil
+import tempfile
+from dataclasses import replace
 from datetime import datetime
 import json
-import psycopg2
-from sqlalchemy import create_engine
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+import time
+
+from config.settings import get_settings
+from etl.metrics import stage_timer
 
 # Configure logging
 logging.basicConfig(
@@ -16,13 +20,237 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def save_to_csv(df, output_path=None):
-   
-    # Import here to avoid circular imports
-    from config.settings import CSV_OUTPUT_PATH
+# Sink registry: name -> callable or "module:function" path. Paths are only
+# imported when the sink is used, so a CSV-only run never loads the Google or
+# database client libraries.
+SINKS = {}
+
+# Sinks whose writes replace all their data: name -> True, or a function of
+# (options, settings) for sinks that only replace in some modes
+REPLACING_SINKS = {}
+
+# Sinks that record when a batch was produced: name -> keyword argument
+# taking the batch timestamp
+BATCH_TIME_OPTIONS = {}
+
+def register_sink(name, target, replaces=False, batch_time=None):
+    """
+    Register a sink that load_data can write to
+    
+    Args:
+        name (str): Sink name, also used as the key in load_data results
+        target (callable or str): Function taking a DataFrame and returning
+            True on success, or a "module:function" path to such a function
+        replaces (bool or callable): Whether a write replaces everything the
+            sink holds, so only the newest spooled batch is worth replaying;
+            a callable receives (options, settings)
+        batch_time (str): Keyword argument of the save function taking the
+            time the batch was produced, passed when a spooled batch is replayed
+    """
+    SINKS[name] = target
+    REPLACING_SINKS.pop(name, None)
+    BATCH_TIME_OPTIONS.pop(name, None)
+    if replaces:
+        REPLACING_SINKS[name] = replaces
+    if batch_time:
+        BATCH_TIME_OPTIONS[name] = batch_time
+
+def get_sink(name):
+    """
+    Resolve a registered sink to its save function, importing it if needed
+    
+    Args:
+        name (str): Registered sink name
+        
+    Returns:
+        callable: Save function for the sink
+    """
+    target = SINKS.get(name)
+    if target is None:
+        raise KeyError(f"Unknown sink: {name}")
+    if isinstance(target, str):
+        module_name, function_name = target.split(':')
+        return getattr(importlib.import_module(module_name), function_name)
+    return target
+
+def _csv_compression(output_path, compression):
+    """Resolve the compression for a CSV path ("infer" looks at the extension)"""
+    if compression == 'infer':
+        if output_path.endswith('.gz'):
+            return 'gzip'
+        if output_path.endswith('.zst'):
+            return 'zstd'
+        return None
+    if compression in (False, 'none'):
+        return None
+    if compression not in (None, 'gzip', 'zstd'):
+        raise ValueError(f"Unsupported CSV compression: {compression}")
+    return compression
+
+def _open_compressed(raw, compression):
+    """Wrap a binary file so writes go through the compressor"""
+    if compression == 'gzip':
+        import gzip
+        # Appending starts a new gzip member, which readers concatenate
+        return gzip.GzipFile(fileobj=raw, mode='wb')
+    if compression == 'zstd':
+        import zstandard
+        # Likewise, appending starts a new zstd frame
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    return None
+
+class AtomicCsvWriter:
+    """
+    Write CSV rows to a temporary file and rename it over the target on commit
+    
+    In write mode readers only ever see the old or the new complete file. In
+    append mode an existing file is not rewritten: new rows are appended to
+    it in place without a header (as a new gzip member or zstd frame when
+    compressed) and synced on commit, and an aborted append truncates the
+    file back to its original size. Appends are therefore not atomic: a
+    reader opening the file while rows are being written sees them before
+    commit, possibly with a partial last line. Use it as a context manager:
+    the rows are committed when the block succeeds and discarded when it
+    raises.
+    
+    Args:
+        output_path (str): Target CSV path
+        mode (str): "w" to overwrite or "a" to append
+        compression (str): None, "gzip", "zstd" or "infer" (from extension)
+    """
+    
+    def __init__(self, output_path, mode='w', compression=None):
+        if mode not in ('w', 'a'):
+            raise ValueError(f"Unsupported CSV write mode: {mode}")
+        self.output_path = output_path
+        self.compression = _csv_compression(output_path, compression)
+        self.rows_written = 0
+        
+        exists = os.path.exists(output_path) and os.path.getsize(output_path) > 0
+        self._appending = mode == 'a' and exists
+        self._columns = None
+        self._tmp_path = None
+        if self._appending:
+            self._columns = pd.read_csv(output_path, nrows=0, compression=self.compression).columns.tolist()
+        
+        try:
+            if self._appending:
+                # O_APPEND: only the new rows are written, however large the file is
+                self._original_size = os.path.getsize(output_path)
+                self._raw = open(output_path, 'ab')
+            else:
+                directory = os.path.dirname(os.path.abspath(output_path))
+                fd, self._tmp_path = tempfile.mkstemp(
+                    dir=directory, prefix=f".{os.path.basename(output_path)}.", suffix='.tmp'
+                )
+                self._raw = os.fdopen(fd, 'wb')
+            self._compressor = _open_compressed(self._raw, self.compression)
+            self._text = io.TextIOWrapper(self._compressor or self._raw, encoding='utf-8', newline='')
+        except BaseException:
+            self.abort()
+            raise
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+    
+    def write(self, df, chunksize=None):
+        """Append the rows of df, formatting chunksize rows per write"""
+        columns = [str(column) for column in df.columns]
+        if self._columns is None:
+            self._columns = columns
+        elif columns != self._columns:
+            raise ValueError(f"Cannot append: columns differ from existing file {self.output_path}")
+        
+        step = chunksize or len(df) or 1
+        for start in range(0, len(df), step):
+            header = self.rows_written == 0 and not self._appending
+            df.iloc[start:start + step].to_csv(self._text, index=False, header=header)
+            self.rows_written += len(df.iloc[start:start + step])
+    
+    def commit(self):
+        """Flush the written rows to disk and, unless appending, rename the temporary file over the target"""
+        try:
+            self._text.flush()
+            self._text.detach()
+            if self._compressor is not None:
+                self._compressor.close()
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+            self._raw.close()
+            if self._appending:
+                return
+            
+            # Keep the permissions of the file being replaced (mkstemp creates it 0600)
+            if os.path.exists(self.output_path):
+                shutil.copymode(self.output_path, self._tmp_path)
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(self._tmp_path, 0o666 & ~umask)
+            os.replace(self._tmp_path, self.output_path)
+        except BaseException:
+            self.abort()
+            raise
+    
+    def abort(self):
+        """Discard the written rows, leaving the target as it was"""
+        raw = getattr(self, '_raw', None)
+        if raw is not None and not raw.closed:
+            raw.close()
+        if self._appending:
+            if os.path.exists(self.output_path) and os.path.getsize(self.output_path) > self._original_size:
+                os.truncate(self.output_path, self._original_size)
+        elif self._tmp_path and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+def write_csv_atomic(df, output_path, chunksize=None, mode='w', compression=None):
+    """
+    Write a DataFrame to CSV in chunks, replacing the target atomically
+    
+    See AtomicCsvWriter; the whole DataFrame is written in one commit.
+    
+    Args:
+        df (pandas.DataFrame): Data to write
+        output_path (str): Target CSV path
+        chunksize (int): Rows formatted per write; None writes in one go
+        mode (str): "w" to overwrite or "a" to append
+        compression (str): None, "gzip", "zstd" or "infer" (from extension)
+    """
+    with AtomicCsvWriter(output_path, mode=mode, compression=compression) as writer:
+        writer.write(df, chunksize=chunksize)
+
+def save_to_csv(df, output_path=None, chunksize=None, mode=None, compression=None, settings=None):
+    """
+    Save data to a CSV file
+    
+    Arguments that are not given come from the pipeline settings.
+    
+    Args:
+        df (pandas.DataFrame): Transformed data
+        output_path (str): Target path
+        chunksize (int): Rows written per chunk
+        mode (str): "w" to replace the file or "a" to append rows to it
+        compression (str): "gzip", "zstd", "infer" (from the extension), or
+            False / "none" for uncompressed output; None uses the csv_compression setting
+        settings (Settings): Pipeline settings (defaults to the loaded settings)
+        
+    Returns:
+        bool: True if the data was written
+    """
+    settings = settings or get_settings()
     
     # Use settings if not provided
-    output_path = output_path or CSV_OUTPUT_PATH
+    output_path = output_path or settings.csv_output_path
+    chunksize = chunksize or settings.csv_chunk_size
+    mode = mode or ('a' if settings.csv_append else 'w')
+    if compression is None:
+        compression = settings.csv_compression
     
     try:
         # Check if DataFrame is empty
@@ -35,27 +263,32 @@ def save_to_csv(df, output_path=None):
         if directory and not os.path.exists(directory):
             os.makedirs(directory)
             
-        df.to_csv(output_path, index=False)
-        logger.info(f"Data saved to CSV: {output_path}")
+        write_csv_atomic(df, output_path, chunksize=chunksize, mode=mode, compression=compression)
+        action = "appended" if mode == 'a' else "saved"
+        logger.info(f"Data {action} to CSV: {output_path}")
         return True
     except Exception as e:
         logger.error(f"Error saving to CSV: {e}")
         return False
 
-def save_to_google_sheets(df, spreadsheet_id=None, credentials_path=None):
+def save_to_google_sheets(df, spreadsheet_id=None, credentials_path=None, settings=None):
     
-    # Import here to avoid circular imports
-    from config.settings import GOOGLE_CREDENTIALS_PATH, GOOGLE_SPREADSHEET_ID
+    settings = settings or get_settings()
     
     # Use settings if not provided
-    credentials_path = credentials_path or GOOGLE_CREDENTIALS_PATH
-    spreadsheet_id = spreadsheet_id or GOOGLE_SPREADSHEET_ID
+    credentials_path = credentials_path or settings.google_credentials_path
+    spreadsheet_id = spreadsheet_id or settings.google_spreadsheet_id
     
     try:
         # Check if DataFrame is empty
         if df.empty:
             logger.warning("Cannot save empty DataFrame to Google Sheets")
             return False
+        
+        # Google client libraries are heavy, so only import them when this sink runs
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build
+        from googleapiclient.errors import HttpError
             
         # Check if credentials file exists
         if not os.path.exists(credentials_path):
@@ -107,21 +340,35 @@ def save_to_google_sheets(df, spreadsheet_id=None, credentials_path=None):
         return False
 
 def save_to_postgresql(df, host=None, port=None, dbname=None, 
-                      user=None, password=None, table_name=None):
-   
-    # Import here to avoid circular imports
-    from config.settings import (
-        POSTGRES_HOST, POSTGRES_PORT, POSTGRES_DB,
-        POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_TABLE
-    )
+                      user=None, password=None, table_name=None, chunksize=None,
+                      settings=None, url=None):
+    """
+    Replace the contents of the products table in PostgreSQL
+    
+    The table schema (types, primary key, indexes) is managed by etl.schema
+    and survives between runs; only the rows are replaced.
+    
+    Args:
+        df (pandas.DataFrame): Transformed data
+        host, port, dbname, user, password (str): Connection details
+        table_name (str): Products table name
+        chunksize (int): Rows per INSERT batch
+        settings (Settings): Pipeline settings (defaults to the loaded settings)
+        url (str): Full database URL, used instead of the connection details
+        
+    Returns:
+        bool: True if the data was written
+    """
+    settings = settings or get_settings()
     
     # Use settings if not provided
-    host = host or POSTGRES_HOST
-    port = port or POSTGRES_PORT
-    dbname = dbname or POSTGRES_DB
-    user = user or POSTGRES_USER
-    password = password or POSTGRES_PASSWORD
-    table_name = table_name or POSTGRES_TABLE
+    host = host or settings.postgres_host
+    port = port or settings.postgres_port
+    dbname = dbname or settings.postgres_db
+    user = user or settings.postgres_user
+    password = password or settings.postgres_password
+    table_name = table_name or settings.postgres_table
+    chunksize = chunksize or settings.postgres_chunk_size
     
     try:
         # Check if DataFrame is empty
@@ -129,36 +376,182 @@ def save_to_postgresql(df, host=None, port=None, dbname=None,
             logger.warning("Cannot save empty DataFrame to PostgreSQL")
             return False
             
-        # Create connection string
-        connection_string = f"postgresql://{user}:{password}@{host}:{port}/{dbname}"
+        from etl.db import get_engine
+        from etl.schema import ensure_schema, replace_products
+        
+        if url is None:
+            url = replace(settings, postgres_host=host, postgres_port=port, postgres_db=dbname,
+                          postgres_user=user, postgres_password=password).postgres_url
+        
+        # Reuse the pooled engine for this database (created on first use)
+        engine = get_engine(url, settings=settings)
         
-        # Create engine
-        engine = create_engine(connection_string)
+        with stage_timer("postgresql.connect"):
+            connection = engine.connect()
         
         # Save data to PostgreSQL
-        df.to_sql(table_name, engine, if_exists='replace', index=False)
+        with connection, connection.begin():
+            table = ensure_schema(connection, table_name)
+            rows = replace_products(connection, table, df, chunksize=chunksize)
         
-        logger.info(f"Data saved to PostgreSQL: {dbname}.{table_name}")
+        logger.info(f"Data saved to PostgreSQL: {dbname}.{table_name} ({rows} rows)")
         return True
     except Exception as e:
         logger.error(f"Error saving to PostgreSQL: {e}")
         return False
 
-def load_data(df, save_csv=True, save_sheets=True, save_postgres=True):
-   
-    results = {}
+def _csv_replaces(options, settings):
+    """The CSV sink replaces its file unless it appends"""
+    settings = options.get('settings') or settings or get_settings()
+    return (options.get('mode') or ('a' if settings.csv_append else 'w')) == 'w'
+
+register_sink('csv', 'etl.load:save_to_csv', replaces=_csv_replaces)
+register_sink('google_sheets', 'etl.load:save_to_google_sheets', replaces=True)
+register_sink('postgresql', 'etl.load:save_to_postgresql', replaces=True)
+register_sink('history', 'etl.history:save_price_history', batch_time='now')
+register_sink('local_db', 'etl.local_db:save_to_local_db')
+
+def sink_replaces(name, options, settings=None):
+    """
+    Returns:
+        bool: True if a write to the sink replaces everything it holds
+    """
+    replaces = REPLACING_SINKS.get(name, False)
+    return replaces(options, settings) if callable(replaces) else bool(replaces)
+
+def write_with_retry(name, save, df, options, retries=0, backoff=1.0):
+    """
+    Call a sink's save function until it succeeds or the retries run out
     
-    # Save to CSV
-    if save_csv:
-        results['csv'] = save_to_csv(df)
+    A sink that raises instead of returning False is treated as a failed
+    attempt, so one broken sink cannot stop the others from being written.
+    
+    Args:
+        name (str): Sink name, for logging
+        save (callable): Sink save function
+        df (pandas.DataFrame): Data to write
+        options (dict): Keyword arguments for save
+        retries (int): Attempts after the first one
+        backoff (float): Seconds before the first retry, doubled for each further retry
         
-    # Save to Google Sheets
-    if save_sheets:
-        results['google_sheets'] = save_to_google_sheets(df)
+    Returns:
+        bool: True if an attempt succeeded
+    """
+    for attempt in range(retries + 1):
+        if attempt:
+            delay = backoff * 2 ** (attempt - 1)
+            logger.warning(f"Retrying sink {name} in {delay:.1f}s (retry {attempt} of {retries})")
+            time.sleep(delay)
+        try:
+            if save(df, **options):
+                return True
+        except Exception as e:
+            logger.error(f"Error in sink {name}: {e}")
+    return False
+
+def replay_spool(name, save, options, spool_dir, retries=0, backoff=1.0):
+    """
+    Write a sink's spooled batches, oldest first, deleting each one that succeeds
+    
+    Replay stops at the first batch that still fails, so batches keep their order.
+    Sinks registered with batch_time are given the time each batch was produced.
+    
+    Returns:
+        bool: True if the spool for the sink is now empty
+    """
+    from etl.spool import list_spooled, read_spooled, spooled_at
+    
+    batch_time = BATCH_TIME_OPTIONS.get(name)
+    for path in list_spooled(spool_dir, name):
+        logger.info(f"Replaying spooled batch {path}")
+        batch_options = {**options, batch_time: spooled_at(path)} if batch_time else options
+        if not write_with_retry(name, save, read_spooled(path), batch_options, retries, backoff):
+            logger.error(f"Replay of {path} failed, keeping it in the spool")
+            return False
+        os.remove(path)
+    return True
+
+def load_data(df, save_csv=True, save_sheets=True, save_postgres=True, sinks=None,
+              sink_options=None, settings=None, retries=None, backoff=None, spool_dir=None,
+              spool_max_batches=None):
+    """
+    Write the transformed data to every enabled sink
+    
+    Each sink is written independently: a failing sink is retried with
+    exponential backoff and, when spool_dir is given, its batch is spooled
+    after the last attempt and replayed at the start of the next load. If
+    the replay fails, the new batch is spooled behind the old ones instead
+    of being written, so batches always reach the sink in order. Sinks that
+    replace their data are not replayed: every write supersedes the batches
+    before it, so a successful write clears the spool and a failed one
+    leaves only the newest batch in it.
+    
+    Args:
+        df (pandas.DataFrame): Transformed data
+        save_csv (bool): Write to the CSV sink
+        save_sheets (bool): Write to the Google Sheets sink
+        save_postgres (bool): Write to the PostgreSQL sink
+        sinks (list): Names of additional registered sinks to write to
+        sink_options (dict): Sink name -> keyword arguments for its save function
+        settings (Settings): Settings passed on to every sink (sinks fall back
+            to the loaded settings when this is not given)
+        retries (int): Retries per sink after a failed write (default: none)
+        backoff (float): Seconds before the first retry (default: 1)
+        spool_dir (str): Dead-letter directory for batches that still fail;
+            None disables spooling and replay
+        spool_max_batches (int): Spooled batches kept per sink (default: no limit)
         
-    # Save to PostgreSQL
-    if save_postgres:
-        results['postgresql'] = save_to_postgresql(df)
+    Returns:
+        dict: Sink name -> True if the write succeeded
+    """
+    enabled = [
+        name for name, flag in (
+            ('csv', save_csv),
+            ('google_sheets', save_sheets),
+            ('postgresql', save_postgres),
+        ) if flag
+    ]
+    enabled.extend(sinks or [])
+    
+    sink_options = sink_options or {}
+    retries = retries or 0
+    backoff = 1.0 if backoff is None else backoff
+    
+    results = {}
+    for name in enabled:
+        with stage_timer(f"load.{name}"):
+            options = dict(sink_options.get(name, {}))
+            if settings is not None:
+                options.setdefault('settings', settings)
+            save = get_sink(name)
+            replaces = sink_replaces(name, options, settings)
+            max_batches = 1 if replaces else spool_max_batches
+            
+            # An empty batch fails every sink; there is nothing to retry or spool
+            if df.empty:
+                results[name] = save(df, **options)
+                continue
+            
+            if not spool_dir:
+                results[name] = write_with_retry(name, save, df, options, retries, backoff)
+                continue
+            
+            from etl.spool import spool_batch, prune_spool, clear_spool
+            
+            # Older batches must reach the sink first, or they would overwrite newer data
+            if not replaces and not replay_spool(name, save, options, spool_dir, retries, backoff):
+                logger.error(f"Sink {name} still has spooled batches, spooling this batch behind them")
+                results[name] = False
+            else:
+                results[name] = write_with_retry(name, save, df, options, retries, backoff)
+            
+            if results[name]:
+                if replaces:
+                    clear_spool(spool_dir, name)
+            else:
+                spool_batch(df, spool_dir, name)
+                if max_batches:
+                    prune_spool(spool_dir, name, max_batches)
         
     return results
 
@@ -0,0 +1,117 @@
+"""
+Embedded local database sink
+
+Writes the transformed data into a SQLite or DuckDB file, so scraped data
+can be queried locally without a database server. The file type is chosen
+by extension: ".duckdb" uses DuckDB, anything else SQLite. Both use the
+products schema from etl.schema (primary key on (Title, Size, Gender),
+indexes on Gender, Size and Price) and upsert: new products are inserted,
+existing ones updated, and products from earlier runs are kept.
+"""
+import logging
+import os
+
+from config.settings import get_settings
+from etl.schema import KEY_COLUMNS, PRODUCT_COLUMNS, INDEXED_COLUMNS, product_frame
+
+logger = logging.getLogger(__name__)
+
+DUCKDB_EXTENSIONS = ('.duckdb', '.ddb')
+
+def _import_duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("DuckDB files require the duckdb package (pip install duckdb)") from e
+    return duckdb
+
+def _upsert_sqlite(df, path, table_name, chunksize, settings):
+    from etl.db import get_engine
+    from etl.schema import ensure_schema, upsert_products
+    
+    engine = get_engine(f"sqlite:///{os.path.abspath(path)}", settings=settings)
+    with engine.begin() as connection:
+        table = ensure_schema(connection, table_name)
+        return upsert_products(connection, table, df, chunksize=chunksize)
+
+# DuckDB column types for the products schema
+DUCKDB_COLUMNS = {
+    'Title': 'VARCHAR NOT NULL',
+    'Price': 'DECIMAL(14, 2) NOT NULL',
+    'Price_USD': 'DECIMAL(12, 2)',
+    'Rating': 'DOUBLE NOT NULL',
+    'Colors': 'SMALLINT NOT NULL',
+    'Size': 'VARCHAR NOT NULL',
+    'Gender': 'VARCHAR NOT NULL',
+    'timestamp': 'TIMESTAMP',
+}
+
+def _upsert_duckdb(df, path, table_name):
+    duckdb = _import_duckdb()
+    quote = lambda name: f'"{name}"'
+    columns = ', '.join(quote(column) for column in PRODUCT_COLUMNS)
+    updates = ', '.join(
+        f'{quote(column)} = excluded.{quote(column)}' for column in PRODUCT_COLUMNS if column not in KEY_COLUMNS
+    )
+    
+    rows = product_frame(df)
+    with duckdb.connect(path) as connection:
+        connection.execute(
+            f'CREATE TABLE IF NOT EXISTS {quote(table_name)} ('
+            + ', '.join(f'{quote(column)} {DUCKDB_COLUMNS[column]}' for column in PRODUCT_COLUMNS)
+            + f', PRIMARY KEY ({", ".join(quote(column) for column in KEY_COLUMNS)}))'
+        )
+        # Files created before Price_USD existed
+        connection.execute(
+            f'ALTER TABLE {quote(table_name)} ADD COLUMN IF NOT EXISTS "Price_USD" {DUCKDB_COLUMNS["Price_USD"]}'
+        )
+        for column in INDEXED_COLUMNS:
+            connection.execute(
+                f'CREATE INDEX IF NOT EXISTS ix_{table_name}_{column.lower()} ON {quote(table_name)} ({quote(column)})'
+            )
+        # DuckDB scans the DataFrame's columns directly, without a row-by-row insert
+        connection.register('incoming_products', rows)
+        connection.execute(
+            f'INSERT INTO {quote(table_name)} ({columns}) SELECT {columns} FROM incoming_products '
+            f'ON CONFLICT DO UPDATE SET {updates}'
+        )
+        connection.unregister('incoming_products')
+    return len(rows)
+
+def save_to_local_db(df, path=None, table_name=None, chunksize=None, settings=None):
+    """
+    Upsert the transformed data into a local SQLite or DuckDB file
+    
+    Args:
+        df (pandas.DataFrame): Transformed data
+        path (str): Database file; ".duckdb" / ".ddb" selects DuckDB
+        table_name (str): Products table name
+        chunksize (int): Rows per INSERT batch (SQLite only)
+        settings (Settings): Pipeline settings (defaults to the loaded settings)
+        
+    Returns:
+        bool: True if the data was written
+    """
+    settings = settings or get_settings()
+    path = path or settings.local_db_path
+    table_name = table_name or settings.postgres_table
+    
+    try:
+        if df.empty:
+            logger.warning("Cannot save empty DataFrame to the local database")
+            return False
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        if path.endswith(DUCKDB_EXTENSIONS):
+            rows = _upsert_duckdb(df, path, table_name)
+        else:
+            rows = _upsert_sqlite(df, path, table_name, chunksize, settings)
+        
+        logger.info(f"Data saved to local database: {path} ({rows} rows)")
+        return True
+    except Exception as e:
+        logger.error(f"Error saving to local database: {e}")
+        return False
@@ -0,0 +1,61 @@
+"""
+Stage metrics for the ETL pipeline
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_metrics = {}
+_lock = threading.Lock()
+
+def record_duration(name, seconds):
+    """
+    Add a timing sample to the named metric
+    
+    Args:
+        name (str): Metric name, e.g. "extract" or "postgresql.connect"
+        seconds (float): Duration of the measured operation
+    """
+    with _lock:
+        metric = _metrics.setdefault(name, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+        metric['count'] += 1
+        metric['total_seconds'] += seconds
+        metric['max_seconds'] = max(metric['max_seconds'], seconds)
+
+@contextmanager
+def stage_timer(name):
+    """
+    Context manager that records how long the wrapped block took
+    
+    Args:
+        name (str): Metric name to record the duration under
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_duration(name, time.perf_counter() - start)
+
+def get_metrics():
+    """
+    Returns:
+        dict: Copy of the collected metrics keyed by metric name
+    """
+    with _lock:
+        return {name: dict(values) for name, values in _metrics.items()}
+
+def reset_metrics():
+    """Clear all collected metrics (called at the start of each pipeline run)"""
+    with _lock:
+        _metrics.clear()
+
+def log_metrics():
+    """Log a one-line summary for every collected metric"""
+    for name, values in sorted(get_metrics().items()):
+        logger.info(
+            "Stage %s: %d call(s), %.3fs total, %.3fs max",
+            name, values['count'], values['total_seconds'], values['max_seconds']
+        )
@@ -0,0 +1,192 @@
+"""
+Out-of-core transform for raw data larger than memory
+
+The raw CSV is read and transformed in chunks. Cleaning and validation only
+look at one row at a time, so chunks can be transformed independently; only
+the global drop_duplicates needs to see every row. For that, each
+transformed chunk is hash-partitioned on its full row and spilled to disk,
+so duplicates always land in the same partition. Each partition is then
+deduplicated on its own, keeping the row that came first in the input, and
+written to the output directory. At no point is more than one chunk or one
+partition in memory.
+
+Every output row keeps its position in the raw input in a source_row
+column. read_partitions uses it to restore the order and index of
+transform_data, so both paths give the same frame.
+
+A chunk that fails to transform fails the whole run, so a partial result
+is never written. The partitions are written to a sibling directory that
+replaces the output directory only once all of them are complete, so a
+failure in either pass leaves the previous output untouched. The swap takes
+two renames: a reader between them finds no output directory rather than a
+mix of old and new partitions. Only the transform is
+bounded by the memory budget: loading the result (read_transformed) reads
+every partition into one frame, as the sinks write a whole batch at once.
+"""
+import os
+import glob
+import math
+import logging
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from etl.transform import transform_data, TRANSFORMED_DTYPES
+
+logger = logging.getLogger(__name__)
+
+ROW_COLUMN = 'source_row'
+PARTITION_PATTERN = "part-*.csv"
+
+# Memory used while transforming a row, relative to the row's size as read.
+# transform_data keeps a few copies of the frame alive at once.
+WORKING_SET_FACTOR = 4
+SAMPLE_ROWS = 1000
+
+def plan_chunks(raw_path, memory_budget):
+    """
+    Choose a chunk size and partition count that keep memory within a budget
+
+    The row size in memory and on disk is estimated from the first rows of
+    the file.
+
+    Args:
+        raw_path (str): Raw CSV path
+        memory_budget (int): Bytes available for transform data
+
+    Returns:
+        tuple: (rows per chunk, number of partitions)
+    """
+    sample = pd.read_csv(raw_path, dtype=str, keep_default_na=False, nrows=SAMPLE_ROWS)
+    if sample.empty:
+        return SAMPLE_ROWS, 1
+    row_bytes = sample.memory_usage(deep=True, index=False).sum() / len(sample) * WORKING_SET_FACTOR
+
+    with open(raw_path, 'rb') as f:
+        f.readline()
+        sample_bytes = sum(len(f.readline()) for _ in range(len(sample)))
+    estimated_rows = os.path.getsize(raw_path) / max(sample_bytes / len(sample), 1)
+
+    chunk_rows = max(int(memory_budget // row_bytes), 1)
+    partitions = max(math.ceil(estimated_rows * row_bytes / memory_budget), 1)
+    return chunk_rows, partitions
+
+def _partition_numbers(df, partitions):
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashes % np.uint64(partitions)
+
+def _append_csv(df, path):
+    df.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+def _read_spilled(path):
+    return pd.read_csv(path, dtype={**TRANSFORMED_DTYPES, ROW_COLUMN: 'int64'}, keep_default_na=False)
+
+def _swap_directory(new_dir, target):
+    """Move new_dir to target, replacing the directory that was there"""
+    if not os.path.exists(target):
+        os.replace(new_dir, target)
+        return
+    old_dir = new_dir + '.old'
+    os.replace(target, old_dir)
+    try:
+        os.replace(new_dir, target)
+    except BaseException:
+        os.replace(old_dir, target)
+        raise
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+def transform_out_of_core(raw_path, output_dir, memory_budget, spill_dir=None,
+                          chunk_rows=None, partitions=None, usd_to_idr=None):
+    """
+    Transform a raw CSV in chunks and write the result as partition files
+
+    Args:
+        raw_path (str): Raw CSV saved with save_raw
+        output_dir (str): Directory for the part-NNNNN.csv output files;
+            an existing directory is replaced as a whole once the new
+            partitions are complete
+        memory_budget (int): Bytes available for transform data
+        spill_dir (str): Parent directory for the temporary hash partitions
+            (defaults to the system temporary directory)
+        chunk_rows (int): Rows per chunk (default: derived from the budget)
+        partitions (int): Number of partitions (default: derived from the budget)
+        usd_to_idr (float): Exchange rate passed to transform_data
+
+    Returns:
+        int: Number of rows written
+    """
+    planned_rows, planned_partitions = plan_chunks(raw_path, memory_budget)
+    chunk_rows = chunk_rows or planned_rows
+    partitions = partitions or planned_partitions
+    logger.info(f"Transforming {raw_path} out of core: {chunk_rows} rows per chunk, {partitions} partitions")
+
+    if spill_dir:
+        os.makedirs(spill_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=spill_dir, prefix='transform-spill-') as spill:
+        # Pass 1: transform each chunk and spill its rows to their hash partition
+        reader = pd.read_csv(raw_path, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+        for chunk in reader:
+            transformed = transform_data(chunk, usd_to_idr, raise_errors=True)
+            if transformed.empty:
+                continue
+            numbers = _partition_numbers(transformed, partitions)
+            transformed = transformed.rename_axis(ROW_COLUMN).reset_index()
+            for number in np.unique(numbers):
+                _append_csv(transformed[numbers == number], os.path.join(spill, f"part-{number:05d}.csv"))
+
+        # Pass 2: deduplicate every partition on its own, into a sibling
+        # directory that is swapped in once every partition is written
+        output_dir = os.path.abspath(output_dir)
+        parent = os.path.dirname(output_dir)
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=parent, prefix=f".{os.path.basename(output_dir)}.")
+        try:
+            # mkdtemp creates the directory 0700; keep the permissions of the one being replaced
+            shutil.copymode(output_dir if os.path.isdir(output_dir) else parent, staging)
+            rows = 0
+            for path in sorted(glob.glob(os.path.join(spill, PARTITION_PATTERN))):
+                partition = _read_spilled(path)
+                duplicated = partition.drop(columns=ROW_COLUMN).duplicated()
+                if duplicated.any():
+                    logger.info("Removing %d duplicate rows from %s", duplicated.sum(), os.path.basename(path))
+                partition = partition[~duplicated]
+                partition.to_csv(os.path.join(staging, os.path.basename(path)), index=False)
+                rows += len(partition)
+            _swap_directory(staging, output_dir)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    logger.info(f"Out-of-core transform completed. {rows} products written to {output_dir}")
+    return rows
+
+def list_partitions(output_dir):
+    """
+    Returns:
+        list: Partition files written by transform_out_of_core
+    """
+    return sorted(glob.glob(os.path.join(glob.escape(output_dir), PARTITION_PATTERN)))
+
+def iter_partitions(output_dir):
+    """
+    Yield the output partitions one at a time
+
+    Yields:
+        pandas.DataFrame: Transformed rows, indexed by their raw input position
+    """
+    for path in list_partitions(output_dir):
+        yield _read_spilled(path).set_index(ROW_COLUMN).rename_axis(None)
+
+def read_partitions(output_dir):
+    """
+    Read all output partitions into one frame, in raw input order
+
+    Returns:
+        pandas.DataFrame: The frame transform_data would return for the whole input
+    """
+    parts = list(iter_partitions(output_dir))
+    if not parts:
+        return pd.DataFrame(columns=list(TRANSFORMED_DTYPES)).astype(TRANSFORMED_DTYPES)
+    return pd.concat(parts).sort_index()
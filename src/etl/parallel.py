@@ -0,0 +1,190 @@
+"""
+Multi-core transform over a process pool
+
+The raw frame is split into contiguous partitions that are transformed by
+worker processes. Partitions and results cross the process boundary as
+Arrow IPC streams in shared memory, so DataFrames are never pickled and
+piped through the pool. Workers deduplicate only within their partition.
+The merged result is deduplicated again globally, keeping the first
+occurrence in input order, so it equals what transform_data returns for
+the whole frame. A partition that fails to transform fails the whole call.
+
+The pool is created on first use and kept for the life of the process, so
+scheduled runs do not pay the worker start-up cost again.
+"""
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pandas as pd
+
+from etl.transform import transform_data, TRANSFORMED_DTYPES
+
+logger = logging.getLogger(__name__)
+
+# Partitions smaller than this are not worth a round trip to a worker
+MIN_PARTITION_ROWS = 10000
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError("The parallel transform requires pyarrow (pip install pyarrow)") from e
+    return pa
+
+def to_shared_memory(df):
+    """
+    Write a DataFrame to a new shared memory block as an Arrow IPC stream
+
+    The caller owns the block and must unlink it.
+
+    Returns:
+        tuple: (block name, stream size in bytes)
+    """
+    pa = _import_pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    
+    def write(sink):
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    
+    # Measure the stream first, then write it straight into the block
+    counter = pa.MockOutputStream()
+    write(counter)
+    size = counter.size()
+    
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        buffer = pa.py_buffer(block.buf)
+        write(pa.FixedSizeBufferWriter(buffer))
+        del buffer
+    finally:
+        block.close()
+    return block.name, size
+
+def from_shared_memory(name, size, unlink=False):
+    """
+    Read a DataFrame written with to_shared_memory
+
+    Args:
+        name (str): Shared memory block name
+        size (int): Stream size in bytes
+        unlink (bool): Free the block after reading it
+
+    Returns:
+        pandas.DataFrame: Data that does not reference the block
+    """
+    pa = _import_pyarrow()
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        # Arrow reads the stream in place and to_pandas copies the columns
+        # into pandas blocks. The index is handed over without a copy, so
+        # copy it (one column) to stop it referencing the block.
+        buffer = pa.py_buffer(block.buf)
+        table = pa.ipc.open_stream(buffer.slice(0, size)).read_all()
+        df = table.to_pandas()
+        df.index = df.index.copy(deep=True)
+        del table, buffer
+    finally:
+        block.close()
+        if unlink:
+            block.unlink()
+    return df
+
+def _unlink(name):
+    block = shared_memory.SharedMemory(name=name)
+    block.close()
+    block.unlink()
+
+def _transform_partition(name, size, usd_to_idr):
+    """Worker: transform one partition from shared memory into a new block"""
+    # Errors are raised to the parent instead of coming back as an empty partition
+    result = transform_data(from_shared_memory(name, size), usd_to_idr, raise_errors=True)
+    return to_shared_memory(result)
+
+def get_pool(workers):
+    """
+    Return the process pool, creating it on first use or when the worker count changes
+
+    Returns:
+        ProcessPoolExecutor: Pool of spawned worker processes
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            # Spawned workers do not inherit the parent's threads or locks
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+def shutdown_pool():
+    """Stop the worker processes (called at interpreter exit)"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+        _pool_workers = None
+
+atexit.register(shutdown_pool)
+
+def transform_parallel(df, workers, min_partition_rows=MIN_PARTITION_ROWS, usd_to_idr=None):
+    """
+    Transform a raw frame on several cores
+
+    Args:
+        df (pandas.DataFrame): Raw data returned by extract_data
+        workers (int): Worker processes
+        min_partition_rows (int): Smallest partition worth sending to a worker;
+            small frames are transformed in this process
+        usd_to_idr (float): Exchange rate passed to transform_data
+
+    Returns:
+        pandas.DataFrame: Same result as transform_data(df)
+    """
+    partitions = min(workers, len(df) // max(min_partition_rows, 1))
+    if partitions <= 1:
+        return transform_data(df, usd_to_idr)
+
+    logger.info(f"Transforming {len(df)} rows in {partitions} partitions on {workers} workers")
+    bounds = [len(df) * i // partitions for i in range(partitions + 1)]
+    pool = get_pool(workers)
+
+    inputs, futures, results = [], [], []
+    try:
+        for start, end in zip(bounds, bounds[1:]):
+            inputs.append(to_shared_memory(df.iloc[start:end]))
+            futures.append(pool.submit(_transform_partition, *inputs[-1], usd_to_idr))
+        for future in futures:
+            results.append(from_shared_memory(*future.result(), unlink=True))
+    except BaseException:
+        # Free the results of partitions that finished but were not read
+        for future in futures[len(results):]:
+            try:
+                name, _ = future.result()
+            except Exception:
+                continue
+            _unlink(name)
+        raise
+    finally:
+        for name, _ in inputs:
+            _unlink(name)
+
+    merged = pd.concat([result for result in results if not result.empty] or results[:1])
+    duplicated = merged.duplicated()
+    if duplicated.any():
+        logger.info("Removing %d duplicate rows across partitions", duplicated.sum())
+        merged = merged[~duplicated]
+    if merged.empty and merged.columns.empty:
+        return merged
+    return merged.astype(TRANSFORMED_DTYPES)
@@ -0,0 +1,168 @@
+"""
+Opt-in cProfile / tracemalloc capture for pipeline stages
+
+A Profiler wraps each pipeline stage and writes, per stage, a cProfile dump
+(`<stage>.prof`, readable with pstats or snakeviz), the top functions by
+cumulative time (`<stage>.txt`) and the top allocation sites
+(`<stage>.alloc.txt`) to a run directory.
+
+With detail enabled, hot sections inside a stage (page fetch, card parsing)
+are profiled into their own accumulated dumps. Sections only profile on the
+thread that runs the stage; sections on pool threads are not captured.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Profiler used by section(); set while a profiled pipeline run is active
+_active_profiler = None
+
+class Profiler:
+    """Collect per-stage profiles and allocation reports for one pipeline run"""
+    
+    def __init__(self, run_dir, top_n=25, detail=False, traceback_frames=1):
+        """
+        Args:
+            run_dir (str): Directory the reports are written to
+            top_n (int): Number of functions / allocation sites per report
+            detail (bool): Also profile hot sections inside stages
+            traceback_frames (int): Frames stored per allocation by tracemalloc
+        """
+        self.run_dir = run_dir
+        self.top_n = top_n
+        self.detail = detail
+        self.traceback_frames = traceback_frames
+        self._sections = {}
+        self._stage_profile = None
+        self._stage_thread = None
+        self._started_tracemalloc = False
+        os.makedirs(run_dir, exist_ok=True)
+    
+    @classmethod
+    def for_run(cls, profile_dir, **kwargs):
+        """Create a profiler writing into a new timestamped directory under profile_dir"""
+        run_dir = os.path.join(profile_dir, f"run-{datetime.now():%Y%m%dT%H%M%S}")
+        return cls(run_dir, **kwargs)
+    
+    @contextmanager
+    def stage(self, name):
+        """
+        Profile a pipeline stage with cProfile and tracemalloc
+        
+        Args:
+            name (str): Stage name, used for the report file names
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_frames)
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        
+        profile = cProfile.Profile()
+        self._stage_profile = profile
+        self._stage_thread = threading.get_ident()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - start
+            self._stage_profile = None
+            self._stage_thread = None
+            
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            self._write_profile(name, profile)
+            self._write_allocations(name, before, after, peak, elapsed)
+    
+    @contextmanager
+    def section(self, name):
+        """
+        Profile a hot section inside a stage, accumulating across calls
+        
+        The stage's own profile is paused meanwhile, so section time shows
+        up in the section dump rather than twice.
+        
+        Args:
+            name (str): Section name, e.g. "extract.fetch"
+        """
+        if not self.detail or threading.get_ident() != self._stage_thread:
+            yield
+            return
+        
+        profile = self._sections.setdefault(name, cProfile.Profile())
+        stage_profile = self._stage_profile
+        stage_profile.disable()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            stage_profile.enable()
+    
+    def close(self):
+        """Write the accumulated section profiles and stop tracemalloc"""
+        for name, profile in self._sections.items():
+            self._write_profile(name, profile)
+        self._sections.clear()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        logger.info(f"Profiling reports written to {self.run_dir}")
+    
+    def _write_profile(self, name, profile):
+        profile.dump_stats(os.path.join(self.run_dir, f"{name}.prof"))
+        
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(self.top_n)
+        with open(os.path.join(self.run_dir, f"{name}.txt"), 'w') as f:
+            f.write(stream.getvalue())
+    
+    def _write_allocations(self, name, before, after, peak, elapsed):
+        differences = after.compare_to(before, 'lineno')
+        lines = [
+            f"Stage: {name}",
+            f"Wall time: {elapsed:.3f}s",
+            f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB",
+            f"Top {self.top_n} allocation sites (net change during the stage):",
+        ]
+        lines.extend(str(difference) for difference in differences[:self.top_n])
+        with open(os.path.join(self.run_dir, f"{name}.alloc.txt"), 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+@contextmanager
+def activate(profiler):
+    """Make profiler the target of section() calls for the duration of the block"""
+    global _active_profiler
+    previous = _active_profiler
+    _active_profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _active_profiler = previous
+        profiler.close()
+
+def section(name):
+    """
+    Mark a hot section for detailed profiling
+    
+    Returns a no-op context manager unless a profiler with detail enabled is
+    active, so this is cheap to leave in hot paths.
+    
+    Args:
+        name (str): Section name
+    """
+    if _active_profiler is None:
+        return nullcontext()
+    return _active_profiler.section(name)
@@ -0,0 +1,119 @@
+"""
+Aggregated data-quality logging
+
+Cleaning functions report bad values through report_issue(). Inside a
+collect() block the issues are only counted, per rule and per distinct
+value, and the caller emits a single summary for the whole chunk. Outside
+a collect() block each issue is logged individually, formatted lazily.
+"""
+import logging
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+_active_report = ContextVar('active_quality_report', default=None)
+
+class QualityReport:
+    """Counts of data-quality issues per rule and per distinct value"""
+    
+    def __init__(self, max_distinct=100, top_values=3):
+        """
+        Args:
+            max_distinct (int): Distinct values tracked per rule; values beyond
+                this are only counted in the rule total
+            top_values (int): Most frequent values shown per rule in the summary
+        """
+        self.max_distinct = max_distinct
+        self.top_values = top_values
+        self.counts = Counter()
+        self.values = defaultdict(Counter)
+    
+    def record(self, rule, value=None, count=1):
+        """
+        Count an issue
+        
+        Args:
+            rule (str): Rule that flagged the value, e.g. "price.no_numeric"
+            value: The offending value
+            count (int): Number of occurrences
+        """
+        self.counts[rule] += count
+        values = self.values[rule]
+        key = repr(value)
+        if key in values or len(values) < self.max_distinct:
+            values[key] += count
+    
+    def merge(self, other):
+        """Add the counts of another report (e.g. from a parallel chunk)"""
+        for rule, count in other.counts.items():
+            self.counts[rule] += count
+        for rule, values in other.values.items():
+            for key, count in values.items():
+                if key in self.values[rule] or len(self.values[rule]) < self.max_distinct:
+                    self.values[rule][key] += count
+        return self
+    
+    def total(self):
+        return sum(self.counts.values())
+    
+    def summary(self):
+        """
+        Returns:
+            str: One-line description of all issues, most frequent rules first
+        """
+        parts = []
+        for rule, count in self.counts.most_common():
+            top = ', '.join(f"{value} x{n}" for value, n in self.values[rule].most_common(self.top_values))
+            parts.append(f"{rule}={count} (top: {top})")
+        return '; '.join(parts)
+    
+    def emit(self, log=logger, level=logging.WARNING, label="chunk"):
+        """
+        Log one summary line for the collected issues
+        
+        Args:
+            log (logging.Logger): Logger to write to
+            level (int): Log level of the summary
+            label (str): What the summary covers, e.g. "chunk" or "run"
+        """
+        if not self.counts or not log.isEnabledFor(level):
+            return
+        log.log(level, "Data quality issues in %s: %d value(s) across %d rule(s): %s",
+                label, self.total(), len(self.counts), self.summary())
+
+@contextmanager
+def collect(report=None):
+    """
+    Aggregate issues reported inside the block instead of logging each one
+    
+    Args:
+        report (QualityReport): Report to add to (a new one by default)
+        
+    Yields:
+        QualityReport: The report collecting the issues
+    """
+    report = report if report is not None else QualityReport()
+    token = _active_report.set(report)
+    try:
+        yield report
+    finally:
+        _active_report.reset(token)
+
+def report_issue(log, rule, message, value, level=logging.WARNING):
+    """
+    Report a bad value found while cleaning
+    
+    Args:
+        log (logging.Logger): Logger used when no collect() block is active
+        rule (str): Rule name used for aggregation
+        message (str): %-style message with one placeholder for the value
+        value: The offending value
+        level (int): Log level for individually logged issues
+    """
+    report = _active_report.get()
+    if report is not None:
+        report.record(rule, value)
+    elif log.isEnabledFor(level):
+        log.log(level, message, value)
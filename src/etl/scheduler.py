@@ -0,0 +1,221 @@
+"""
+Resident scheduler for periodic pipeline runs
+
+Running the pipeline from cron pays interpreter start-up, heavy imports and
+client construction on every run. The scheduler keeps one process alive so
+HTTP sessions, database pools and caches stay warm between runs.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# (minimum, maximum) for each of the five cron fields
+CRON_FIELD_RANGES = [
+    (0, 59),  # minute
+    (0, 23),  # hour
+    (1, 31),  # day of month
+    (1, 12),  # month
+    (0, 7),   # day of week (0 and 7 are both Sunday)
+]
+
+def parse_cron_field(field, minimum, maximum):
+    """
+    Expand a single cron field into the set of values it matches
+    
+    Supports "*", single values, ranges ("1-5"), steps ("*/15", "0-30/10")
+    and comma separated lists of those.
+    
+    Args:
+        field (str): Cron field expression
+        minimum (int): Smallest allowed value for the field
+        maximum (int): Largest allowed value for the field
+        
+    Returns:
+        set: Matching integer values
+    """
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_str = part.split('/', 1)
+            step = int(step_str)
+            if step <= 0:
+                raise ValueError(f"Invalid step in cron field: '{field}'")
+        
+        if part == '*':
+            start, end = minimum, maximum
+        elif '-' in part:
+            start_str, end_str = part.split('-', 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(part)
+            end = maximum if step > 1 else start
+        
+        if start < minimum or end > maximum or start > end:
+            raise ValueError(f"Cron field '{field}' out of range {minimum}-{maximum}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronSchedule:
+    """Standard five-field cron expression (minute hour day month weekday)"""
+    
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: '{expression}'")
+        
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            parse_cron_field(field, minimum, maximum)
+            for field, (minimum, maximum) in zip(fields, CRON_FIELD_RANGES)
+        ]
+        # Cron counts Sunday as 0 (or 7), Python's weekday() counts Monday as 0
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self.day_restricted = fields[2] != '*'
+        self.weekday_restricted = fields[4] != '*'
+    
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = moment.weekday() in self.weekdays
+        # Like cron, a restricted day-of-month and day-of-week match if either does
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+    
+    def next_after(self, after):
+        """
+        Find the first matching minute strictly after a given time
+        
+        Args:
+            after (datetime): Reference time
+            
+        Returns:
+            datetime: Next time the expression fires
+        """
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        
+        while moment < limit:
+            if moment.month not in self.months:
+                year, month = divmod(moment.month, 12)
+                moment = moment.replace(year=moment.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+class Scheduler:
+    """
+    Run a job periodically in a long-lived process
+    
+    Each run happens in a worker thread. When a tick arrives while the
+    previous run is still going, that tick is skipped instead of starting an
+    overlapping run.
+    """
+    
+    def __init__(self, job, interval=None, cron=None):
+        """
+        Args:
+            job (callable): Function called with no arguments for every run
+            interval (float): Seconds between run starts
+            cron (str): Cron expression; used instead of interval when given
+        """
+        if (interval is None) == (cron is None):
+            raise ValueError("Provide exactly one of interval or cron")
+        if interval is not None and interval <= 0:
+            raise ValueError("Interval must be positive")
+        
+        self.job = job
+        self.interval = interval
+        self.cron = CronSchedule(cron) if cron is not None else None
+        self.runs_started = 0
+        self.runs_skipped = 0
+        self._run_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._worker = None
+    
+    def next_run_time(self, now):
+        """
+        Returns:
+            datetime: When the next run should start
+        """
+        if self.cron is not None:
+            return self.cron.next_after(now)
+        return now + timedelta(seconds=self.interval)
+    
+    def is_running(self):
+        """Return True while a run is in progress"""
+        return self._run_lock.locked()
+    
+    def trigger(self):
+        """
+        Start a run in the background unless one is already in progress
+        
+        Returns:
+            bool: True if a run was started, False if it was skipped
+        """
+        if not self._run_lock.acquire(blocking=False):
+            self.runs_skipped += 1
+            logger.warning("Previous pipeline run still in progress, skipping this run")
+            return False
+        
+        self.runs_started += 1
+        self._worker = threading.Thread(target=self._run_job, name="etl-run", daemon=True)
+        self._worker.start()
+        return True
+    
+    def _run_job(self):
+        start = time.perf_counter()
+        try:
+            self.job()
+        except Exception as e:
+            logger.error(f"Scheduled pipeline run failed: {e}", exc_info=True)
+        finally:
+            self._run_lock.release()
+            logger.info(f"Scheduled run finished in {time.perf_counter() - start:.1f}s")
+    
+    def run_forever(self, run_immediately=True):
+        """
+        Block and trigger runs on schedule until stop() is called
+        
+        Args:
+            run_immediately (bool): Start a run right away instead of waiting
+                for the first scheduled time
+        """
+        logger.info(f"Scheduler started ({self.describe()})")
+        next_run = datetime.now() if run_immediately else self.next_run_time(datetime.now())
+        
+        while not self._stop_event.is_set():
+            delay = (next_run - datetime.now()).total_seconds()
+            if delay > 0:
+                self._stop_event.wait(delay)
+                continue
+            
+            self.trigger()
+            # Schedule from the planned time so runs don't drift
+            next_run = self.next_run_time(next_run)
+            if next_run <= datetime.now():
+                next_run = self.next_run_time(datetime.now())
+            logger.info(f"Next pipeline run at {next_run:%Y-%m-%d %H:%M:%S}")
+        
+        # Let an in-flight run finish before returning
+        if self._worker is not None:
+            self._worker.join()
+        logger.info("Scheduler stopped")
+    
+    def stop(self):
+        """Ask run_forever() to return after the current run completes"""
+        self._stop_event.set()
+    
+    def describe(self):
+        if self.cron is not None:
+            return f"cron '{self.cron.expression}'"
+        return f"every {self.interval}s"
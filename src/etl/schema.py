@@ -0,0 +1,199 @@
+"""
+Schema management for the products table
+
+The PostgreSQL sink owns its table through explicit DDL instead of letting
+pandas infer one: proper column types, a primary key on
+(Title, Size, Gender) and indexes on the columns dashboards filter by.
+Changes to the schema are applied as numbered migrations recorded in a
+schema_migrations table, so indexes survive between runs and existing
+tables gain new columns in place.
+"""
+import logging
+from datetime import datetime
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ['Title', 'Size', 'Gender']
+PRODUCT_COLUMNS = ['Title', 'Price', 'Price_USD', 'Rating', 'Colors', 'Size', 'Gender', 'timestamp']
+INDEXED_COLUMNS = ['Gender', 'Size', 'Price']
+
+def products_table(metadata, table_name):
+    """Define the products table"""
+    from sqlalchemy import (
+        Column, DateTime, Float, Index, Numeric, PrimaryKeyConstraint, SmallInteger, String, Table, Text
+    )
+    
+    return Table(
+        table_name, metadata,
+        Column('Title', Text, nullable=False),
+        Column('Price', Numeric(14, 2, asdecimal=False), nullable=False),
+        Column('Price_USD', Numeric(12, 2, asdecimal=False)),
+        Column('Rating', Float, nullable=False),
+        Column('Colors', SmallInteger, nullable=False),
+        Column('Size', String(16), nullable=False),
+        Column('Gender', String(16), nullable=False),
+        Column('timestamp', DateTime),
+        PrimaryKeyConstraint(*KEY_COLUMNS, name=f'pk_{table_name}'),
+        *(Index(f'ix_{table_name}_{column.lower()}', column) for column in INDEXED_COLUMNS),
+    )
+
+def migrations_table(metadata):
+    """Define the table recording applied migrations"""
+    from sqlalchemy import Column, DateTime, Integer, PrimaryKeyConstraint, String, Table
+    
+    return Table(
+        'schema_migrations', metadata,
+        Column('table_name', String(128), nullable=False),
+        Column('version', Integer, nullable=False),
+        Column('description', String(255), nullable=False),
+        Column('applied_at', DateTime, nullable=False),
+        PrimaryKeyConstraint('table_name', 'version'),
+    )
+
+def _create_products_table(connection, table_name):
+    from sqlalchemy import MetaData, inspect
+    
+    inspector = inspect(connection)
+    if inspector.has_table(table_name):
+        # Tables created by pandas' to_sql have no primary key; their contents
+        # were replaced on every run anyway, so recreate them with the proper schema
+        if not inspector.get_pk_constraint(table_name).get('constrained_columns'):
+            logger.info(f"Replacing schema-less table {table_name}")
+            connection.exec_driver_sql(f'DROP TABLE "{table_name}"')
+    products_table(MetaData(), table_name).create(connection, checkfirst=True)
+
+def _add_price_usd_column(connection, table_name):
+    from sqlalchemy import inspect
+    
+    # Tables created by migration 1 after Price_USD was added already have it
+    columns = {column['name'] for column in inspect(connection).get_columns(table_name)}
+    if 'Price_USD' not in columns:
+        connection.exec_driver_sql(f'ALTER TABLE "{table_name}" ADD COLUMN "Price_USD" NUMERIC(12, 2)')
+
+# (version, description, function(connection, table_name)), applied in order
+MIGRATIONS = [
+    (1, "create products table with primary key and indexes", _create_products_table),
+    (2, "add Price_USD column", _add_price_usd_column),
+]
+
+def ensure_schema(connection, table_name):
+    """
+    Apply pending migrations for a products table
+    
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+        table_name (str): Products table name
+        
+    Returns:
+        sqlalchemy.Table: The products table
+    """
+    from sqlalchemy import MetaData, select
+    
+    metadata = MetaData()
+    migrations = migrations_table(metadata)
+    migrations.create(connection, checkfirst=True)
+    
+    applied = set(connection.execute(
+        select(migrations.c.version).where(migrations.c.table_name == table_name)
+    ).scalars())
+    
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        logger.info(f"Applying migration {version} to {table_name}: {description}")
+        migrate(connection, table_name)
+        connection.execute(migrations.insert().values(
+            table_name=table_name, version=version, description=description, applied_at=datetime.now()
+        ))
+    
+    return products_table(metadata, table_name)
+
+def product_frame(df):
+    """
+    Prepare transformed rows for insertion, as a DataFrame
+    
+    Rows with a duplicate key keep the last occurrence, as the primary key
+    allows only one row per product. Frames transformed before Price_USD
+    existed get NULL for it.
+    
+    Returns:
+        pandas.DataFrame: PRODUCT_COLUMNS with timestamps parsed
+    """
+    rows = df.reindex(columns=PRODUCT_COLUMNS).drop_duplicates(subset=KEY_COLUMNS, keep='last')
+    if len(rows) < len(df):
+        logger.info("Dropping %d rows with a duplicate (Title, Size, Gender) key", len(df) - len(rows))
+    return rows.assign(timestamp=pd.to_datetime(rows['timestamp'], errors='coerce'))
+
+def product_records(df):
+    """
+    Prepare transformed rows for insertion, as row dictionaries
+    
+    See product_frame.
+    
+    Returns:
+        list: Row dictionaries with database-ready values
+    """
+    rows = product_frame(df)
+    rows = rows.astype(object).where(rows.notna(), None)
+    return rows.to_dict('records')
+
+def _batches(records, chunksize):
+    step = chunksize or len(records) or 1
+    for start in range(0, len(records), step):
+        yield records[start:start + step]
+
+def replace_products(connection, table, df, chunksize=None):
+    """
+    Replace the contents of the products table, keeping its schema and indexes
+    
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+        table (sqlalchemy.Table): Products table
+        df (pandas.DataFrame): Transformed data
+        chunksize (int): Rows per INSERT batch; None inserts everything at once
+        
+    Returns:
+        int: Number of rows written
+    """
+    records = product_records(df)
+    connection.execute(table.delete())
+    for batch in _batches(records, chunksize):
+        connection.execute(table.insert(), batch)
+    return len(records)
+
+def upsert_products(connection, table, df, chunksize=None):
+    """
+    Insert new products and update existing ones by (Title, Size, Gender)
+    
+    Products missing from df are left in the table. Supported on PostgreSQL
+    and SQLite, which both implement INSERT ... ON CONFLICT.
+    
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+        table (sqlalchemy.Table): Products table
+        df (pandas.DataFrame): Transformed data
+        chunksize (int): Rows per INSERT batch; None inserts everything at once
+        
+    Returns:
+        int: Number of rows written
+    """
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Upsert is not supported for {dialect} databases")
+    
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={column: statement.excluded[column] for column in PRODUCT_COLUMNS if column not in KEY_COLUMNS},
+    )
+    
+    records = product_records(df)
+    for batch in _batches(records, chunksize):
+        connection.execute(statement, batch)
+    return len(records)
@@ -0,0 +1,101 @@
+"""
+Dead-letter spool for failed sink writes
+
+When a sink still fails after its retries, the batch is written to the
+spool directory as a gzip-compressed CSV named after the sink and the time
+the batch was produced. The next load replays spooled batches, oldest
+first, before writing its own data, so a sink outage does not lose a run
+and nothing has to be scraped again.
+"""
+import os
+import glob
+import logging
+from datetime import datetime
+
+import pandas as pd
+
+from etl.transform import TRANSFORMED_DTYPES
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIX = ".csv.gz"
+TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+def spool_batch(df, spool_dir, sink, created_at=None):
+    """
+    Write a batch that a sink failed to store to the spool
+
+    Args:
+        df (pandas.DataFrame): Transformed data
+        spool_dir (str): Spool directory
+        sink (str): Name of the sink the batch is for
+        created_at (datetime): Timestamp used in the file name (defaults to now)
+
+    Returns:
+        str: Path of the spooled batch
+    """
+    from etl.load import write_csv_atomic
+
+    os.makedirs(spool_dir, exist_ok=True)
+    created_at = created_at or datetime.now()
+    path = os.path.join(spool_dir, f"{sink}-{created_at.strftime(TIME_FORMAT)}{SPOOL_SUFFIX}")
+    write_csv_atomic(df, path, compression='gzip')
+    logger.warning(f"Spooled {len(df)} rows for sink {sink} to {path}")
+    return path
+
+def list_spooled(spool_dir, sink):
+    """
+    List the spooled batches of a sink, oldest first
+
+    Returns:
+        list: Paths of spooled batches (empty if the spool does not exist)
+    """
+    if not spool_dir:
+        return []
+    return sorted(glob.glob(os.path.join(glob.escape(spool_dir), f"{glob.escape(sink)}-*{SPOOL_SUFFIX}")))
+
+def spooled_at(path):
+    """
+    Return the time a spooled batch was produced
+    
+    Returns:
+        datetime: The created_at timestamp given to spool_batch
+    """
+    name = os.path.basename(path)[:-len(SPOOL_SUFFIX)]
+    return datetime.strptime(name.rsplit('-', 1)[1], TIME_FORMAT)
+
+def read_spooled(path):
+    """
+    Read a spooled batch
+
+    Returns:
+        pandas.DataFrame: Transformed data with the transform_data column types
+    """
+    return pd.read_csv(path, dtype=TRANSFORMED_DTYPES, compression='gzip')
+
+def clear_spool(spool_dir, sink):
+    """
+    Delete every spooled batch of a sink, once a newer write has superseded them
+    
+    Returns:
+        list: Paths of the deleted batches
+    """
+    spooled = list_spooled(spool_dir, sink)
+    for path in spooled:
+        logger.info(f"Dropping spooled batch {path}, superseded by the current write")
+        os.remove(path)
+    return spooled
+
+def prune_spool(spool_dir, sink, max_batches):
+    """
+    Delete the oldest spooled batches of a sink so at most max_batches remain
+
+    Returns:
+        list: Paths of the deleted batches
+    """
+    spooled = list_spooled(spool_dir, sink)
+    dropped = spooled[:max(len(spooled) - max_batches, 0)]
+    for path in dropped:
+        logger.warning(f"Spool for sink {sink} keeps {max_batches} batch(es), dropping {path}")
+        os.remove(path)
+    return dropped
@@ -0,0 +1,324 @@
+"""
+Streaming pipeline with bounded queues between stages
+
+The batch pipeline runs extract, transform and load one after another, so
+the network is idle while data is transformed and vice versa. Here pages
+flow through fetch -> parse -> transform -> sink workers connected by
+bounded queues: every stage works on a different page at the same time,
+and a full queue blocks the stage feeding it, so a fast scraper cannot run
+ahead of a slow sink and buffer the whole site in memory.
+
+Shutdown is sentinel based: after the last item each stage passes a
+sentinel downstream once all of its workers have finished. The first
+exception in any worker stops every stage and is raised from run().
+"""
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from config.settings import get_settings
+from etl.metrics import stage_timer
+from etl.currency import get_usd_to_idr
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+SENTINEL = object()
+
+class StageError(RuntimeError):
+    """Raised by StagedPipeline.run when a stage worker fails"""
+
+    def __init__(self, stage, error):
+        super().__init__(f"Stage {stage} failed: {error}")
+        self.stage = stage
+
+class Stage:
+    """
+    One step of a StagedPipeline
+
+    Args:
+        name (str): Stage name, used in metrics and errors
+        func (callable): Called with each input item; its return value is
+            passed downstream, and None drops the item
+        workers (int): Items processed concurrently
+        mode (str): "thread" runs func in worker threads, "process" in a
+            process pool (func and items must be picklable)
+    """
+
+    def __init__(self, name, func, workers=1, mode='thread'):
+        if workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker")
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"Unsupported stage mode: {mode}")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.mode = mode
+
+class StagedPipeline:
+    """
+    Run items through stages connected by bounded queues
+
+    Args:
+        stages (list): Stage objects, in order
+        queue_size (int): Items buffered between two stages
+        poll_interval (float): Seconds between checks for a stopped pipeline
+            while waiting on a queue
+    """
+
+    def __init__(self, stages, queue_size=8, poll_interval=0.1):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.processed = {stage.name: 0 for stage in self.stages}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._error = None
+
+    def cancel(self):
+        """Stop all stages; items still queued are dropped"""
+        self._stop.set()
+
+    def _fail(self, stage, error):
+        with self._lock:
+            if self._error is None:
+                logger.error(f"Stage {stage} failed: {error}")
+                self._error = StageError(stage, error)
+                self._error.__cause__ = error
+        self._stop.set()
+
+    def _put(self, channel, item):
+        """Block until item is queued; False if the pipeline was stopped"""
+        while not self._stop.is_set():
+            try:
+                channel.put(item, timeout=self.poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, channel):
+        """Block until an item arrives; SENTINEL if the pipeline was stopped"""
+        while not self._stop.is_set():
+            try:
+                return channel.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+        return SENTINEL
+
+    def _produce(self, items, outbox):
+        try:
+            for item in items:
+                if not self._put(outbox, item):
+                    return
+        except Exception as e:
+            self._fail('source', e)
+            return
+        self._put(outbox, SENTINEL)
+
+    def _work(self, stage, inbox, outbox, executor, remaining):
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is SENTINEL:
+                    # Leave the sentinel for the stage's other workers
+                    self._put(inbox, SENTINEL)
+                    break
+                with stage_timer(f"stream.{stage.name}"):
+                    if executor is not None:
+                        result = executor.submit(stage.func, item).result()
+                    else:
+                        result = stage.func(item)
+                with self._lock:
+                    self.processed[stage.name] += 1
+                if result is not None and not self._put(outbox, result):
+                    break
+        except Exception as e:
+            self._fail(stage.name, e)
+        finally:
+            with self._lock:
+                remaining[stage.name] -= 1
+                last = remaining[stage.name] == 0
+            if last:
+                self._put(outbox, SENTINEL)
+
+    def run(self, items):
+        """
+        Feed items through every stage
+
+        Args:
+            items (iterable): Input of the first stage; consumed in a thread
+
+        Returns:
+            list: Non-None results of the last stage
+        """
+        channels = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        remaining = {stage.name: stage.workers for stage in self.stages}
+        executors = []
+        threads = [threading.Thread(target=self._produce, args=(items, channels[0]),
+                                    name="stream-source", daemon=True)]
+
+        for index, stage in enumerate(self.stages):
+            executor = None
+            if stage.mode == 'process':
+                # Worker processes are spawned, as forking a multi-threaded process is unsafe
+                executor = ProcessPoolExecutor(max_workers=stage.workers,
+                                               mp_context=multiprocessing.get_context('spawn'))
+                executors.append(executor)
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(stage, channels[index], channels[index + 1], executor, remaining),
+                    name=f"stream-{stage.name}-{worker}", daemon=True
+                ))
+
+        results = []
+        try:
+            for thread in threads:
+                thread.start()
+            while True:
+                item = self._get(channels[-1])
+                if item is SENTINEL:
+                    break
+                results.append(item)
+        finally:
+            # Release workers still waiting on a queue (after cancel or an error)
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            for executor in executors:
+                executor.shutdown(cancel_futures=True)
+
+        if self._error is not None:
+            raise self._error
+        return results
+
+def iter_page_numbers(total_pages, delay=0.0):
+    """Yield page numbers, waiting delay seconds between them to limit the request rate"""
+    for page in range(1, total_pages + 1):
+        if page > 1 and delay:
+            time.sleep(delay)
+        yield page
+
+def transform_records(records, usd_to_idr=None):
+    """
+    Transform the products parsed from one page
+
+    Returns:
+        pandas.DataFrame: Transformed rows, or None when nothing is left
+    """
+    from etl.transform import transform_data
+
+    if not records:
+        return None
+    transformed = transform_data(pd.DataFrame(records), usd_to_idr)
+    return transformed if not transformed.empty else None
+
+class CsvStreamSink:
+    """
+    Append transformed chunks to one CSV file as they arrive
+
+    Rows already written by an earlier chunk are skipped, like the batch
+    pipeline's drop_duplicates, and writing stops after max_rows rows. All
+    chunks go to one temporary file that replaces the target on commit.
+
+    Args:
+        output_path (str): Target CSV path
+        mode (str): "w" to replace the file or "a" to append to it
+        compression (str): None, "gzip", "zstd" or "infer" (from extension)
+        max_rows (int): Rows to write before the sink reports it is full
+    """
+
+    def __init__(self, output_path, mode='w', compression=None, max_rows=None):
+        from etl.load import AtomicCsvWriter
+
+        self.writer = AtomicCsvWriter(output_path, mode=mode, compression=compression)
+        self.max_rows = max_rows
+        self._seen = set()
+
+    @property
+    def full(self):
+        return self.max_rows is not None and self.writer.rows_written >= self.max_rows
+
+    def write(self, df):
+        """Write the new rows of df; returns the number of rows written"""
+        hashes = pd.util.hash_pandas_object(df, index=False)
+        new = ~hashes.duplicated() & ~hashes.isin(self._seen)
+        df = df[new.to_numpy()]
+        if self.max_rows is not None:
+            df = df.iloc[:max(self.max_rows - self.writer.rows_written, 0)]
+        self._seen.update(hashes[new].iloc[:len(df)])
+        self.writer.write(df)
+        return len(df)
+
+def run_streaming_pipeline(settings=None, output_path=None):
+    """
+    Scrape, transform and write products to CSV as a streaming pipeline
+
+    Pages are fetched by settings.max_workers threads, parsed and transformed
+    by settings.stream_parse_workers / stream_transform_workers workers
+    (threads or processes, see stream_worker_mode) and appended to the CSV
+    sink by a single writer. Rows reach the CSV in completion order, not page
+    order, and max_products limits the rows written.
+
+    Args:
+        settings (Settings): Pipeline settings (defaults to the loaded settings)
+        output_path (str): CSV path (defaults to settings.csv_output_path)
+
+    Returns:
+        int: Number of rows written
+    """
+    from etl.extract import fetch_page_html, parse_page
+
+    settings = settings or get_settings()
+    output_path = output_path or settings.csv_output_path
+
+    def fetch(page):
+        return fetch_page_html(page, cache_dir=settings.cache_dir, cache_size=settings.cache_size,
+                               cache_ttl=settings.cache_ttl, timeout=settings.timeout)
+
+    sink = CsvStreamSink(
+        output_path,
+        mode='a' if settings.csv_append else 'w',
+        compression=settings.csv_compression,
+        max_rows=settings.max_products,
+    )
+
+    def write(df):
+        sink.write(df)
+        if sink.full:
+            logger.info(f"Reached {settings.max_products} products, stopping the pipeline")
+            pipeline.cancel()
+
+    mode = settings.stream_worker_mode
+    pipeline = StagedPipeline([
+        Stage('fetch', fetch, workers=settings.max_workers),
+        Stage('parse', parse_page, settings.stream_parse_workers, mode),
+        Stage('transform', partial(transform_records, usd_to_idr=get_usd_to_idr(settings)),
+              settings.stream_transform_workers, mode),
+        Stage('sink', write),
+    ], queue_size=settings.stream_queue_size)
+
+    logger.info("Starting streaming pipeline")
+    try:
+        pipeline.run(iter_page_numbers(settings.max_pages, settings.page_delay))
+    except BaseException:
+        sink.writer.abort()
+        raise
+    
+    # Like the batch CSV sink, never replace the file with an empty one
+    if not sink.writer.rows_written:
+        sink.writer.abort()
+        logger.warning("Streaming pipeline produced no rows, CSV not written")
+        return 0
+    sink.writer.commit()
+
+    logger.info(f"Streaming pipeline completed: {sink.writer.rows_written} rows written to {output_path}")
+    return sink.writer.rows_written
@@ -0,0 +1,181 @@
+"""
+Deterministic synthetic data for load testing
+
+Generates raw frames shaped like the output of extract_data, and the
+matching product pages, at any scale. The same seed always produces the
+same data. Clean values follow the distributions of the real site (prices
+of $50-$550, ratings of 3.0-5.0, sizes S-XXL). The dirty values handled by
+the clean_* functions and transform_data, such as "Unknown Product",
+"Price Unavailable", "Invalid Rating" and exact duplicate rows, are mixed
+in at configurable rates. Columns are built with numpy array operations,
+so a million rows take a few seconds.
+"""
+import os
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RAW_COLUMNS = ['Title', 'Price', 'Rating', 'Colors', 'Size', 'Gender', 'timestamp']
+
+CATEGORIES = ['T-shirt', 'Jacket', 'Hoodie', 'Pants', 'Outerwear', 'Crewneck']
+SIZES = ['S', 'M', 'L', 'XL', 'XXL']
+GENDERS = ['Men', 'Women', 'Unisex']
+COLOR_COUNTS = [1, 2, 3, 4, 5]
+COLOR_WEIGHTS = [0.05, 0.1, 0.7, 0.1, 0.05]
+
+# Share of rows carrying each kind of dirty value
+DIRTY_RATES = {
+    'unknown_title': 0.02,
+    'price_unavailable': 0.02,
+    'invalid_rating': 0.03,
+    'not_rated': 0.01,
+    'unknown_size': 0.01,
+    'unknown_gender': 0.01,
+    'duplicate': 0.05,
+}
+
+# Products per page on the real site
+CARDS_PER_PAGE = 20
+
+CARD_TEMPLATE = """<div class="collection-card">
+    <div class="product-details">
+        <h3 class="product-title">{Title}</h3>
+        <div class="price-container"><span class="price">{Price}</span></div>
+        <p style="font-size: 14px; color: #777;">Rating: {Rating}</p>
+        <p style="font-size: 14px; color: #777;">{Colors}</p>
+        <p style="font-size: 14px; color: #777;">{Size}</p>
+        <p style="font-size: 14px; color: #777;">{Gender}</p>
+    </div>
+</div>
+"""
+
+def _with_dirty(rng, values, rate, dirty_value):
+    """Replace a random share of values with dirty_value"""
+    if rate:
+        values[rng.random(len(values)) < rate] = dirty_value
+    return values
+
+def generate_raw(n_rows, seed=0, dirty_rates=None, start=None):
+    """
+    Generate a raw frame shaped like the output of extract_data
+
+    Args:
+        n_rows (int): Number of rows
+        seed (int): Random seed; the same seed gives the same frame
+        dirty_rates (dict): Overrides for DIRTY_RATES
+        start (datetime): Scrape time of the first page (default 2024-01-01);
+            each later page is one second later
+
+    Returns:
+        pandas.DataFrame: String columns as scraped
+    """
+    rates = {**DIRTY_RATES, **(dirty_rates or {})}
+    rng = np.random.default_rng(seed)
+    start = start or datetime(2024, 1, 1)
+
+    numbers = np.arange(1, n_rows + 1)
+    categories = np.asarray(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), n_rows)]
+    titles = _with_dirty(rng, categories + ' ' + numbers.astype(str).astype(object),
+                         rates['unknown_title'], 'Unknown Product')
+
+    # Columns with few distinct values index into a vocabulary of formatted strings
+    price_vocabulary = np.array([f"${cents / 100:.2f}" for cents in range(5000, 55000)], dtype=object)
+    prices = _with_dirty(rng, price_vocabulary[rng.integers(0, len(price_vocabulary), n_rows)],
+                         rates['price_unavailable'], 'Price Unavailable')
+
+    rating_vocabulary = np.array([f"⭐ {tenths / 10:.1f} / 5" for tenths in range(30, 51)], dtype=object)
+    ratings = rating_vocabulary[rng.integers(0, len(rating_vocabulary), n_rows)]
+    ratings = _with_dirty(rng, ratings, rates['invalid_rating'], 'Invalid Rating')
+    ratings = _with_dirty(rng, ratings, rates['not_rated'], 'Not Rated')
+
+    color_vocabulary = np.array([f"{count} Colors" for count in COLOR_COUNTS], dtype=object)
+    colors = color_vocabulary[rng.choice(len(COLOR_COUNTS), n_rows, p=COLOR_WEIGHTS)]
+    size_vocabulary = np.array([f"Size: {size}" for size in SIZES], dtype=object)
+    sizes = _with_dirty(rng, size_vocabulary[rng.integers(0, len(SIZES), n_rows)],
+                        rates['unknown_size'], 'Size: Unknown')
+    gender_vocabulary = np.array([f"Gender: {gender}" for gender in GENDERS], dtype=object)
+    genders = _with_dirty(rng, gender_vocabulary[rng.integers(0, len(GENDERS), n_rows)],
+                          rates['unknown_gender'], 'Gender: Unknown')
+
+    # One timestamp per page, as the scraper stamps a page's cards together
+    n_pages = (n_rows + CARDS_PER_PAGE - 1) // CARDS_PER_PAGE
+    page_times = pd.date_range(start, periods=max(n_pages, 1), freq='s').strftime('%Y-%m-%d %H:%M:%S')
+    timestamps = np.asarray(page_times, dtype=object)[(numbers - 1) // CARDS_PER_PAGE]
+
+    df = pd.DataFrame({
+        'Title': titles, 'Price': prices, 'Rating': ratings, 'Colors': colors,
+        'Size': sizes, 'Gender': genders, 'timestamp': timestamps,
+    }, columns=RAW_COLUMNS)
+
+    # Exact copies of other rows, which transform_data drops
+    duplicates = np.flatnonzero(rng.random(n_rows) < rates['duplicate'])
+    if len(duplicates):
+        sources = rng.integers(0, n_rows, len(duplicates))
+        df.iloc[duplicates] = df.iloc[sources].to_numpy()
+    return df
+
+def render_page(df):
+    """
+    Render rows as a product page of the fashion-studio website
+
+    Returns:
+        str: Page HTML that parse_page turns back into the same rows
+    """
+    cards = ''.join(CARD_TEMPLATE.format(**row) for row in df.to_dict('records'))
+    return f"<html>\n<body>\n{cards}</body>\n</html>\n"
+
+def iter_synthetic_pages(df, cards_per_page=CARDS_PER_PAGE):
+    """
+    Yield the product pages for a raw frame
+
+    Yields:
+        tuple: (page_number, html), page numbers starting at 1
+    """
+    for page, start in enumerate(range(0, len(df), cards_per_page), start=1):
+        yield page, render_page(df.iloc[start:start + cards_per_page])
+
+def write_pages(df, directory, cards_per_page=CARDS_PER_PAGE):
+    """
+    Write the product pages for a raw frame as page{n}.html files
+
+    The files use the page cache layout, so extract_data(cache_dir=directory)
+    scrapes them without touching the network.
+
+    Returns:
+        int: Number of pages written
+    """
+    os.makedirs(directory, exist_ok=True)
+    pages = 0
+    for page, html in iter_synthetic_pages(df, cards_per_page):
+        with open(os.path.join(directory, f"page{page}.html"), 'w', encoding='utf-8') as f:
+            f.write(html)
+        pages += 1
+    logger.info(f"Wrote {pages} synthetic pages to {directory}")
+    return pages
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from etl.artifacts import save_raw
+
+    parser = argparse.ArgumentParser(description="Generate synthetic raw product data")
+    parser.add_argument('rows', type=int, help="number of rows")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='data/synthetic_raw.csv', help="raw CSV to write")
+    parser.add_argument('--pages-dir', help="also write product pages (page cache layout) here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    started = time.perf_counter()
+    data = generate_raw(args.rows, seed=args.seed)
+    logger.info(f"Generated {len(data)} rows in {time.perf_counter() - started:.2f}s")
+    save_raw(data, args.output)
+    if args.pages_dir:
+        write_pages(data, args.pages_dir)
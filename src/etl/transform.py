@@ -4,6 +4,9 @@ import re
 import logging
 from datetime import datetime
 
+from etl.quality import collect, report_issue
+from etl.currency import convert_prices, get_usd_to_idr
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -11,30 +14,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def clean_price(price_str):
+# Column types of the transformed data
+TRANSFORMED_DTYPES = {
+    'Title': 'string',
+    'Price': 'float64',
+    'Rating': 'float64',
+    'Colors': 'int64',
+    'Size': 'string',
+    'Gender': 'string',
+    'timestamp': 'string'
+}
+
+def clean_price_usd(price_str):
     
     try:
         # Extract numeric value from the price string
         price_match = re.search(r'[\d.]+', price_str)
         if not price_match:
-            logger.warning(f"No numeric value found in price: '{price_str}'")
+            report_issue(logger, "price.no_numeric", "No numeric value found in price: '%s'", price_str)
             return None
             
         price_usd = float(price_match.group())
         
         # Validate the price value (must be positive)
         if price_usd <= 0:
-            logger.warning(f"Invalid price value (zero or negative): {price_usd}")
+            report_issue(logger, "price.not_positive", "Invalid price value (zero or negative): %s", price_usd)
             return None
             
-        # Convert to IDR with exchange rate of Rp16,000
-        price_idr = price_usd * 16000
-        
-        # Round to 2 decimal places to avoid floating point issues
-        return round(price_idr, 2)
-    except Exception as e:
-        logger.error(f"Error cleaning price '{price_str}': {e}")
+        return price_usd
+    except Exception:
+        report_issue(logger, "price.error", "Error cleaning price %r", price_str, logging.ERROR)
+        return None
+
+def clean_price(price_str, usd_to_idr=None):
+    
+    price_usd = clean_price_usd(price_str)
+    if price_usd is None:
         return None
+    
+    # Without an explicit rate, use the configured one (see etl.currency)
+    usd_to_idr = usd_to_idr or get_usd_to_idr()
+    
+    # Round to 2 decimal places to avoid floating point issues
+    return round(price_usd * usd_to_idr, 2)
 
 def clean_rating(rating_str):
    
@@ -46,19 +68,19 @@ def clean_rating(rating_str):
         # Extract numeric value from the rating string
         rating_match = re.search(r'([\d.]+)', rating_str)
         if not rating_match:
-            logger.warning(f"No numeric value found in rating: '{rating_str}'")
+            report_issue(logger, "rating.no_numeric", "No numeric value found in rating: '%s'", rating_str)
             return None
             
         rating = float(rating_match.group(1))
         
         # Validate rating value (typically between 0 and 5)
         if rating < 0 or rating > 5:
-            logger.warning(f"Rating value out of range: {rating}")
+            report_issue(logger, "rating.out_of_range", "Rating value out of range: %s", rating)
             return None
             
         return rating
-    except Exception as e:
-        logger.error(f"Error cleaning rating '{rating_str}': {e}")
+    except Exception:
+        report_issue(logger, "rating.error", "Error cleaning rating %r", rating_str, logging.ERROR)
         return None
 
 def clean_colors(colors_str):
@@ -71,19 +93,19 @@ def clean_colors(colors_str):
         # Extract numeric value from the colors string
         colors_match = re.search(r'(\d+)', colors_str)
         if not colors_match:
-            logger.warning(f"No numeric value found in colors: '{colors_str}'")
+            report_issue(logger, "colors.no_numeric", "No numeric value found in colors: '%s'", colors_str)
             return 0
             
         colors = int(colors_match.group(1))
         
         # Validate colors value (must be non-negative)
         if colors < 0:
-            logger.warning(f"Invalid colors value (negative): {colors}")
+            report_issue(logger, "colors.negative", "Invalid colors value (negative): %s", colors)
             return 0
             
         return colors
-    except Exception as e:
-        logger.error(f"Error cleaning colors '{colors_str}': {e}")
+    except Exception:
+        report_issue(logger, "colors.error", "Error cleaning colors %r", colors_str, logging.ERROR)
         return 0
 
 def clean_size(size_str):
@@ -98,12 +120,12 @@ def clean_size(size_str):
         
         # Validate size value (must not be empty)
         if not clean_size:
-            logger.warning(f"Empty size value after cleaning: '{size_str}'")
+            report_issue(logger, "size.empty", "Empty size value after cleaning: '%s'", size_str)
             return "Unknown"
             
         return clean_size
-    except Exception as e:
-        logger.error(f"Error cleaning size '{size_str}': {e}")
+    except Exception:
+        report_issue(logger, "size.error", "Error cleaning size %r", size_str, logging.ERROR)
         return "Unknown"
 
 def clean_gender(gender_str):
@@ -118,12 +140,12 @@ def clean_gender(gender_str):
         
         # Validate gender value (must not be empty)
         if not clean_gender:
-            logger.warning(f"Empty gender value after cleaning: '{gender_str}'")
+            report_issue(logger, "gender.empty", "Empty gender value after cleaning: '%s'", gender_str)
             return "Unknown"
             
         return clean_gender
-    except Exception as e:
-        logger.error(f"Error cleaning gender '{gender_str}': {e}")
+    except Exception:
+        report_issue(logger, "gender.error", "Error cleaning gender %r", gender_str, logging.ERROR)
         return "Unknown"
 
 def validate_product_data(row):
@@ -150,9 +172,11 @@ def validate_product_data(row):
         
     return True
 
-def transform_data(df):
+def transform_data(df, usd_to_idr=None, raise_errors=False):
    
     logger.info("Starting data transformation")
+    # Without an explicit rate, use the configured one (see etl.currency)
+    usd_to_idr = usd_to_idr or get_usd_to_idr()
     
     try:
         # Check if DataFrame is empty
@@ -166,81 +190,86 @@ def transform_data(df):
         # Remove invalid products (Title is "Unknown Product")
         invalid_count = transformed_df[transformed_df['Title'] == "Unknown Product"].shape[0]
         if invalid_count > 0:
-            logger.info(f"Removing {invalid_count} products with unknown title")
+            logger.info("Removing %d products with unknown title", invalid_count)
             transformed_df = transformed_df[transformed_df['Title'] != "Unknown Product"]
         
-        # Transform Price column (USD to IDR)
-        transformed_df['Price'] = transformed_df['Price'].apply(clean_price)
-        
-        # Transform Rating column
-        transformed_df['Rating'] = transformed_df['Rating'].apply(clean_rating)
-        
-        # Transform Colors column
-        transformed_df['Colors'] = transformed_df['Colors'].apply(clean_colors)
-        
-        # Transform Size column
-        transformed_df['Size'] = transformed_df['Size'].apply(clean_size)
+        # Bad values are counted per rule and logged as one summary for the chunk
+        with collect() as quality:
+            # Parse Price column, keeping the USD value
+            transformed_df.insert(
+                transformed_df.columns.get_loc('Price') + 1, 'Price_USD',
+                transformed_df['Price'].apply(clean_price_usd).astype('float64')
+            )
+            
+            # Transform Rating column
+            transformed_df['Rating'] = transformed_df['Rating'].apply(clean_rating)
+            
+            # Transform Colors column
+            transformed_df['Colors'] = transformed_df['Colors'].apply(clean_colors)
+            
+            # Transform Size column
+            transformed_df['Size'] = transformed_df['Size'].apply(clean_size)
+            
+            # Transform Gender column
+            transformed_df['Gender'] = transformed_df['Gender'].apply(clean_gender)
+        quality.emit(logger)
         
-        # Transform Gender column
-        transformed_df['Gender'] = transformed_df['Gender'].apply(clean_gender)
+        # Convert USD to IDR in one vectorized step
+        transformed_df = convert_prices(transformed_df, usd_to_idr)
         
         # Log stats before removing null values
-        null_counts = transformed_df.isnull().sum()
-        logger.info(f"Null value counts before cleaning:\n{null_counts}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Null value counts before cleaning:\n%s", transformed_df.isnull().sum())
         
         # Remove rows with null values
         null_rows_count = transformed_df.isnull().any(axis=1).sum()
         if null_rows_count > 0:
-            logger.info(f"Removing {null_rows_count} rows with null values")
+            logger.info("Removing %d rows with null values", null_rows_count)
             transformed_df = transformed_df.dropna()
         
         # Remove rows with invalid data using the validation function
         valid_mask = transformed_df.apply(validate_product_data, axis=1)
         invalid_count = (~valid_mask).sum()
         if invalid_count > 0:
-            logger.info(f"Removing {invalid_count} rows with invalid data")
+            logger.info("Removing %d rows with invalid data", invalid_count)
             transformed_df = transformed_df[valid_mask]
         
         # Remove duplicate rows
         duplicate_count = transformed_df.duplicated().sum()
         if duplicate_count > 0:
-            logger.info(f"Removing {duplicate_count} duplicate rows")
+            logger.info("Removing %d duplicate rows", duplicate_count)
             transformed_df = transformed_df.drop_duplicates()
         
         # Fix any malformatted price values (like "8.322.559.999.999.990")
         # This might occur due to locale formatting issues
         price_mask = transformed_df['Price'] > 1e10  # Unreasonably large prices
         if price_mask.any():
-            logger.warning(f"Found {price_mask.sum()} suspiciously large price values, capping them")
+            logger.warning("Found %d suspiciously large price values, capping them", price_mask.sum())
             # Either cap the values or exclude the rows
             transformed_df = transformed_df[~price_mask]
         
         # Ensure proper data types
-        transformed_df = transformed_df.astype({
-            'Title': 'string',
-            'Price': 'float64',
-            'Rating': 'float64',
-            'Colors': 'int64',
-            'Size': 'string',
-            'Gender': 'string',
-            'timestamp': 'string'
-        })
+        transformed_df = transformed_df.astype(TRANSFORMED_DTYPES)
         
         # Add a final check to make sure price values are positive
         zero_price_count = (transformed_df['Price'] <= 0).sum()
         if zero_price_count > 0:
-            logger.warning(f"Removing {zero_price_count} rows with zero or negative price")
+            logger.warning("Removing %d rows with zero or negative price", zero_price_count)
             transformed_df = transformed_df[transformed_df['Price'] > 0]
         
-        logger.info(f"Data transformation completed. {len(transformed_df)} products after transformation")
+        logger.info("Data transformation completed. %d products after transformation", len(transformed_df))
         
         # Print a summary of the data types and sample values
-        logger.info(f"Data types:\n{transformed_df.dtypes}")
-        logger.info(f"Sample data:\n{transformed_df.head()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Data types:\n%s", transformed_df.dtypes)
+            logger.debug("Sample data:\n%s", transformed_df.head())
         
         return transformed_df
         
     except Exception as e:
+        # Callers transforming part of the data must not mistake a failure for an empty result
+        if raise_errors:
+            raise
         logger.error(f"Error during data transformation: {e}", exc_info=True)
         return pd.DataFrame()
 
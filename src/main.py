@@ -1,7 +1,25 @@
 from etl.extract import extract_data
-from etl.transform import transform_data
+from etl.transform import transform_data, TRANSFORMED_DTYPES
 from etl.load import load_data
+from etl.data_profile import DataProfile, profile_data, save_profile_report
+from etl.parallel import transform_parallel
+from etl.currency import get_usd_to_idr, get_rate_provider
+from etl.out_of_core import transform_out_of_core, iter_partitions
+from etl.artifacts import (
+    save_raw, read_raw, save_transformed, read_transformed, reprice_transformed,
+    write_snapshot, read_snapshot, latest_snapshot
+)
+from etl.db import dispose_engines
+from etl.metrics import stage_timer, reset_metrics, log_metrics
+from etl.profiling import Profiler, activate
+from etl.scheduler import Scheduler
+from etl.streaming import run_streaming_pipeline
+from config.settings import get_settings, load_settings, configure
+import argparse
 import logging
+import pandas as pd
+from contextlib import contextmanager, nullcontext
+from dataclasses import replace
 
 logging.basicConfig(
     level=logging.INFO,
@@ -9,29 +27,409 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_etl_pipeline():
-    """Run the complete ETL pipeline"""
-    logger.info("Starting ETL pipeline")
+STAGES = ('extract', 'transform', 'load')
+
+@contextmanager
+def pipeline_stage(name, profiler=None):
+    """Time a pipeline stage and, when profiling, capture its profile"""
+    with stage_timer(name), (profiler.stage(name) if profiler else nullcontext()):
+        yield
+
+def run_etl_pipeline(stages=STAGES, settings=None, raw_path=None, transformed_path=None,
+                     replay=None, profile_dir=None, profile_detail=False, out_of_core=False):
+    """
+    Run the complete ETL pipeline, or a consecutive subset of its stages
+    
+    A stage that runs without the one before it reads that stage's artifact
+    from disk: transform reads raw_path and load reads transformed_path.
+    
+    Args:
+        stages (tuple): Stages to run, in pipeline order
+        settings (Settings): Pipeline settings (defaults to the loaded settings)
+        raw_path (str): Where the raw extract is written / read from
+        transformed_path (str): Where the transformed data is written / read from
+        replay (str): Snapshot to transform instead of raw_path; "latest"
+            picks the newest one in settings.snapshot_dir
+        profile_dir (str): Write cProfile / tracemalloc reports for each stage
+            to a new run directory under profile_dir
+        profile_detail (bool): Also profile page fetches and card parsing
+        out_of_core (bool): Transform raw_path in chunks within
+            settings.transform_memory_budget_mb and write the result as a
+            directory of partitions at transformed_path. A following load
+            stage still reads all partitions into memory.
+    
+    Returns:
+        dict: Load results per sink (empty when the load stage is not run)
+    """
+    stages = [stage for stage in STAGES if stage in stages]
+    if not stages or stages != list(STAGES[STAGES.index(stages[0]):][:len(stages)]):
+        raise ValueError(f"Stages must be consecutive pipeline stages: {stages}")
+    if out_of_core and (stages[0] != 'transform' or replay or not raw_path or not transformed_path):
+        raise ValueError("The out-of-core transform reads raw_path and writes transformed_path, "
+                         "so it must start the run at the transform stage")
+    
+    settings = settings or get_settings()
+    logger.info(f"Starting ETL pipeline ({', '.join(stages)})")
+    reset_metrics()
+    
+    if profile_dir:
+        profiler = Profiler.for_run(profile_dir, detail=profile_detail)
+        with activate(profiler):
+            return _run_stages(stages, settings, raw_path, transformed_path, replay, out_of_core, profiler)
+    return _run_stages(stages, settings, raw_path, transformed_path, replay, out_of_core)
+
+def load_options(settings, save_csv=None):
+    """
+    Build the load_data arguments for the sinks enabled in settings
+    
+    Args:
+        settings (Settings): Pipeline settings
+        save_csv (bool): Override settings.sink_csv
+        
+    Returns:
+        dict: Keyword arguments for load_data
+    """
+    extra_sinks = [name for name, enabled in (('history', settings.sink_history),
+                                              ('local_db', settings.sink_local_db)) if enabled]
+    return {
+        'save_csv': settings.sink_csv if save_csv is None else save_csv,
+        'save_sheets': settings.sink_sheets,
+        'save_postgres': settings.sink_postgres,
+        'sinks': extra_sinks,
+        'settings': settings,
+        'retries': settings.load_retries,
+        'backoff': settings.load_retry_backoff,
+        'spool_dir': settings.spool_dir,
+        'spool_max_batches': settings.spool_max_batches,
+    }
+
+def run_streaming_etl(settings=None):
+    """
+    Run the streaming pipeline, then write its CSV output to the other enabled sinks
+    
+    The streaming pipeline itself only writes the CSV file, so the CSV sink
+    must be enabled. The other sinks get the finished file in one batch, so
+    they can only be combined with a CSV file that holds this run alone, not
+    with csv_append.
+    
+    Returns:
+        dict: Load results per sink
+    """
+    settings = settings or get_settings()
+    if not settings.sink_csv:
+        raise ValueError("The streaming pipeline writes through the CSV sink; enable sink_csv")
+    options = load_options(settings, save_csv=False)
+    other_sinks = [name for name, enabled in (('google_sheets', options['save_sheets']),
+                                              ('postgresql', options['save_postgres'])) if enabled]
+    other_sinks += options['sinks']
+    if other_sinks and settings.csv_append:
+        raise ValueError(f"The streaming pipeline cannot write {', '.join(other_sinks)} when appending "
+                         f"to the CSV file, as the file also holds earlier runs; disable those sinks")
+    
+    reset_metrics()
+    rows = run_streaming_pipeline(settings)
+    results = {'csv': rows > 0}
+    if rows and other_sinks:
+        compression = None if settings.csv_compression == 'none' else settings.csv_compression
+        df = pd.read_csv(settings.csv_output_path, dtype=TRANSFORMED_DTYPES, compression=compression)
+        with pipeline_stage("load"):
+            results.update(load_data(df, **options))
+    
+    for storage, success in results.items():
+        logger.info(f"{storage.upper()} loading: {'Success' if success else 'Failed'}")
+    log_metrics()
+    return results
+
+def run_reprice(path, settings=None):
+    """
+    Reprice saved transformed data at the current exchange rate
+    
+    Unlike a transform, this does not fall back to settings.usd_to_idr when
+    the rate source fails: that would rewrite every stored price at a stale
+    rate. The data is left untouched instead.
+    
+    Returns:
+        int: Number of rows repriced
+    """
+    settings = settings or get_settings()
+    try:
+        rate = get_rate_provider(settings).get_rate('USD', 'IDR')
+    except Exception as e:
+        raise RuntimeError(f"Cannot get the USD/IDR rate, {path} was not repriced: {e}") from e
+    return reprice_transformed(path, rate)
+
+def _run_stages(stages, settings, raw_path, transformed_path, replay, out_of_core, profiler=None):
+    results = {}
     
     # Extract data
-    logger.info("Extracting data...")
-    raw_data = extract_data()
+    if 'extract' in stages:
+        logger.info("Extracting data...")
+        with pipeline_stage("extract", profiler):
+            raw_data = extract_data(settings=settings)
+        if raw_path:
+            save_raw(raw_data, raw_path)
+        if settings.snapshot_dir:
+            write_snapshot(raw_data, settings.snapshot_dir)
+    
+    # Transform data out of core, from raw_path to partitions at transformed_path
+    if 'transform' in stages and out_of_core:
+        logger.info("Transforming data out of core...")
+        with pipeline_stage("transform", profiler):
+            transform_out_of_core(raw_path, transformed_path,
+                                  settings.transform_memory_budget_mb * 1024 * 1024,
+                                  spill_dir=settings.spill_dir, usd_to_idr=get_usd_to_idr(settings))
+        
+        if settings.data_profile_dir:
+            with pipeline_stage("data_profile", profiler):
+                profile = DataProfile()
+                for partition in iter_partitions(transformed_path):
+                    profile.update(partition)
+                save_profile_report(profile, settings.data_profile_dir)
     
     # Transform data
-    logger.info("Transforming data...")
-    transformed_data = transform_data(raw_data)
+    elif 'transform' in stages:
+        if 'extract' not in stages and replay:
+            snapshot = latest_snapshot(settings.snapshot_dir) if replay == 'latest' else replay
+            if snapshot is None:
+                raise FileNotFoundError(f"No raw snapshots found in {settings.snapshot_dir}")
+            raw_data = read_snapshot(snapshot)
+        elif 'extract' not in stages:
+            raw_data = read_raw(raw_path)
+        logger.info("Transforming data...")
+        with pipeline_stage("transform", profiler):
+            usd_to_idr = get_usd_to_idr(settings)
+            if settings.transform_workers > 1:
+                transformed_data = transform_parallel(raw_data, settings.transform_workers,
+                                                      usd_to_idr=usd_to_idr)
+            else:
+                transformed_data = transform_data(raw_data, usd_to_idr)
+        if transformed_path:
+            save_transformed(transformed_data, transformed_path)
+        
+        # Profile the transformed data
+        if settings.data_profile_dir:
+            with pipeline_stage("data_profile", profiler):
+                save_profile_report(profile_data(transformed_data), settings.data_profile_dir)
     
     # Load data
-    logger.info("Loading data...")
-    results = load_data(transformed_data)
+    if 'load' in stages:
+        if 'transform' not in stages or out_of_core:
+            transformed_data = read_transformed(transformed_path)
+        logger.info("Loading data...")
+        with pipeline_stage("load", profiler):
+            results = load_data(transformed_data, **load_options(settings))
     
     # Log results
     for storage, success in results.items():
         status = "Success" if success else "Failed"
         logger.info(f"{storage.upper()} loading: {status}")
     
+    log_metrics()
     logger.info("ETL pipeline completed")
     return results
 
+def run_scheduler(job, interval=None, cron=None):
+    """
+    Keep the process resident and run the pipeline on a schedule
+    
+    Args:
+        job (callable): Pipeline run to repeat
+        interval (float): Seconds between runs
+        cron (str): Cron expression, e.g. "0 * * * *" for hourly runs
+    """
+    import signal
+    
+    scheduler = Scheduler(job, interval=interval, cron=cron)
+    
+    def handle_signal(signum, frame):
+        logger.info(f"Received signal {signum}, shutting down scheduler")
+        scheduler.stop()
+    
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    scheduler.run_forever()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fashion Studio ETL pipeline",
+        epilog="Settings not given on the command line come from --config, ETL_* "
+               "environment variables and config/settings.py. Single stages read the "
+               "previous stage's artifact, e.g. 'main.py transform' reads the raw file "
+               "and writes the transformed file."
+    )
+    parser.add_argument('stage', nargs='?', choices=('all',) + STAGES, default='all',
+                        help="stage to run (default: all)")
+    parser.add_argument('--config', metavar='FILE',
+                        help="JSON or TOML settings file (default: $ETL_SETTINGS_FILE)")
+    
+    artifacts = parser.add_argument_group('artifacts')
+    artifacts.add_argument('--raw-path', default=None,
+                           help="raw extract file (single stages default to the raw_output_path setting)")
+    artifacts.add_argument('--transformed-path', default=None,
+                           help="transformed data file (single stages default to the "
+                                "transformed_output_path setting)")
+    artifacts.add_argument('--snapshot-dir', default=None,
+                           help="also save each raw extract as an Arrow snapshot in this directory")
+    artifacts.add_argument('--replay', metavar='SNAPSHOT',
+                           help="transform a raw snapshot file instead of --raw-path "
+                                "('latest' uses the newest one in --snapshot-dir)")
+    artifacts.add_argument('--data-profile-dir', default=None,
+                           help="write a JSON data profile (column statistics) per run to this directory")
+    
+    sinks = parser.add_argument_group('sinks')
+    sinks.add_argument('--csv', action=argparse.BooleanOptionalAction, default=None,
+                       help="write to the CSV file")
+    sinks.add_argument('--csv-append', action='store_true', default=None,
+                       help="append rows to the CSV file instead of replacing it")
+    sinks.add_argument('--sheets', action=argparse.BooleanOptionalAction, default=None,
+                       help="write to Google Sheets")
+    sinks.add_argument('--postgres', action=argparse.BooleanOptionalAction, default=None,
+                       help="write to PostgreSQL")
+    sinks.add_argument('--history', action=argparse.BooleanOptionalAction, default=None,
+                       help="record changed products in the price history table")
+    sinks.add_argument('--local-db', action=argparse.BooleanOptionalAction, default=None,
+                       help="upsert into a local SQLite or DuckDB file")
+    sinks.add_argument('--local-db-path', default=None,
+                       help="local database file; a .duckdb extension selects DuckDB "
+                            "(default: the local_db_path setting)")
+    sinks.add_argument('--spool-dir', default=None,
+                       help="keep batches that a sink failed to write here and replay them on the next run")
+    sinks.add_argument('--retries', type=int, default=None,
+                       help="retries per sink after a failed write")
+    
+    tuning = parser.add_argument_group('tuning')
+    tuning.add_argument('--workers', type=int, default=None,
+                        help="pages fetched concurrently")
+    tuning.add_argument('--cache-dir', default=None,
+                        help="cache page HTML in this directory and reuse it")
+    tuning.add_argument('--cache-ttl', type=float, default=None,
+                        help="seconds a cached page is reused before it is fetched again")
+    tuning.add_argument('--chunk-size', type=int, default=None,
+                        help="rows per write for the CSV and PostgreSQL sinks")
+    tuning.add_argument('--transform-workers', type=int, default=None,
+                        help="processes transforming partitions of the raw data in parallel")
+    tuning.add_argument('--out-of-core', action='store_true',
+                        help="transform the raw file in chunks within transform_memory_budget_mb and "
+                             "write the transformed data as a directory of partitions (the load "
+                             "stage still reads the whole result into memory)")
+    tuning.add_argument('--fx-rates', metavar='SOURCE', default=None,
+                        help="JSON exchange rate file or http(s) URL for USD to IDR prices "
+                             "(default: the fixed usd_to_idr setting)")
+    tuning.add_argument('--reprice', action='store_true',
+                        help="recompute the IDR prices of the transformed file at the current "
+                             "exchange rate instead of transforming the raw data")
+    tuning.add_argument('--streaming', action='store_true',
+                        help="fetch, parse, transform and write the CSV concurrently through "
+                             "bounded queues, then write the other enabled sinks from the CSV")
+    tuning.add_argument('--stream-worker-mode', choices=('thread', 'process'), default=None,
+                        help="run the streaming parse and transform workers as threads or processes")
+    
+    profiling = parser.add_argument_group('profiling')
+    profiling.add_argument('--profile-dir', default=None,
+                           help="write per-stage cProfile and tracemalloc reports under this directory")
+    profiling.add_argument('--profile-detail', action='store_true',
+                           help="also profile each page fetch and card parse")
+    
+    schedule = parser.add_mutually_exclusive_group()
+    schedule.add_argument('--interval', type=float, metavar='SECONDS',
+                          help="stay resident and run the pipeline every SECONDS")
+    schedule.add_argument('--cron', metavar='EXPR',
+                          help="stay resident and run the pipeline on a cron expression")
+    
+    args = parser.parse_args(argv)
+    if args.replay == 'latest' and not args.snapshot_dir:
+        parser.error("--replay latest requires --snapshot-dir")
+    if args.replay and args.stage != 'transform':
+        parser.error("--replay can only be used with the transform stage")
+    if args.out_of_core and args.stage != 'transform':
+        parser.error("--out-of-core can only be used with the transform stage")
+    if args.reprice and (args.stage != 'transform' or args.out_of_core or args.replay):
+        parser.error("--reprice can only be used with the transform stage, on its own")
+    if args.streaming and args.stage != 'all':
+        parser.error("--streaming runs the whole pipeline and cannot be combined with a stage")
+    if args.streaming and args.csv is False:
+        parser.error("--streaming writes through the CSV sink and cannot be combined with --no-csv")
+    if args.streaming and args.csv_append and any((args.sheets, args.postgres, args.history, args.local_db)):
+        parser.error("--streaming with --csv-append can only write the CSV sink")
+    return args
+
+# Command-line options -> Settings fields they override
+SETTING_OPTIONS = {
+    'snapshot_dir': ('snapshot_dir',),
+    'data_profile_dir': ('data_profile_dir',),
+    'csv': ('sink_csv',),
+    'csv_append': ('csv_append',),
+    'sheets': ('sink_sheets',),
+    'postgres': ('sink_postgres',),
+    'history': ('sink_history',),
+    'local_db': ('sink_local_db',),
+    'spool_dir': ('spool_dir',),
+    'retries': ('load_retries',),
+    'local_db_path': ('local_db_path',),
+    'workers': ('max_workers',),
+    'cache_dir': ('cache_dir',),
+    'cache_ttl': ('cache_ttl',),
+    'chunk_size': ('csv_chunk_size', 'postgres_chunk_size'),
+    'stream_worker_mode': ('stream_worker_mode',),
+    'transform_workers': ('transform_workers',),
+    'fx_rates': ('fx_rates_source',),
+}
+
+def settings_from_args(args):
+    """
+    Load the settings and apply the options given on the command line
+    
+    Returns:
+        Settings: Settings for this process
+    """
+    overrides = {}
+    for option, names in SETTING_OPTIONS.items():
+        value = getattr(args, option)
+        if value is not None:
+            overrides.update({name: value for name in names})
+    return replace(load_settings(args.config), **overrides)
+
+def pipeline_kwargs(args, settings):
+    """
+    Convert parsed command-line arguments into run_etl_pipeline arguments
+    
+    Returns:
+        dict: Keyword arguments for run_etl_pipeline
+    """
+    raw_path, transformed_path = args.raw_path, args.transformed_path
+    # Single stages always exchange data through artifacts on disk
+    if args.stage != 'all':
+        raw_path = raw_path or settings.raw_output_path
+        transformed_path = transformed_path or settings.transformed_output_path
+    
+    return {
+        'stages': STAGES if args.stage == 'all' else (args.stage,),
+        'settings': settings,
+        'raw_path': raw_path,
+        'transformed_path': transformed_path,
+        'replay': args.replay,
+        'profile_dir': args.profile_dir,
+        'profile_detail': args.profile_detail,
+        'out_of_core': args.out_of_core,
+    }
+
 if __name__ == "__main__":
-    run_etl_pipeline()
\ No newline at end of file
+    args = parse_args()
+    settings = configure(settings_from_args(args))
+    logging.getLogger().setLevel(settings.log_level.upper())
+    if args.streaming:
+        job = lambda: run_streaming_etl(settings)
+    elif args.reprice:
+        path = args.transformed_path or settings.transformed_output_path
+        job = lambda: run_reprice(path, settings)
+    else:
+        kwargs = pipeline_kwargs(args, settings)
+        job = lambda: run_etl_pipeline(**kwargs)
+    try:
+        if args.interval is not None or args.cron is not None:
+            run_scheduler(job, interval=args.interval, cron=args.cron)
+        else:
+            job()
+    finally:
+        # Close pooled database connections before the process exits
+        dispose_engines()
@@ -0,0 +1,131 @@
+import pytest
+import pandas as pd
+import json
+import os
+import sys
+from unittest.mock import MagicMock
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.settings import Settings
+from etl.currency import (
+    FileRateProvider, ServiceRateProvider, get_usd_to_idr, convert_prices
+)
+from etl.transform import transform_data
+from etl.artifacts import save_transformed, read_transformed, reprice_transformed
+
+RAW = pd.DataFrame({
+    'Title': ['Product 1', 'Product 2'],
+    'Price': ['$45.99', '$10.00'],
+    'Rating': ['⭐ 4.5 / 5', '⭐ 3.0 / 5'],
+    'Colors': ['3 Colors', '2 Colors'],
+    'Size': ['Size: M', 'Size: L'],
+    'Gender': ['Gender: Men', 'Gender: Women'],
+    'timestamp': ['2023-01-01', '2023-01-01']
+})
+
+def write_rates(path, rate):
+    path.write_text(json.dumps({'base': 'USD', 'rates': {'IDR': rate}}))
+
+def test_transform_keeps_usd_price():
+    """Test that transform_data keeps the USD price and converts at the given rate"""
+    default = transform_data(RAW)
+    assert default['Price_USD'].tolist() == [45.99, 10.0]
+    assert default['Price'].tolist() == [735840.0, 160000.0]
+
+    assert transform_data(RAW, usd_to_idr=15000)['Price'].tolist() == [689850.0, 150000.0]
+
+def test_convert_prices_recomputes_from_usd():
+    """Test that a rate change only needs the vectorized conversion"""
+    transformed = transform_data(RAW)
+    repriced = convert_prices(transformed, 16500)
+
+    assert repriced['Price'].tolist() == [758835.0, 165000.0]
+    assert transformed['Price'].tolist() == [735840.0, 160000.0]  # input is left unchanged
+
+def test_file_provider_caches_until_ttl(tmp_path, monkeypatch):
+    """Test that the rates file is re-read only after the TTL"""
+    path = tmp_path / 'rates.json'
+    write_rates(path, 16000)
+    clock = [100.0]
+    monkeypatch.setattr('etl.currency.time.monotonic', lambda: clock[0])
+    provider = FileRateProvider(str(path), ttl=60)
+
+    assert provider.get_rate('USD', 'IDR') == 16000.0
+    write_rates(path, 16500)
+    clock[0] += 30
+    assert provider.get_rate('USD', 'IDR') == 16000.0
+    clock[0] += 30
+    assert provider.get_rate('USD', 'IDR') == 16500.0
+
+def test_provider_keeps_stale_rate_when_refresh_fails(tmp_path):
+    """Test that a failed refresh falls back to the last fetched rate"""
+    path = tmp_path / 'rates.json'
+    write_rates(path, 16000)
+    provider = FileRateProvider(str(path), ttl=0)
+
+    assert provider.get_rate('USD', 'IDR') == 16000.0
+    path.write_text('not json')
+    assert provider.get_rate('USD', 'IDR') == 16000.0
+
+def test_service_provider_fetches_json():
+    """Test fetching rates from an HTTP service"""
+    session = MagicMock()
+    session.get.return_value.json.return_value = {'base': 'USD', 'rates': {'IDR': 16250.0}}
+    provider = ServiceRateProvider("https://rates.example/latest?base={base}", session=session, timeout=5)
+
+    assert provider.get_rate('USD', 'IDR') == 16250.0
+    assert provider.get_rate('USD', 'IDR') == 16250.0
+    session.get.assert_called_once()
+    assert session.get.call_args[0][0] == "https://rates.example/latest?base=USD"
+    assert session.get.call_args[1]['timeout'] == 5
+
+def test_get_usd_to_idr_falls_back_to_setting(tmp_path):
+    """Test that an unreadable rate source uses the usd_to_idr setting"""
+    assert get_usd_to_idr(Settings(usd_to_idr=15500.0)) == 15500.0
+
+    settings = Settings(fx_rates_source=str(tmp_path / 'missing.json'), usd_to_idr=15000.0)
+    assert get_usd_to_idr(settings) == 15000.0
+
+def test_reprice_transformed(tmp_path):
+    """Test repricing a saved transformed file without transforming again"""
+    path = str(tmp_path / 'transformed.csv')
+    save_transformed(transform_data(RAW), path)
+
+    assert reprice_transformed(path, 15000) == 2
+    assert read_transformed(path)['Price'].tolist() == [689850.0, 150000.0]
+
+def test_transform_uses_configured_rate_by_default():
+    """Test that transform_data without a rate uses the configured one, not a constant"""
+    from config.settings import configure, get_settings
+    
+    original = get_settings()
+    try:
+        configure(usd_to_idr=15000.0)
+        assert transform_data(RAW)['Price'].tolist() == [689850.0, 150000.0]
+    finally:
+        configure(original)
+
+def test_rate_provider_is_abstract():
+    """Test that a provider must implement fetch_rates"""
+    from etl.currency import RateProvider
+    
+    with pytest.raises(TypeError):
+        RateProvider()
+
+def test_reprice_aborts_when_rate_source_fails(tmp_path):
+    """Test that repricing never falls back to the default rate"""
+    from main import run_reprice
+    
+    path = str(tmp_path / 'transformed.csv')
+    save_transformed(transform_data(RAW), path)
+    settings = Settings(fx_rates_source=str(tmp_path / 'missing.json'))
+    
+    with pytest.raises(RuntimeError, match="not repriced"):
+        run_reprice(path, settings)
+    assert read_transformed(path)['Price'].tolist() == [735840.0, 160000.0]
+    
+    write_rates(tmp_path / 'rates.json', 15000)
+    assert run_reprice(path, Settings(fx_rates_source=str(tmp_path / 'rates.json'))) == 2
+    assert read_transformed(path)['Price'].tolist() == [689850.0, 150000.0]
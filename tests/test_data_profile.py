@@ -0,0 +1,67 @@
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from etl.data_profile import (
+    QuantileSketch, DistinctSketch, DataProfile, profile_data, save_profile_report
+)
+
+def make_products(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Title': [f'Product {i}' for i in rng.integers(0, rows // 2, rows)],
+        'Price': rng.uniform(16000, 8000000, rows).round(2),
+        'Rating': rng.uniform(1, 5, rows).round(1),
+        'Colors': rng.integers(1, 6, rows),
+        'Size': rng.choice(['S', 'M', 'L', 'XL', 'XXL'], rows),
+        'Gender': rng.choice(['Men', 'Women', 'Unisex'], rows),
+    })
+
+def test_quantile_sketch_relative_error():
+    """Test that quantile estimates stay within the relative accuracy"""
+    values = np.random.default_rng(1).lognormal(10, 1, 20000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.update(values)
+    
+    for q in (0.1, 0.5, 0.9):
+        exact = np.quantile(values, q, method='lower')
+        assert abs(sketch.quantile(q) - exact) / exact < 0.02
+
+def test_distinct_sketch_estimate():
+    """Test the approximate distinct count on small and large inputs"""
+    small = DistinctSketch()
+    small.update(pd.Series(['a', 'b', 'c', 'a']))
+    assert small.estimate() == 3
+    
+    large = DistinctSketch()
+    large.update(pd.Series(np.arange(100000)).astype(str))
+    assert abs(large.estimate() - 100000) / 100000 < 0.03
+
+def test_merged_profile_matches_single_pass():
+    """Test that profiles from separate chunks merge into the single-pass result"""
+    df = make_products(5000)
+    
+    single = DataProfile().update(df.iloc[:1234]).update(df.iloc[1234:]).to_dict()
+    merged = DataProfile().update(df.iloc[:1234]).merge(DataProfile().update(df.iloc[1234:])).to_dict()
+    
+    assert merged == single
+    assert single['rows'] == 5000
+    assert single['numeric']['Price']['min'] == df['Price'].min()
+    assert single['numeric']['Rating']['mean'] == pytest.approx(df['Rating'].mean())
+    assert single['categories']['Size']['frequencies']['M'] == (df['Size'] == 'M').sum()
+
+def test_save_profile_report(tmp_path):
+    """Test writing the JSON report"""
+    path = save_profile_report(profile_data(make_products(100)), str(tmp_path))
+    
+    with open(path) as f:
+        report = json.load(f)
+    assert report['rows'] == 100
+    assert set(report['numeric']['Price']['quantiles']) == {'0.01', '0.05', '0.25', '0.5', '0.75', '0.95', '0.99'}
+    assert report['distinct']['Title']['approx_distinct'] > 0
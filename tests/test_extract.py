@@ -3,6 +3,7 @@ import pandas as pd
 from bs4 import BeautifulSoup
 import sys
 import os
+import time
 
 # Add the src directory to the path so we can import our modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -79,7 +80,7 @@ def test_extract_data_returns_dataframe():
         mock_soup = BeautifulSoup(mock_html, 'html.parser')
         
         # Mock the get_page_content function
-        etl.extract.get_page_content = lambda page: mock_soup
+        etl.extract.get_page_content = lambda page, **kwargs: mock_soup
         
         # Call extract_data
         df = extract_data()
@@ -126,4 +127,43 @@ def test_error_handling():
     """Test error handling when page cannot be fetched"""
     # Test with an invalid page number
     result = get_page_content(9999)
-    assert result is None
\ No newline at end of file
+    assert result is None
+
+def test_get_page_content_uses_cache(tmp_path, monkeypatch):
+    """Test that cached pages are not fetched again"""
+    import etl.extract
+    
+    class FakeResponse:
+        text = '<div class="collection-card"></div>'
+        
+        def raise_for_status(self):
+            pass
+    
+    class FakeSession:
+        calls = 0
+        
+        def get(self, url, timeout=None):
+            FakeSession.calls += 1
+            return FakeResponse()
+    
+    monkeypatch.setattr(etl.extract, 'get_session', lambda: FakeSession())
+    
+    first = get_page_content(2, cache_dir=str(tmp_path))
+    second = get_page_content(2, cache_dir=str(tmp_path))
+    
+    assert FakeSession.calls == 1
+    assert (tmp_path / 'page2.html').exists()
+    assert str(first) == str(second)
+    
+    # Once the cached page is older than the TTL it is fetched again
+    stale = time.time() - 120
+    os.utime(tmp_path / 'page2.html', (stale, stale))
+    get_page_content(2, cache_dir=str(tmp_path), cache_ttl=60)
+    assert FakeSession.calls == 2
+
+def test_iter_pages_concurrent_keeps_order():
+    """Test that concurrent fetching yields pages in page order"""
+    from etl.extract import iter_pages
+    
+    pages = list(iter_pages(lambda page: page * 10, 7, max_workers=3, delay=0))
+    assert pages == [(page, page * 10) for page in range(1, 8)]
@@ -0,0 +1,99 @@
+import pytest
+import pandas as pd
+import os
+import sys
+from datetime import datetime
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from etl.history import detect_changes, save_price_history, KEY_COLUMNS
+from etl.db import get_engine, dispose_engines
+from etl.transform import TRANSFORMED_DTYPES
+
+def make_products(rows):
+    df = pd.DataFrame(rows, columns=['Title', 'Price', 'Rating', 'Colors', 'Size', 'Gender', 'timestamp'])
+    return df.astype(TRANSFORMED_DTYPES).assign(Price_USD=df['Price'] / 16000)
+
+FIRST_RUN = make_products([
+    ('Jacket 1', 735840.0, 4.5, 3, 'M', 'Men', '2024-01-01'),
+    ('Jacket 2', 520000.0, 3.0, 2, 'L', 'Women', '2024-01-01'),
+    ('Jacket 3', 415840.0, 4.8, 5, 'XL', 'Men', '2024-01-01'),
+])
+
+SECOND_RUN = make_products([
+    ('Jacket 1', 735840.0, 4.5, 3, 'M', 'Men', '2024-01-02'),     # unchanged
+    ('Jacket 2', 480000.0, 3.0, 2, 'L', 'Women', '2024-01-02'),   # price drop
+    ('Jacket 4', 999000.0, 4.1, 1, 'S', 'Unisex', '2024-01-02'),  # new; Jacket 3 removed
+])
+
+def test_detect_changes():
+    """Test classifying inserts, updates and deletes"""
+    from etl.history import row_hashes
+    
+    previous = FIRST_RUN[KEY_COLUMNS].assign(row_hash=row_hashes(FIRST_RUN))
+    changes = detect_changes(SECOND_RUN, previous)
+    
+    change_types = dict(zip(changes['Title'], changes['change_type']))
+    assert change_types == {'Jacket 2': 'update', 'Jacket 3': 'delete', 'Jacket 4': 'insert'}
+    
+    # A timestamp-only difference is not a change
+    assert detect_changes(FIRST_RUN.assign(timestamp='2030-01-01'), previous).empty
+    
+    # Neither is an IDR price that only moved with the exchange rate
+    assert detect_changes(FIRST_RUN.assign(Price=FIRST_RUN['Price_USD'] * 16500), previous).empty
+
+def test_save_price_history(tmp_path):
+    """Test that only changes are written and old versions are closed"""
+    url = f"sqlite:///{tmp_path / 'history.db'}"
+    first, second = datetime(2024, 1, 1), datetime(2024, 1, 2)
+    try:
+        assert save_price_history(FIRST_RUN, url=url, now=first) is True
+        assert save_price_history(SECOND_RUN, url=url, now=second) is True
+        # Re-running with the same data writes nothing
+        assert save_price_history(SECOND_RUN, url=url, now=datetime(2024, 1, 3)) is True
+        
+        with get_engine(url).connect() as connection:
+            history = pd.read_sql('SELECT * FROM products_history ORDER BY id', connection)
+    finally:
+        dispose_engines()
+    
+    assert len(history) == 6  # 3 inserts, then 1 update + 1 delete + 1 insert
+    
+    jacket_2 = history[history['Title'] == 'Jacket 2']
+    assert jacket_2['Price'].tolist() == [520000.0, 480000.0]
+    assert pd.notna(jacket_2['valid_to'].iloc[0]) and pd.isna(jacket_2['valid_to'].iloc[1])
+    
+    current = history[history['valid_to'].isna()]
+    assert sorted(current['Title']) == ['Jacket 1', 'Jacket 2', 'Jacket 4']
+
+def test_save_price_history_upgrades_existing_table(tmp_path):
+    """Test that versions written before Price_USD was tracked are not reported as changed"""
+    url = f"sqlite:///{tmp_path / 'history.db'}"
+    # Version 1 hashed the IDR price
+    old_hashes = pd.util.hash_pandas_object(FIRST_RUN[['Price', 'Rating', 'Colors']], index=False).astype('int64')
+    try:
+        with get_engine(url).begin() as connection:
+            connection.exec_driver_sql(
+                'CREATE TABLE products_history (id INTEGER PRIMARY KEY, "Title" TEXT NOT NULL, '
+                '"Size" VARCHAR(16) NOT NULL, "Gender" VARCHAR(16) NOT NULL, "Price" FLOAT, "Rating" FLOAT, '
+                '"Colors" INTEGER, row_hash BIGINT, change_type VARCHAR(8) NOT NULL, '
+                'valid_from DATETIME NOT NULL, valid_to DATETIME)'
+            )
+            for row, old_hash in zip(FIRST_RUN.itertuples(), old_hashes):
+                connection.exec_driver_sql(
+                    'INSERT INTO products_history ("Title", "Size", "Gender", "Price", "Rating", "Colors", '
+                    "row_hash, change_type, valid_from) VALUES (?, ?, ?, ?, ?, ?, ?, 'insert', '2024-01-01')",
+                    (row.Title, row.Size, row.Gender, row.Price, row.Rating, int(row.Colors), int(old_hash))
+                )
+        
+        assert save_price_history(FIRST_RUN, url=url, now=datetime(2024, 1, 2)) is True
+        
+        with get_engine(url).connect() as connection:
+            history = pd.read_sql('SELECT * FROM products_history ORDER BY id', connection)
+    finally:
+        dispose_engines()
+    
+    assert len(history) == 3
+    assert history['Price_USD'].tolist() == [45.99, 32.5, 25.99]
+    assert history['hash_version'].tolist() == [2, 2, 2]
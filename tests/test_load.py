@@ -113,4 +113,228 @@ def test_load_data_csv_only(monkeypatch):
     finally:
         # Clean up
         if os.path.exists(tmp_path):
-            os.remove(tmp_path)
\ No newline at end of file
+            os.remove(tmp_path)
+
+def test_load_does_not_import_sink_clients():
+    """Test that importing etl.load leaves the Google and database clients unloaded"""
+    import subprocess
+    
+    src_dir = os.path.join(os.path.dirname(__file__), '..', 'src')
+    code = (
+        "import sys, etl.load; "
+        "print(any(m in sys.modules for m in ('sqlalchemy', 'psycopg2', 'googleapiclient')))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=src_dir,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+def test_load_data_registered_sink():
+    """Test that load_data writes to additional registered sinks"""
+    import etl.load
+    
+    received = []
+    etl.load.register_sink('memory', lambda df: received.append(len(df)) or True)
+    try:
+        df = pd.DataFrame({'Title': ['Product 1'], 'Price': [735840.0]})
+        result = load_data(df, save_csv=False, save_sheets=False, save_postgres=False, sinks=['memory'])
+        assert result == {'memory': True}
+        assert received == [1]
+    finally:
+        etl.load.SINKS.pop('memory')
+
+def test_save_to_csv_append_and_chunks(tmp_path):
+    """Test chunked writes and appending without repeating the header"""
+    output_path = str(tmp_path / 'products.csv')
+    df = pd.DataFrame({
+        'Title': [f'Product {i}' for i in range(5)],
+        'Price': [float(i + 1) * 16000 for i in range(5)]
+    })
+    
+    assert save_to_csv(df, output_path, chunksize=2) is True
+    assert save_to_csv(df.iloc[:3], output_path, chunksize=2, mode='a') is True
+    
+    df_read = pd.read_csv(output_path)
+    assert len(df_read) == 8
+    assert df_read['Title'].tolist()[-3:] == ['Product 0', 'Product 1', 'Product 2']
+    
+    # No temporary files are left behind
+    assert os.listdir(tmp_path) == ['products.csv']
+    
+    # Appending rows with different columns is refused and keeps the file intact
+    assert save_to_csv(pd.DataFrame({'Other': [1]}), output_path, mode='a') is False
+    assert len(pd.read_csv(output_path)) == 8
+
+@pytest.mark.parametrize('suffix', ['.csv.gz', '.csv.zst'])
+def test_save_to_csv_compressed_append(tmp_path, suffix):
+    """Test compressed output inferred from the extension, including appends"""
+    if suffix.endswith('.zst'):
+        pytest.importorskip('zstandard')
+    output_path = str(tmp_path / f'products{suffix}')
+    df = pd.DataFrame({'Title': ['Product 1', 'Product 2'], 'Price': [735840.0, 520000.0]})
+    
+    assert save_to_csv(df, output_path, compression='infer') is True
+    assert save_to_csv(df, output_path, compression='infer', mode='a') is True
+    
+    df_read = pd.read_csv(output_path)
+    assert len(df_read) == 4
+    assert df_read['Price'].tolist() == [735840.0, 520000.0, 735840.0, 520000.0]
+
+def test_load_data_retries_and_spools_failed_sink(tmp_path):
+    """Test that a failing sink is retried, spooled and replayed on the next load"""
+    import etl.load
+    from etl.spool import list_spooled
+    
+    spool_dir = str(tmp_path / 'spool')
+    attempts = []
+    available = {'up': False}
+    
+    def flaky(df):
+        attempts.append(len(df))
+        if not available['up']:
+            raise ConnectionError("sink unavailable")
+        return True
+    
+    etl.load.register_sink('flaky', flaky)
+    try:
+        first = pd.DataFrame({'Title': ['Product 1'], 'Price': [735840.0]})
+        result = load_data(first, save_csv=False, save_sheets=False, save_postgres=False,
+                           sinks=['flaky'], retries=2, backoff=0, spool_dir=spool_dir)
+        assert result == {'flaky': False}
+        assert attempts == [1, 1, 1]
+        assert len(list_spooled(spool_dir, 'flaky')) == 1
+        
+        # The next load replays the spooled batch before writing its own
+        attempts.clear()
+        available['up'] = True
+        second = pd.DataFrame({'Title': ['Product 2', 'Product 3'], 'Price': [1.0, 2.0]})
+        result = load_data(second, save_csv=False, save_sheets=False, save_postgres=False,
+                           sinks=['flaky'], retries=2, backoff=0, spool_dir=spool_dir)
+        assert result == {'flaky': True}
+        assert attempts == [1, 2]
+        assert list_spooled(spool_dir, 'flaky') == []
+    finally:
+        etl.load.SINKS.pop('flaky')
+
+def test_spool_keeps_newest_batches(tmp_path):
+    """Test that the spool drops the oldest batches beyond its limit"""
+    from datetime import datetime
+    from etl.spool import spool_batch, prune_spool, read_spooled
+    
+    spool_dir = str(tmp_path / 'spool')
+    for day in (1, 2, 3):
+        spool_batch(pd.DataFrame({'Title': [f'Day {day}']}), spool_dir, 'csv', created_at=datetime(2024, 1, day))
+    
+    dropped = prune_spool(spool_dir, 'csv', 2)
+    assert [os.path.basename(path) for path in dropped] == ['csv-20240101T000000000000.csv.gz']
+    remaining = sorted(os.listdir(spool_dir))
+    assert read_spooled(os.path.join(spool_dir, remaining[0]))['Title'].tolist() == ['Day 2']
+
+def test_spool_is_superseded_for_replacing_sinks(tmp_path):
+    """Test that a sink replacing its data keeps one spooled batch and drops it after a newer write"""
+    import etl.load
+    from etl.spool import list_spooled
+    
+    spool_dir = str(tmp_path / 'spool')
+    written = []
+    available = {'up': False}
+    
+    def replacing(df):
+        if not available['up']:
+            return False
+        written.append(df['Title'].tolist())
+        return True
+    
+    etl.load.register_sink('replacing', replacing, replaces=True)
+    try:
+        for title in ('Run 1', 'Run 2'):
+            load_data(pd.DataFrame({'Title': [title]}), save_csv=False, save_sheets=False,
+                      save_postgres=False, sinks=['replacing'], spool_dir=spool_dir)
+        assert len(list_spooled(spool_dir, 'replacing')) == 1
+        
+        available['up'] = True
+        load_data(pd.DataFrame({'Title': ['Run 3']}), save_csv=False, save_sheets=False,
+                  save_postgres=False, sinks=['replacing'], spool_dir=spool_dir)
+        assert written == [['Run 3']]
+        assert list_spooled(spool_dir, 'replacing') == []
+    finally:
+        etl.load.SINKS.pop('replacing')
+        etl.load.REPLACING_SINKS.pop('replacing')
+
+def test_spool_replay_passes_batch_time(tmp_path):
+    """Test that replayed batches carry the time they were produced"""
+    from datetime import datetime
+    import etl.load
+    from etl.spool import spool_batch
+    
+    spool_dir = str(tmp_path / 'spool')
+    produced = datetime(2024, 1, 1, 10, 0)
+    spool_batch(pd.DataFrame({'Title': ['Run 1']}), spool_dir, 'timed', created_at=produced)
+    received = []
+    
+    etl.load.register_sink('timed', lambda df, now=None: received.append(now) or True, batch_time='now')
+    try:
+        load_data(pd.DataFrame({'Title': ['Run 2']}), save_csv=False, save_sheets=False,
+                  save_postgres=False, sinks=['timed'], spool_dir=spool_dir)
+        assert received == [produced, None]
+    finally:
+        etl.load.SINKS.pop('timed')
+        etl.load.BATCH_TIME_OPTIONS.pop('timed')
+
+def test_save_to_csv_append_in_place(tmp_path):
+    """Test that appends go to the existing file, an aborted append leaves it intact, and compression can be turned off"""
+    from etl.load import AtomicCsvWriter
+    
+    output_path = str(tmp_path / 'products.csv.gz')
+    df = pd.DataFrame({'Title': ['Product 1'], 'Price': [735840.0]})
+    
+    assert save_to_csv(df, output_path, compression='gzip') is True
+    inode = os.stat(output_path).st_ino
+    assert save_to_csv(df, output_path, compression='gzip', mode='a') is True
+    assert os.stat(output_path).st_ino == inode
+    size = os.path.getsize(output_path)
+    
+    with pytest.raises(RuntimeError):
+        with AtomicCsvWriter(output_path, mode='a', compression='gzip') as writer:
+            writer.write(df)
+            raise RuntimeError("interrupted")
+    assert os.path.getsize(output_path) == size
+    assert len(pd.read_csv(output_path)) == 2
+    
+    plain_path = str(tmp_path / 'plain.csv.gz')
+    assert save_to_csv(df, plain_path, compression=False) is True
+    with open(plain_path, encoding='utf-8') as f:
+        assert f.readline().strip() == 'Title,Price'
+
+def test_failed_replay_spools_current_batch_behind(tmp_path):
+    """Test that a batch is not written ahead of spooled batches that still fail"""
+    import etl.load
+    from etl.spool import list_spooled
+    
+    spool_dir = str(tmp_path / 'spool')
+    written = []
+    broken = {'Run 1'}
+    
+    def ordered(df):
+        title = df['Title'].iloc[0]
+        if title in broken:
+            return False
+        written.append(title)
+        return True
+    
+    etl.load.register_sink('ordered', ordered)
+    try:
+        for title in ('Run 1', 'Run 2'):
+            result = load_data(pd.DataFrame({'Title': [title]}), save_csv=False, save_sheets=False,
+                               save_postgres=False, sinks=['ordered'], spool_dir=spool_dir)
+            assert result == {'ordered': False}
+        # Run 2 could be written, but Run 1 is still stuck ahead of it
+        assert written == []
+        assert len(list_spooled(spool_dir, 'ordered')) == 2
+        
+        broken.clear()
+        load_data(pd.DataFrame({'Title': ['Run 3']}), save_csv=False, save_sheets=False,
+                  save_postgres=False, sinks=['ordered'], spool_dir=spool_dir)
+        assert written == ['Run 1', 'Run 2', 'Run 3']
+        assert list_spooled(spool_dir, 'ordered') == []
+    finally:
+        etl.load.SINKS.pop('ordered')
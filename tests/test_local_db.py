@@ -0,0 +1,63 @@
+import pytest
+import pandas as pd
+import os
+import sys
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from etl.local_db import save_to_local_db
+from etl.load import load_data
+from etl.db import dispose_engines
+from etl.transform import TRANSFORMED_DTYPES
+
+pytest.importorskip("sqlalchemy")
+
+def make_products(rows):
+    df = pd.DataFrame(rows, columns=['Title', 'Price', 'Rating', 'Colors', 'Size', 'Gender', 'timestamp'])
+    return df.astype(TRANSFORMED_DTYPES)
+
+FIRST_RUN = make_products([
+    ('Jacket 1', 735840.0, 4.5, 3, 'M', 'Men', '2024-01-01 10:00:00'),
+    ('Jacket 2', 520000.0, 3.0, 2, 'L', 'Women', '2024-01-01 10:00:00'),
+])
+
+SECOND_RUN = make_products([
+    ('Jacket 2', 480000.0, 3.0, 2, 'L', 'Women', '2024-01-02 10:00:00'),
+    ('Jacket 3', 415840.0, 4.8, 5, 'XL', 'Men', '2024-01-02 10:00:00'),
+])
+
+def read_products(path):
+    if path.endswith('.duckdb'):
+        import duckdb
+        with duckdb.connect(path) as connection:
+            return connection.execute('SELECT "Title", "Price" FROM products ORDER BY "Title"').df()
+    import sqlite3
+    with sqlite3.connect(path) as connection:
+        return pd.read_sql('SELECT "Title", "Price" FROM products ORDER BY "Title"', connection)
+
+@pytest.fixture(params=['products.sqlite', 'products.duckdb'])
+def db_path(request, tmp_path):
+    if request.param.endswith('.duckdb'):
+        pytest.importorskip("duckdb")
+    yield str(tmp_path / 'local' / request.param)
+    dispose_engines()
+
+def test_save_to_local_db_upserts(db_path):
+    """Test that a second run updates existing products, adds new ones and keeps old ones"""
+    assert save_to_local_db(FIRST_RUN, path=db_path) is True
+    assert save_to_local_db(SECOND_RUN, path=db_path) is True
+    
+    stored = read_products(db_path)
+    assert stored['Title'].tolist() == ['Jacket 1', 'Jacket 2', 'Jacket 3']
+    assert stored['Price'].astype(float).tolist() == [735840.0, 480000.0, 415840.0]
+
+def test_local_db_sink_is_registered(tmp_path):
+    """Test writing to the local database through load_data"""
+    path = str(tmp_path / 'products.sqlite')
+    result = load_data(FIRST_RUN, save_csv=False, save_sheets=False, save_postgres=False,
+                       sinks=['local_db'], sink_options={'local_db': {'path': path}})
+    dispose_engines()
+    
+    assert result == {'local_db': True}
+    assert len(read_products(path)) == 2
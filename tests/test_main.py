@@ -0,0 +1,102 @@
+import pytest
+import pandas as pd
+import os
+import sys
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main import run_etl_pipeline, parse_args, pipeline_kwargs, settings_from_args
+from config.settings import Settings
+from etl.artifacts import save_raw, read_raw, read_transformed
+
+RAW_SAMPLE = {
+    'Title': ['Product 1', 'Product 2', 'Unknown Product'],
+    'Price': ['$45.99', '$32.50', 'Price Unavailable'],
+    'Rating': ['⭐ 4.5 / 5', '⭐ 3.0 / 5', 'Invalid Rating'],
+    'Colors': ['3 Colors', '2 Colors', '0 Colors'],
+    'Size': ['Size: M', 'Size: L', 'Size: S'],
+    'Gender': ['Gender: Men', 'Gender: Women', 'Gender: Unisex'],
+    'timestamp': ['2023-01-01', '2023-01-01', '2023-01-01']
+}
+
+def test_raw_artifact_round_trip(tmp_path):
+    """Test that raw data is read back exactly as scraped"""
+    raw_path = str(tmp_path / 'raw.csv')
+    df = pd.DataFrame(RAW_SAMPLE)
+    save_raw(df, raw_path)
+    
+    pd.testing.assert_frame_equal(read_raw(raw_path), df)
+
+def test_parse_args_single_stage_defaults():
+    """Test that single stages default to the artifact paths from settings"""
+    args = parse_args(['load', '--no-sheets', '--no-postgres', '--chunk-size', '500'])
+    settings = settings_from_args(args)
+    kwargs = pipeline_kwargs(args, settings)
+    
+    assert kwargs['stages'] == ('load',)
+    assert kwargs['transformed_path'] == settings.transformed_output_path
+    assert settings.sink_csv is True
+    assert settings.sink_sheets is False
+    assert settings.sink_postgres is False
+    assert settings.csv_chunk_size == 500
+    assert settings.postgres_chunk_size == 500
+
+def test_run_transform_and_load_from_artifacts(tmp_path):
+    """Test re-running transform and load without extracting again"""
+    raw_path = str(tmp_path / 'raw.csv')
+    transformed_path = str(tmp_path / 'transformed.csv')
+    output_path = str(tmp_path / 'products.csv')
+    save_raw(pd.DataFrame(RAW_SAMPLE), raw_path)
+    
+    run_etl_pipeline(stages=('transform',), raw_path=raw_path, transformed_path=transformed_path)
+    transformed = read_transformed(transformed_path)
+    assert len(transformed) == 2
+    assert transformed['Price'].dtype == 'float64'
+    
+    settings = Settings(csv_output_path=output_path, sink_sheets=False, sink_postgres=False)
+    results = run_etl_pipeline(stages=('load',), settings=settings, transformed_path=transformed_path)
+    assert results == {'csv': True}
+    assert len(pd.read_csv(output_path)) == 2
+
+def test_run_rejects_non_consecutive_stages():
+    """Test that skipping the middle stage is rejected"""
+    with pytest.raises(ValueError):
+        run_etl_pipeline(stages=('extract', 'load'))
+
+def test_replay_latest_snapshot(tmp_path):
+    """Test transforming the newest Arrow snapshot instead of the raw file"""
+    pytest.importorskip('pyarrow')
+    from datetime import datetime
+    from etl.artifacts import write_snapshot, read_snapshot, list_snapshots
+    
+    snapshot_dir = str(tmp_path / 'snapshots')
+    df = pd.DataFrame(RAW_SAMPLE)
+    write_snapshot(df.iloc[:1], snapshot_dir, taken_at=datetime(2024, 1, 1))
+    latest = write_snapshot(df, snapshot_dir, taken_at=datetime(2024, 1, 2))
+    
+    assert len(list_snapshots(snapshot_dir)) == 2
+    pd.testing.assert_frame_equal(read_snapshot(latest), df)
+    
+    transformed_path = str(tmp_path / 'transformed.csv')
+    run_etl_pipeline(stages=('transform',), settings=Settings(snapshot_dir=snapshot_dir),
+                     transformed_path=transformed_path, replay='latest')
+    assert len(read_transformed(transformed_path)) == 2
+
+def test_empty_results_keep_previous_artifacts(tmp_path):
+    """Test that an empty frame never replaces an artifact and bad artifacts fail clearly"""
+    from etl.artifacts import save_transformed
+    
+    raw_path = str(tmp_path / 'raw.csv')
+    df = pd.DataFrame(RAW_SAMPLE)
+    assert save_raw(df, raw_path) is True
+    assert save_raw(pd.DataFrame(), raw_path) is False
+    pd.testing.assert_frame_equal(read_raw(raw_path), df)
+    
+    with pytest.raises(FileNotFoundError, match="run the previous stage"):
+        read_transformed(str(tmp_path / 'missing.csv'))
+    empty_path = tmp_path / 'transformed.csv'
+    empty_path.write_text('')
+    with pytest.raises(ValueError, match="is empty"):
+        read_transformed(str(empty_path))
+    assert save_transformed(pd.DataFrame(), str(empty_path)) is False
@@ -0,0 +1,105 @@
+import pytest
+import pandas as pd
+import os
+import sys
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from etl.out_of_core import transform_out_of_core, read_partitions, list_partitions, plan_chunks
+from etl.artifacts import save_raw, read_raw
+from etl.synthetic import generate_raw
+from etl.transform import transform_data
+from config.settings import Settings
+from main import run_etl_pipeline
+
+@pytest.fixture
+def raw_path(tmp_path):
+    path = str(tmp_path / 'raw.csv')
+    save_raw(generate_raw(3000, seed=5, dirty_rates={'duplicate': 0.2}), path)
+    return path
+
+def test_out_of_core_matches_in_memory(raw_path, tmp_path):
+    """Test that chunked transform with spilled dedup gives the in-memory result"""
+    output_dir = str(tmp_path / 'transformed')
+    spill_dir = str(tmp_path / 'spill')
+    
+    rows = transform_out_of_core(raw_path, output_dir, memory_budget=10**6, spill_dir=spill_dir,
+                                 chunk_rows=250, partitions=4)
+    
+    expected = transform_data(read_raw(raw_path))
+    assert rows == len(expected)
+    assert len(list_partitions(output_dir)) == 4
+    pd.testing.assert_frame_equal(read_partitions(output_dir), expected)
+    # Temporary partitions are removed
+    assert os.listdir(spill_dir) == []
+
+def test_plan_chunks_follows_budget(raw_path):
+    """Test that a smaller memory budget gives smaller chunks and more partitions"""
+    large_rows, large_partitions = plan_chunks(raw_path, 10**8)
+    small_rows, small_partitions = plan_chunks(raw_path, 10**5)
+    
+    assert small_rows < large_rows
+    assert small_partitions > large_partitions == 1
+
+def test_pipeline_out_of_core_transform_and_load(raw_path, tmp_path):
+    """Test running transform out of core and loading its partitions"""
+    transformed_path = str(tmp_path / 'transformed')
+    output_path = str(tmp_path / 'products.csv')
+    settings = Settings(csv_output_path=output_path, sink_sheets=False, sink_postgres=False,
+                        transform_memory_budget_mb=1)
+    
+    results = run_etl_pipeline(stages=('transform', 'load'), settings=settings, raw_path=raw_path,
+                               transformed_path=transformed_path, out_of_core=True)
+    
+    assert results == {'csv': True}
+    assert len(pd.read_csv(output_path)) == len(transform_data(read_raw(raw_path)))
+    
+    with pytest.raises(ValueError):
+        run_etl_pipeline(stages=('extract', 'transform'), settings=settings, raw_path=raw_path,
+                         transformed_path=transformed_path, out_of_core=True)
+
+def test_failed_chunk_fails_the_run(raw_path, tmp_path, monkeypatch):
+    """Test that an error in one chunk fails the run instead of dropping the chunk"""
+    import etl.transform
+    
+    output_dir = tmp_path / 'transformed'
+    
+    convert = etl.transform.convert_prices
+    calls = []
+    
+    def failing_convert(df, rate):
+        calls.append(len(df))
+        if len(calls) == 2:
+            raise RuntimeError("chunk failed")
+        return convert(df, rate)
+    
+    monkeypatch.setattr(etl.transform, 'convert_prices', failing_convert)
+    
+    with pytest.raises(RuntimeError, match="chunk failed"):
+        transform_out_of_core(raw_path, str(output_dir), memory_budget=1 << 20, chunk_rows=500)
+    assert list_partitions(str(output_dir)) == []
+
+def test_failed_partition_keeps_previous_output(raw_path, tmp_path, monkeypatch):
+    """Test that a failure while writing partitions leaves the old output in place"""
+    import etl.out_of_core
+    
+    output_dir = str(tmp_path / 'transformed')
+    transform_out_of_core(raw_path, output_dir, memory_budget=1 << 20, chunk_rows=500, partitions=3)
+    previous = read_partitions(output_dir)
+    
+    read_spilled = etl.out_of_core._read_spilled
+    calls = []
+    
+    def failing_read(path):
+        calls.append(path)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        return read_spilled(path)
+    
+    monkeypatch.setattr(etl.out_of_core, '_read_spilled', failing_read)
+    
+    with pytest.raises(OSError, match="disk full"):
+        transform_out_of_core(raw_path, output_dir, memory_budget=1 << 20, chunk_rows=500, partitions=3)
+    pd.testing.assert_frame_equal(read_partitions(output_dir), previous)
+    assert sorted(os.listdir(tmp_path)) == ['raw.csv', 'transformed']
@@ -0,0 +1,59 @@
+import pytest
+import pandas as pd
+import os
+import sys
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytest.importorskip('pyarrow')
+
+from etl.parallel import transform_parallel, to_shared_memory, from_shared_memory, shutdown_pool
+from etl.synthetic import generate_raw
+from etl.transform import transform_data, TRANSFORMED_DTYPES
+
+def test_shared_memory_round_trip():
+    """Test passing a frame through shared memory keeps values, types and index"""
+    df = pd.DataFrame({
+        'Title': ['Jacket 1', 'Jacket 2'], 'Price': [735840.0, 520000.0], 'Rating': [4.5, 3.0],
+        'Colors': [3, 2], 'Size': ['M', 'L'], 'Gender': ['Men', 'Women'], 'timestamp': ['t1', 't2'],
+    }, index=[10, 12]).astype(TRANSFORMED_DTYPES)
+    
+    name, size = to_shared_memory(df)
+    pd.testing.assert_frame_equal(from_shared_memory(name, size, unlink=True), df)
+    with pytest.raises(FileNotFoundError):
+        from_shared_memory(name, size)
+
+def test_transform_parallel_matches_transform_data():
+    """Test that partitioned transform with a global dedup equals the single-process result"""
+    raw = generate_raw(4000, seed=9, dirty_rates={'duplicate': 0.2})
+    try:
+        result = transform_parallel(raw, workers=2, min_partition_rows=500)
+    finally:
+        shutdown_pool()
+    
+    pd.testing.assert_frame_equal(result, transform_data(raw))
+
+def test_transform_parallel_small_frame_runs_in_process(monkeypatch):
+    """Test that frames below the partition size do not start a pool"""
+    import etl.parallel
+    
+    monkeypatch.setattr(etl.parallel, 'get_pool', lambda workers: pytest.fail("pool started"))
+    raw = generate_raw(100, seed=1)
+    pd.testing.assert_frame_equal(transform_parallel(raw, workers=4), transform_data(raw))
+
+def test_failed_partition_raises(monkeypatch):
+    """Test that a partition failing to transform raises instead of returning no rows"""
+    import etl.parallel
+    import etl.transform
+    
+    def failing_convert(df, rate):
+        raise RuntimeError("partition failed")
+    
+    monkeypatch.setattr(etl.transform, 'convert_prices', failing_convert)
+    name, size = to_shared_memory(generate_raw(100, seed=1))
+    try:
+        with pytest.raises(RuntimeError, match="partition failed"):
+            etl.parallel._transform_partition(name, size, None)
+    finally:
+        from_shared_memory(name, size, unlink=True)
@@ -0,0 +1,62 @@
+import pytest
+import pandas as pd
+import os
+import sys
+import tracemalloc
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from etl.profiling import Profiler, activate, section
+
+def test_stage_writes_reports(tmp_path):
+    """Test that a profiled stage writes profile, stats and allocation reports"""
+    profiler = Profiler(str(tmp_path), top_n=5)
+    with activate(profiler):
+        with profiler.stage('transform'):
+            values = [str(i) * 10 for i in range(10000)]
+    
+    assert (tmp_path / 'transform.prof').exists()
+    assert 'cumulative' in (tmp_path / 'transform.txt').read_text()
+    report = (tmp_path / 'transform.alloc.txt').read_text()
+    assert 'Peak traced memory' in report
+    
+    # tracemalloc is stopped again if the profiler started it
+    assert not tracemalloc.is_tracing()
+
+def test_sections_accumulate_when_detailed(tmp_path):
+    """Test that sections get their own accumulated profile in detail mode"""
+    profiler = Profiler(str(tmp_path), detail=True)
+    with activate(profiler):
+        with profiler.stage('extract'):
+            for _ in range(3):
+                with section('extract.fetch'):
+                    sum(range(1000))
+    
+    assert (tmp_path / 'extract.prof').exists()
+    assert (tmp_path / 'extract.fetch.prof').exists()
+
+def test_section_is_noop_without_profiler(tmp_path):
+    """Test that sections cost nothing and write nothing when profiling is off"""
+    with section('extract.fetch'):
+        pass
+    assert os.listdir(tmp_path) == []
+
+def test_profiled_pipeline_run(tmp_path):
+    """Test that run_etl_pipeline writes reports for each stage it runs"""
+    from main import run_etl_pipeline
+    from etl.artifacts import save_raw
+    
+    raw_path = str(tmp_path / 'raw.csv')
+    save_raw(pd.DataFrame({
+        'Title': ['Product 1'], 'Price': ['$45.99'], 'Rating': ['⭐ 4.5 / 5'],
+        'Colors': ['3 Colors'], 'Size': ['Size: M'], 'Gender': ['Gender: Men'],
+        'timestamp': ['2023-01-01']
+    }), raw_path)
+    
+    profile_dir = tmp_path / 'profiles'
+    run_etl_pipeline(stages=('transform',), raw_path=raw_path, profile_dir=str(profile_dir))
+    
+    [run_dir] = list(profile_dir.iterdir())
+    assert (run_dir / 'transform.prof').exists()
+    assert (run_dir / 'transform.alloc.txt').exists()
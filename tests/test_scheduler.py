@@ -0,0 +1,64 @@
+import pytest
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from etl.scheduler import CronSchedule, Scheduler, parse_cron_field
+
+def test_parse_cron_field():
+    """Test expanding cron field expressions"""
+    assert parse_cron_field("*", 0, 5) == {0, 1, 2, 3, 4, 5}
+    assert parse_cron_field("*/15", 0, 59) == {0, 15, 30, 45}
+    assert parse_cron_field("1-3,10", 0, 59) == {1, 2, 3, 10}
+    with pytest.raises(ValueError):
+        parse_cron_field("61", 0, 59)
+
+def test_cron_schedule_next_after():
+    """Test computing the next firing time of cron expressions"""
+    hourly = CronSchedule("0 * * * *")
+    assert hourly.next_after(datetime(2024, 1, 1, 10, 30)) == datetime(2024, 1, 1, 11, 0)
+    
+    # 02:30 on Mondays; 2024-01-01 is a Monday
+    weekly = CronSchedule("30 2 * * 1")
+    assert weekly.next_after(datetime(2024, 1, 1, 3, 0)) == datetime(2024, 1, 8, 2, 30)
+    
+    yearly = CronSchedule("0 0 1 1 *")
+    assert yearly.next_after(datetime(2024, 6, 1)) == datetime(2025, 1, 1, 0, 0)
+    
+    with pytest.raises(ValueError):
+        CronSchedule("* * *")
+
+def test_scheduler_skips_overlapping_runs():
+    """Test that a tick is skipped while the previous run is still going"""
+    release = threading.Event()
+    scheduler = Scheduler(release.wait, interval=60)
+    
+    assert scheduler.trigger() is True
+    assert scheduler.is_running()
+    assert scheduler.trigger() is False
+    assert scheduler.runs_skipped == 1
+    
+    release.set()
+    scheduler._worker.join()
+    assert not scheduler.is_running()
+    assert scheduler.trigger() is True
+    scheduler._worker.join()
+
+def test_scheduler_runs_on_interval():
+    """Test that run_forever keeps running the job until stopped"""
+    calls = []
+    scheduler = Scheduler(lambda: calls.append(time.time()), interval=0.05)
+    
+    thread = threading.Thread(target=scheduler.run_forever)
+    thread.start()
+    time.sleep(0.3)
+    scheduler.stop()
+    thread.join(timeout=5)
+    
+    assert not thread.is_alive()
+    assert len(calls) >= 2
@@ -0,0 +1,90 @@
+import pytest
+import pandas as pd
+import os
+import sys
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from etl.schema import ensure_schema, replace_products, MIGRATIONS
+from etl.load import save_to_postgresql
+from etl.db import get_engine, dispose_engines
+from etl.transform import TRANSFORMED_DTYPES
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+def make_products(rows):
+    df = pd.DataFrame(rows, columns=['Title', 'Price', 'Rating', 'Colors', 'Size', 'Gender', 'timestamp'])
+    return df.astype(TRANSFORMED_DTYPES)
+
+PRODUCTS = make_products([
+    ('Jacket 1', 735840.0, 4.5, 3, 'M', 'Men', '2024-01-01 10:00:00'),
+    ('Jacket 2', 520000.0, 3.0, 2, 'L', 'Women', '2024-01-01 10:00:00'),
+    ('Jacket 1', 700000.0, 4.5, 3, 'M', 'Men', '2024-01-01 10:00:00'),  # duplicate key
+])
+
+@pytest.fixture
+def engine(tmp_path):
+    yield get_engine(f"sqlite:///{tmp_path / 'products.db'}")
+    dispose_engines()
+
+def test_ensure_schema_creates_indexed_table(engine):
+    """Test that the products table gets its key and indexes, once"""
+    with engine.begin() as connection:
+        ensure_schema(connection, 'products')
+    with engine.begin() as connection:
+        ensure_schema(connection, 'products')
+        versions = connection.exec_driver_sql("SELECT version FROM schema_migrations").scalars().all()
+    
+    inspector = sqlalchemy.inspect(engine)
+    assert inspector.get_pk_constraint('products')['constrained_columns'] == ['Title', 'Size', 'Gender']
+    indexed = {tuple(index['column_names']) for index in inspector.get_indexes('products')}
+    assert {('Gender',), ('Size',), ('Price',)} <= indexed
+    assert versions == [version for version, _, _ in MIGRATIONS]
+
+def test_ensure_schema_replaces_schemaless_table(engine):
+    """Test that a table created by pandas' to_sql is recreated with the managed schema"""
+    PRODUCTS.to_sql('products', engine, index=False)
+    
+    with engine.begin() as connection:
+        ensure_schema(connection, 'products')
+    
+    assert sqlalchemy.inspect(engine).get_pk_constraint('products')['constrained_columns']
+
+def test_replace_products_keeps_last_duplicate(engine):
+    """Test that rows are replaced in place and duplicate keys keep the last row"""
+    with engine.begin() as connection:
+        table = ensure_schema(connection, 'products')
+        replace_products(connection, table, PRODUCTS, chunksize=1)
+        assert replace_products(connection, table, PRODUCTS) == 2
+    
+    stored = pd.read_sql_table('products', engine).sort_values('Title')
+    assert stored['Price'].tolist() == [700000.0, 520000.0]
+    assert len(sqlalchemy.inspect(engine).get_indexes('products')) == 3
+
+def test_save_to_postgresql_with_url(engine):
+    """Test writing through the sink with an explicit database URL"""
+    assert save_to_postgresql(PRODUCTS, url=str(engine.url), table_name='products') is True
+    assert len(pd.read_sql_table('products', engine)) == 2
+
+def test_migration_adds_price_usd_column(engine):
+    """Test that a table created before Price_USD existed gains the column"""
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            'CREATE TABLE products ("Title" TEXT, "Price" NUMERIC, "Rating" FLOAT, "Colors" INTEGER, '
+            '"Size" VARCHAR(16), "Gender" VARCHAR(16), timestamp DATETIME, PRIMARY KEY ("Title", "Size", "Gender"))'
+        )
+        connection.exec_driver_sql(
+            "CREATE TABLE schema_migrations (table_name VARCHAR(128), version INTEGER, "
+            "description VARCHAR(255), applied_at DATETIME, PRIMARY KEY (table_name, version))"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO schema_migrations VALUES ('products', 1, 'create', '2024-01-01 00:00:00')"
+        )
+    
+    with engine.begin() as connection:
+        table = ensure_schema(connection, 'products')
+        replace_products(connection, table, PRODUCTS.assign(Price_USD=45.99))
+    
+    stored = pd.read_sql_table('products', engine)
+    assert stored['Price_USD'].tolist() == [45.99, 45.99]
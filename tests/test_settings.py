@@ -0,0 +1,68 @@
+import pytest
+import json
+import os
+import sys
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.settings import Settings, load_settings, get_settings, configure, MAX_WORKERS
+
+def test_defaults_match_module_constants():
+    """Test that the settings object defaults to the module constants"""
+    settings = load_settings(environ={})
+    assert settings == Settings()
+    assert settings.max_workers == MAX_WORKERS
+
+def test_environment_overrides_file(tmp_path):
+    """Test that environment variables override the settings file"""
+    config_path = tmp_path / 'settings.json'
+    config_path.write_text(json.dumps({'max_workers': 4, 'csv_chunk_size': 500, 'sink_sheets': False}))
+    
+    settings = load_settings(environ={
+        'ETL_SETTINGS_FILE': str(config_path),
+        'ETL_MAX_WORKERS': '8',
+        'ETL_CACHE_DIR': '/tmp/pages',
+        'ETL_SINK_POSTGRES': 'no',
+    })
+    
+    assert settings.max_workers == 8
+    assert settings.csv_chunk_size == 500
+    assert settings.cache_dir == '/tmp/pages'
+    assert settings.sink_sheets is False
+    assert settings.sink_postgres is False
+
+def test_toml_settings_file(tmp_path):
+    """Test loading a TOML settings file"""
+    config_path = tmp_path / 'settings.toml'
+    config_path.write_text('postgres_pool_size = 12\ncsv_compression = "gzip"\n')
+    
+    settings = load_settings(str(config_path), environ={})
+    assert settings.postgres_pool_size == 12
+    assert settings.csv_compression == 'gzip'
+
+def test_invalid_settings_are_rejected(tmp_path):
+    """Test validation of values and unknown keys"""
+    with pytest.raises(ValueError, match="max_workers"):
+        load_settings(environ={'ETL_MAX_WORKERS': '0'})
+    with pytest.raises(ValueError):
+        load_settings(environ={'ETL_SINK_CSV': 'maybe'})
+    with pytest.raises(ValueError, match="csv_compression"):
+        Settings(csv_compression='bz2')
+    with pytest.raises(ValueError, match="usd_to_idr"):
+        Settings(usd_to_idr=0)
+    
+    config_path = tmp_path / 'settings.json'
+    config_path.write_text(json.dumps({'max_wrokers': 4}))
+    with pytest.raises(ValueError, match="Unknown setting"):
+        load_settings(str(config_path), environ={})
+
+def test_configure_replaces_process_settings():
+    """Test that configure changes what get_settings returns"""
+    original = get_settings()
+    try:
+        configure(max_workers=6)
+        assert get_settings().max_workers == 6
+    finally:
+        configure(original)
+    assert get_settings() is original
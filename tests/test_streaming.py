@@ -0,0 +1,123 @@
+import pytest
+import pandas as pd
+import os
+import sys
+import threading
+import time
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import etl.extract
+from etl.streaming import Stage, StagedPipeline, StageError, CsvStreamSink, run_streaming_pipeline
+from config.settings import Settings
+
+CARD = """
+<div class="collection-card">
+    <div class="product-details">
+        <h3 class="product-title">Jacket {page}</h3>
+        <div class="price-container"><span class="price">$42.50</span></div>
+        <p style="font-size: 14px; color: #777;">Rating: ⭐ 3.7 / 5</p>
+        <p style="font-size: 14px; color: #777;">3 Colors</p>
+        <p style="font-size: 14px; color: #777;">Size: M</p>
+        <p style="font-size: 14px; color: #777;">Gender: Unisex</p>
+    </div>
+</div>
+"""
+
+def test_staged_pipeline_runs_every_item():
+    """Test that every item passes through all stages and None drops items"""
+    pipeline = StagedPipeline([
+        Stage('double', lambda x: x * 2, workers=3),
+        Stage('odd_tens', lambda x: x if x % 20 else None, workers=2),
+    ], queue_size=2)
+    
+    results = pipeline.run(range(100))
+    
+    assert sorted(results) == [x * 2 for x in range(100) if (x * 2) % 20]
+    assert pipeline.processed == {'double': 100, 'odd_tens': 100}
+
+def test_staged_pipeline_process_stage():
+    """Test running a stage in a process pool"""
+    pipeline = StagedPipeline([Stage('abs', abs, workers=2, mode='process')])
+    assert sorted(pipeline.run([-3, -2, 1])) == [1, 2, 3]
+
+def test_staged_pipeline_applies_backpressure():
+    """Test that a blocked stage stops the source from running ahead"""
+    release = threading.Event()
+    produced = []
+    
+    def source():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+    
+    pipeline = StagedPipeline([Stage('slow', lambda x: release.wait() and x)], queue_size=2)
+    runner = threading.Thread(target=pipeline.run, args=(source(),))
+    runner.start()
+    time.sleep(0.3)
+    
+    # One item in the worker, two in its queue, one waiting to be put
+    assert len(produced) <= 4
+    release.set()
+    runner.join()
+    assert len(produced) == 1000
+
+def test_staged_pipeline_propagates_errors():
+    """Test that a failing worker stops the pipeline and its error is raised"""
+    def explode(x):
+        if x == 5:
+            raise ValueError("bad item")
+        return x
+    
+    pipeline = StagedPipeline([Stage('pass', lambda x: x), Stage('explode', explode, workers=2)], queue_size=1)
+    with pytest.raises(StageError, match="explode") as error:
+        pipeline.run(iter(range(10000)))
+    assert isinstance(error.value.__cause__, ValueError)
+
+def test_csv_stream_sink_skips_duplicates(tmp_path):
+    """Test that rows already written by an earlier chunk are skipped"""
+    path = str(tmp_path / 'products.csv')
+    sink = CsvStreamSink(path, max_rows=3)
+    sink.write(pd.DataFrame({'Title': ['a', 'b', 'b']}))
+    sink.write(pd.DataFrame({'Title': ['b', 'c', 'd']}))
+    sink.writer.commit()
+    
+    assert sink.full
+    assert pd.read_csv(path)['Title'].tolist() == ['a', 'b', 'c']
+
+def test_run_streaming_pipeline(tmp_path, monkeypatch):
+    """Test scraping, transforming and writing pages through the streaming pipeline"""
+    monkeypatch.setattr(etl.extract, 'fetch_page_html',
+                        lambda page, **kwargs: f"<html><body>{CARD.format(page=page)}</body></html>")
+    settings = Settings(max_pages=6, max_products=5, page_delay=0, max_workers=2,
+                        stream_parse_workers=2, stream_transform_workers=2)
+    path = str(tmp_path / 'products.csv')
+    
+    assert run_streaming_pipeline(settings, output_path=path) == 5
+    
+    df = pd.read_csv(path)
+    assert len(df) == 5
+    assert set(df['Title']) <= {f"Jacket {page}" for page in range(1, 7)}
+    assert (df['Price'] == 680000.0).all()
+
+def test_streaming_etl_writes_other_sinks(tmp_path, monkeypatch):
+    """Test that sinks other than CSV get the finished streaming output"""
+    import etl.load
+    from main import run_streaming_etl, parse_args
+    
+    monkeypatch.setattr(etl.extract, 'fetch_page_html',
+                        lambda page, **kwargs: f"<html><body>{CARD.format(page=page)}</body></html>")
+    received = []
+    monkeypatch.setitem(etl.load.SINKS, 'postgresql', lambda df, settings=None: received.append(len(df)) or True)
+    settings = Settings(max_pages=3, page_delay=0, sink_sheets=False, csv_output_path=str(tmp_path / 'products.csv'))
+    
+    assert run_streaming_etl(settings) == {'csv': True, 'postgresql': True}
+    assert received == [3]
+    
+    with pytest.raises(ValueError, match="postgresql"):
+        run_streaming_etl(Settings(sink_sheets=False, csv_append=True))
+    with pytest.raises(ValueError, match="sink_csv"):
+        run_streaming_etl(Settings(sink_csv=False))
+    with pytest.raises(SystemExit):
+        parse_args(['--streaming', '--no-csv'])
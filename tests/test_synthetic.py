@@ -0,0 +1,52 @@
+import pytest
+import pandas as pd
+import os
+import sys
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from etl.synthetic import generate_raw, render_page, write_pages, RAW_COLUMNS
+from etl.extract import extract_data, parse_page
+from etl.transform import transform_data
+from config.settings import Settings
+
+def test_generate_raw_is_deterministic():
+    """Test that a seed always produces the same frame"""
+    first = generate_raw(1000, seed=7)
+    
+    pd.testing.assert_frame_equal(first, generate_raw(1000, seed=7))
+    assert not first.equals(generate_raw(1000, seed=8))
+    assert first.columns.tolist() == RAW_COLUMNS
+    assert len(first) == 1000
+
+def test_generate_raw_dirty_values():
+    """Test that dirty values appear at roughly their configured rates and are cleaned away"""
+    df = generate_raw(20000, seed=1, dirty_rates={'unknown_title': 0.1, 'duplicate': 0.1})
+    
+    assert (df['Title'] == 'Unknown Product').mean() == pytest.approx(0.1, abs=0.02)
+    assert (df['Price'] == 'Price Unavailable').any()
+    assert df['Rating'].isin(['Invalid Rating', 'Not Rated']).any()
+    assert df.duplicated().mean() == pytest.approx(0.1, abs=0.02)
+    
+    transformed = transform_data(df)
+    assert 0 < len(transformed) < len(df)
+    assert not transformed.duplicated().any()
+    assert transformed['Price'].between(50 * 16000, 550 * 16000).all()
+
+def test_render_page_round_trip():
+    """Test that parsing a generated page gives back the generated rows"""
+    df = generate_raw(20, seed=3)
+    
+    parsed = pd.DataFrame(parse_page(render_page(df)))
+    columns = [column for column in RAW_COLUMNS if column != 'timestamp']
+    pd.testing.assert_frame_equal(parsed[columns], df[columns])
+
+def test_extract_from_synthetic_pages(tmp_path):
+    """Test scraping generated pages through the page cache, without the network"""
+    df = generate_raw(50, seed=4)
+    cache_dir = str(tmp_path / 'pages')
+    assert write_pages(df, cache_dir) == 3
+    
+    extracted = extract_data(settings=Settings(max_pages=3, page_delay=0, cache_dir=cache_dir))
+    assert extracted['Title'].tolist() == df['Title'].tolist()
@@ -148,4 +148,45 @@ def test_transform_handles_malformed_prices():
     
     # Verify the transformation - should extract the numeric part of the price
     assert not transformed_df.empty
-    assert transformed_df.iloc[0]['Price'] == 128000.0  # 8 * 16000
\ No newline at end of file
+    assert transformed_df.iloc[0]['Price'] == 128000.0  # 8 * 16000
+
+def test_transform_aggregates_quality_warnings(caplog):
+    """Test that bad values produce one summary line instead of one warning each"""
+    import logging
+    
+    rows = 50
+    df = pd.DataFrame({
+        'Title': [f'Product {i}' for i in range(rows)],
+        'Price': ['Price Unavailable'] * rows,
+        'Rating': ['⭐ 4.5 / 5'] * rows,
+        'Colors': ['3 Colors'] * rows,
+        'Size': ['Size: M'] * rows,
+        'Gender': ['Gender: Men'] * rows,
+        'timestamp': ['2023-01-01'] * rows
+    })
+    
+    with caplog.at_level(logging.WARNING, logger='etl.transform'):
+        transform_data(df)
+    
+    quality_records = [r for r in caplog.records if 'Data quality issues' in r.getMessage()]
+    price_records = [r for r in caplog.records if 'No numeric value found in price' in r.getMessage()]
+    assert len(quality_records) == 1
+    assert price_records == []
+    assert "price.no_numeric=50" in quality_records[0].getMessage()
+    assert "'Price Unavailable' x50" in quality_records[0].getMessage()
+
+def test_quality_report_merge():
+    """Test merging reports from separate chunks"""
+    from etl.quality import QualityReport, collect
+    
+    first = QualityReport()
+    with collect(first):
+        clean_rating("⭐ 9.5 / 5")
+        clean_rating("⭐ 9.5 / 5")
+    second = QualityReport()
+    with collect(second):
+        clean_rating("⭐ 7.0 / 5")
+    
+    merged = first.merge(second)
+    assert merged.counts['rating.out_of_range'] == 3
+    assert merged.values['rating.out_of_range']['9.5'] == 2